@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the todo tools
+Runs call_tool and the mcp_stdio request path against the in-process Notion
+emulator (notion_mcp.emulator) and reports latency, throughput, Notion requests per
+call and peak memory; results can be stored as baselines and diffed.
+
+Peak memory is the traced allocation peak of one call, including the
+emulator's response bodies (the real client holds those too).
+
+    python benchmarks/bench.py                          # 100, 10k and 100k tasks, mirror on and off
+    python benchmarks/bench.py --sizes 100000 --latency-ms 150
+    python benchmarks/bench.py --save main              # writes benchmarks/baselines/main.json
+    python benchmarks/bench.py --compare main           # exits 1 when something regressed
+    python benchmarks/bench.py --cassette production.jsonl.gz --cases list_first_page,list_all_json
+
+With --cassette the tools are served a recording of real Notion traffic
+(see NOTION_HTTP_RECORD) instead of the emulator, so the database shape and
+Notion's latencies are production's; the size options are ignored.
+
+Each scenario (database size x mirror on/off) runs in a fresh interpreter,
+because the server reads its configuration at import.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+BASELINE_DIR = BENCH_DIR / "baselines"
+
+# name -> (tool, arguments); {size} is replaced by the database size
+CASES = {
+    "list_first_page": ("show_all_todos", {}),
+    "list_all_json": ("show_all_todos", {"limit": "{size}"}),
+    "list_all_tsv_2_fields": ("show_all_todos", {"limit": "{size}", "output_format": "tsv", "fields": ["task", "status"]}),
+    "urgent_tasks": ("show_urgent_tasks", {"limit": 50}),
+    "tasks_by_tag": ("show_tasks_by_tag", {"tag": "Pro", "limit": 50}),
+    "page_through_10": ("show_all_todos", {"limit": 100}),
+    "stdio_list_first_page": ("show_all_todos", {}),
+    # Writes last, so the read cases all see the same database
+    "update_task_status": ("update_task_status", {"status": "In progress"}),
+    "add_todo": ("add_todo", {"task": "Benchmark task", "tags": ["Pro"], "priority": "Important"}),
+}
+
+# Metric -> direction in which it gets worse
+METRICS = {
+    "cold_ms": "up",
+    "p50_ms": "up",
+    "p95_ms": "up",
+    "throughput_per_s": "down",
+    "requests_per_call": "up",
+    "peak_kib": "up",
+}
+
+
+# --- Worker (one scenario, fresh interpreter) ---------------------------------
+
+def _arguments(arguments: dict, size: int) -> dict:
+    return {key: size if value == "{size}" else value for key, value in arguments.items()}
+
+
+async def _run_scenario(options: dict) -> dict:
+    os.environ.update(
+        NOTION_API_KEY="benchmark",
+        NOTION_CACHE_TTL="3600" if options["mirror"] else "0",
+        NOTION_RATE_LIMIT=str(options["rate_limit"]),
+        NOTION_OUTPUT_FORMAT="json",
+        NOTION_LIST_PAGE_SIZE="100",
+        # Empty values also override whatever a local .env sets
+        NOTION_TASK_STORE="",
+        NOTION_MCP_STATS_FILE="",
+        NOTION_HTTP_RECORD="",
+        NOTION_HTTP_REPLAY="",
+    )
+
+    if options["cassette"]:
+        # Recorded traffic: the database, its size and Notion's latencies come from the cassette
+        from notion_mcp.cassette import Cassette
+        cassette = Cassette.load(options["cassette"])
+        database_ids = cassette.database_ids()
+        if not database_ids:
+            raise SystemExit(f"{options['cassette']} holds no database requests")
+        task_ids = cassette.task_ids()
+        os.environ.update(
+            NOTION_DATABASE_ID=database_ids[0],
+            NOTION_HTTP_REPLAY=options["cassette"],
+            NOTION_HTTP_REPLAY_SPEED=str(options["replay_speed"]),
+        )
+        from notion_mcp import core
+        replay = core.notion.replay
+        count_requests = lambda: sum(replay.stats.values())  # noqa: E731
+    else:
+        from notion_mcp.emulator import Faults, NotionEmulator
+        faults = Faults(
+            latency=options["latency_ms"] / 1000,
+            jitter=options["jitter_ms"] / 1000,
+            throttle_rate=options["throttle_rate"],
+            retry_after=0.05,
+            error_rate=options["error_rate"],
+            drop_rate=options["drop_rate"],
+            seed=1
+        )
+        emulator = NotionEmulator(faults, seed=1)
+        database_id = emulator.seed_todos(options["size"])
+        os.environ["NOTION_DATABASE_ID"] = database_id
+        from notion_mcp import core
+        core.notion.transport = emulator.transport
+        task_ids = emulator.page_ids(database_id)
+        count_requests = lambda: emulator.stats["requests"]  # noqa: E731
+
+    from notion_mcp import mcp_stdio
+    from notion_mcp.encoding import dumps_bytes
+    stdio = mcp_stdio.MCPServer()
+    size = options["size"] or len(task_ids)
+
+    async def page_through(arguments: dict):
+        result = await core.call_tool("show_all_todos", arguments)
+        for _ in range(9):
+            notes = [content["text"] for content in result if 'cursor "' in content["text"]]
+            if not notes:
+                break
+            cursor = notes[0].split('cursor "', 1)[1].split('"', 1)[0]
+            result = await core.call_tool("show_all_todos", dict(arguments, cursor=cursor))
+
+    def call_for(name: str):
+        tool, arguments = CASES[name]
+        arguments = _arguments(arguments, size)
+        if name == "page_through_10":
+            return lambda index: page_through(arguments)
+        if name == "update_task_status":
+            return lambda index: core.call_tool(tool, dict(arguments, task_id=task_ids[index % len(task_ids)]))
+        if name.startswith("stdio_"):
+            async def stdio_call(index):
+                request = {"jsonrpc": "2.0", "id": index, "method": "tools/call", "params": {"name": tool, "arguments": arguments}}
+                dumps_bytes(await stdio.handle_request(request))
+            return stdio_call
+        return lambda index: core.call_tool(tool, arguments)
+
+    results = {}
+    for name in options["cases"]:
+        call = call_for(name)
+        # Cold: the first call pays for the schema and, with the mirror, the initial sync
+        started = time.perf_counter()
+        await call(0)
+        cold = time.perf_counter() - started
+
+        latencies = []
+        requests = count_requests()
+        deadline = time.perf_counter() + options["budget"]
+        while len(latencies) < options["rounds"] and (len(latencies) < 3 or time.perf_counter() < deadline):
+            started = time.perf_counter()
+            await call(len(latencies) + 1)
+            latencies.append(time.perf_counter() - started)
+        requests_per_call = (count_requests() - requests) / len(latencies)
+
+        calls = 0
+        started = time.perf_counter()
+        deadline = started + options["budget"] / 2
+        while calls < options["rounds"] * options["concurrency"] and (calls == 0 or time.perf_counter() < deadline):
+            await asyncio.gather(*(call(calls + i) for i in range(options["concurrency"])))
+            calls += options["concurrency"]
+        throughput = calls / (time.perf_counter() - started)
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await call(1)
+        peak = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+
+        latencies.sort()
+        results[name] = {
+            "calls": len(latencies),
+            "cold_ms": round(cold * 1000, 2),
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2),
+            "throughput_per_s": round(throughput, 1),
+            "requests_per_call": round(requests_per_call, 2),
+            "peak_kib": round(peak / 1024, 1),
+        }
+    await core.shutdown()
+    return results
+
+
+def worker(options: dict):
+    sys.path.insert(0, str(SRC_DIR))
+    results = asyncio.run(_run_scenario(options))
+    sys.stdout.write(json.dumps(results))
+
+
+# --- Driver -------------------------------------------------------------------
+
+def run(args) -> dict:
+    mirrors = {"on": [True], "off": [False], "both": [True, False]}[args.mirror]
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "rate_limit": args.rate_limit,
+            "throttle_rate": args.throttle_rate,
+            "error_rate": args.error_rate,
+            "drop_rate": args.drop_rate,
+            "cassette": args.cassette,
+            "replay_speed": args.replay_speed if args.cassette else None,
+        },
+        "scenarios": {},
+    }
+    for size in [0] if args.cassette else args.sizes:
+        for mirror in mirrors:
+            scenario = f"{size or 'cassette'}/{'mirror' if mirror else 'direct'}"
+            options = {
+                "size": size,
+                "mirror": mirror,
+                "latency_ms": args.latency_ms,
+                "jitter_ms": args.jitter_ms,
+                "rate_limit": args.rate_limit,
+                "throttle_rate": args.throttle_rate,
+                "error_rate": args.error_rate,
+                "drop_rate": args.drop_rate,
+                "cassette": args.cassette and str(Path(args.cassette).resolve()),
+                "replay_speed": args.replay_speed,
+                "rounds": args.rounds,
+                "budget": args.budget,
+                "concurrency": args.concurrency,
+                "cases": args.cases,
+            }
+            print(f"Running {scenario}...", file=sys.stderr)
+            process = subprocess.run([sys.executable, __file__, "--worker", json.dumps(options)],
+                                     capture_output=True, text=True)
+            if process.returncode != 0:
+                print(process.stderr[-2000:], file=sys.stderr)
+                raise SystemExit(f"Scenario {scenario} failed")
+            report["scenarios"][scenario] = json.loads(process.stdout)
+    return report
+
+
+def print_report(report: dict):
+    header = f"{'scenario':<14} {'case':<24}" + "".join(f"{metric:>18}" for metric in METRICS)
+    print(header)
+    print("-" * len(header))
+    for scenario, cases in report["scenarios"].items():
+        for case, values in cases.items():
+            print(f"{scenario:<14} {case:<24}" + "".join(f"{values[metric]:>18}" for metric in METRICS))
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> int:
+    """Print changes beyond `threshold` against a baseline; returns the number of regressions"""
+    regressions = 0
+    lines = []
+    for scenario, cases in report["scenarios"].items():
+        for case, values in cases.items():
+            before = baseline["scenarios"].get(scenario, {}).get(case)
+            if before is None:
+                continue
+            for metric, worse in METRICS.items():
+                old, new = before.get(metric), values[metric]
+                if not old or old == new:
+                    continue
+                change = (new - old) / old
+                if abs(change) < threshold and metric != "requests_per_call":
+                    continue
+                regressed = change > 0 if worse == "up" else change < 0
+                regressions += regressed
+                label = "REGRESSION" if regressed else "improved"
+                lines.append(f"{label:<10} {scenario:<14} {case:<24} {metric:<18} {old:>10} -> {new:<10} ({change:+.0%})")
+    print(f"\nCompared with baseline from {baseline['meta']['date']} (threshold {threshold:.0%}):")
+    for setting in ("latency_ms", "jitter_ms", "rate_limit", "throttle_rate", "error_rate", "drop_rate", "cassette",
+                    "replay_speed", "python"):
+        if baseline["meta"].get(setting) != report["meta"].get(setting):
+            print(f"  note: {setting} differs ({baseline['meta'].get(setting)} in the baseline, {report['meta'].get(setting)} now)")
+    print("\n".join(lines) if lines else "  no changes beyond the threshold")
+    return regressions
+
+
+def baseline_path(name: str) -> Path:
+    return Path(name) if name.endswith(".json") else BASELINE_DIR / f"{name}.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the todo tools against the Notion API emulator")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[100, 10000, 100000],
+                        help="database sizes, comma separated (default 100,10000,100000)")
+    parser.add_argument("--mirror", choices=["on", "off", "both"], default="both", help="local mirror enabled")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latency added to every Notion request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra latency, up to this much")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of Notion requests answered with a 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of Notion requests failing with a 5xx")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of Notion connections dropped")
+    parser.add_argument("--cassette", metavar="PATH",
+                        help="replay recorded Notion traffic (NOTION_HTTP_RECORD) instead of the emulator")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="with --cassette: 1 keeps the recorded latencies, 2 halves them, 0 removes them")
+    parser.add_argument("--rate-limit", type=float, default=0, help="client rate limit in requests/s (0 disables it)")
+    parser.add_argument("--rounds", type=int, default=20, help="calls per case (at most)")
+    parser.add_argument("--budget", type=float, default=3.0, help="seconds per case before fewer rounds are run")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel calls in the throughput run")
+    parser.add_argument("--cases", type=lambda value: value.split(","), default=list(CASES),
+                        help=f"cases to run, comma separated (default all: {','.join(CASES)})")
+    parser.add_argument("--save", metavar="NAME", help="store the results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="diff the results against a stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change reported by --compare")
+    parser.add_argument("--json", metavar="PATH", help="also write the full report to PATH")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(json.loads(args.worker))
+        return 0
+    unknown = [case for case in args.cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save:
+        path = baseline_path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {path}")
+    if args.compare:
+        baseline = json.loads(baseline_path(args.compare).read_text(encoding="utf-8"))
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
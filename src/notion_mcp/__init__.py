@@ -1,13 +1,15 @@
 import asyncio
+import os
 import sys
 
 def main():
     """Main entry point for the package."""
-    try:
-        from . import server
-        asyncio.run(server.main())
-    except ImportError as e:
-        # Fallback to simple server if MCP is not available
-        print(f"MCP library not available (Python {sys.version_info.major}.{sys.version_info.minor}), using simple test server...", file=sys.stderr)
-        from . import simple_server
-        asyncio.run(simple_server.main())
\ No newline at end of file
+    if os.getenv("NOTION_MCP_SERVER", "stdio").lower() == "sdk":
+        try:
+            from . import server
+            asyncio.run(server.main())
+            return
+        except ImportError as e:
+            print(f"MCP library not available (Python {sys.version_info.major}.{sys.version_info.minor}), using minimal MCP server...", file=sys.stderr)
+    from . import mcp_stdio
+    asyncio.run(mcp_stdio.main())
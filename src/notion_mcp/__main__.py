@@ -2,29 +2,37 @@ import sys
 import os
 import asyncio
 
+# --startup-profile[=module]: report import and initialisation times, then exit
+for arg in sys.argv[1:]:
+    if arg.split("=")[0] == "--startup-profile":
+        from .startup import profile
+        sys.exit(profile(arg.partition("=")[2] or "mcp_stdio"))
+
 # Check if we are being called by Claude Desktop (stdin/stdout mode) or standalone (test mode)
 is_mcp_mode = not sys.stdin.isatty()
 
+# NOTION_MCP_SERVER=sdk selects the server built on the mcp library; the default
+# minimal server offers the same tools and starts without importing it
+use_sdk = os.getenv("NOTION_MCP_SERVER", "stdio").lower() == "sdk"
+
 if is_mcp_mode:
     # MCP server mode - use stdio protocol
-    try:
-        # Try to import the full MCP server
-        from .server import main
-        print("Using full MCP server", file=sys.stderr)
-        
-        if __name__ == "__main__":
-            asyncio.run(main())
-    except ImportError as e:
-        # Fallback to minimal MCP server if library not available
-        print(f"MCP library not available (Python {sys.version_info.major}.{sys.version_info.minor}), using minimal MCP server...", file=sys.stderr)
+    main = None
+    if use_sdk:
+        try:
+            from .server import main
+            print("Using full MCP server", file=sys.stderr)
+        except ImportError as e:
+            print(f"MCP library not available (Python {sys.version_info.major}.{sys.version_info.minor}), using minimal MCP server...", file=sys.stderr)
+    if main is None:
         from .mcp_stdio import main
-        
-        if __name__ == "__main__":
-            asyncio.run(main())
+
+    if __name__ == "__main__":
+        asyncio.run(main())
 else:
     # Test mode - run simple server for testing
     print(f"Running in test mode (Python {sys.version_info.major}.{sys.version_info.minor})...", file=sys.stderr)
     from .simple_server import main
     
     if __name__ == "__main__":
-        asyncio.run(main())
\ No newline at end of file
+        asyncio.run(main())
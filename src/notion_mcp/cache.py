@@ -0,0 +1,105 @@
+"""
+In-process mirror of the todo database
+Holds formatted todos in columnar form so repeated list calls skip Notion
+"""
+
+import time
+import asyncio
+from typing import Optional, Sequence
+
+from .columnar import ColumnarTodos
+
+
+class TodoMirror:
+    """Local copy of the database, refreshed after `ttl` seconds
+
+    The mirror is filled on first use, then kept current in place by the
+    write helpers (create/update) using the page objects Notion returns.
+    A ttl of 0 disables the mirror entirely.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self.synced_at: Optional[float] = None
+        self._sync_state: dict = {}
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._todos = ColumnarTodos()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.synced_at is not None
+
+    @property
+    def refresh_lock(self) -> asyncio.Lock:
+        """Serialises refreshes; created lazily to bind to the running loop"""
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        return self._refresh_lock
+
+    @property
+    def sync_state(self) -> dict:
+        """Bookkeeping of the sync engine (high-water mark, last full sync)"""
+        return self._sync_state
+
+    @sync_state.setter
+    def sync_state(self, state: dict):
+        self._sync_state = state
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the content was last verified against Notion"""
+        return None if self.synced_at is None else time.time() - self.synced_at
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.loaded and self.age < self.ttl
+
+    def __len__(self) -> int:
+        return len(self._todos)
+
+    def replace(self, todos):
+        """Swap the whole content for a freshly downloaded set of todos"""
+        self._todos = ColumnarTodos.from_todos(todos)
+        self.touch()
+
+    def touch(self):
+        """Mark the current content as verified up to date"""
+        self.synced_at = time.time()
+
+    def upsert(self, todo: dict):
+        """Insert or update a single todo"""
+        self._todos.upsert(todo)
+
+    def remove(self, page_id: str):
+        """Drop a todo (archived or deleted page)"""
+        self._todos.remove(page_id)
+
+    def invalidate(self):
+        """Force a reload on next use"""
+        self.synced_at = None
+
+    def close(self):
+        """Release resources held by the mirror"""
+
+    def memory_usage(self) -> Optional[int]:
+        """Bytes the mirrored todos take in memory"""
+        return self._todos.memory_usage()
+
+    def get(self, page_id: str) -> Optional[dict]:
+        """The todo of one page, or None"""
+        return self._todos.get(page_id)
+
+    def select(self, filter: dict = None, limit: int = None, fields: Sequence[str] = None) -> list:
+        """Return todos matching a Notion filter, newest first like the default Notion sort
+
+        `fields` restricts each returned todo to those keys.
+        """
+        return self._todos.select(filter, limit, fields)
+
+    def snapshot(self, filter: dict = None, fields: Sequence[str] = None) -> Sequence[dict]:
+        """Every todo matching a filter, frozen against later syncs and writes"""
+        return self._todos.view(filter, fields)
@@ -0,0 +1,250 @@
+"""
+HTTP cassettes: record Notion traffic once, replay it offline
+A cassette is a JSON Lines file (gzip-compressed when named *.gz) holding a
+header line and one line per request/response exchange, secrets redacted
+"""
+
+import re
+import gzip
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from .metrics import endpoint_name
+
+logger = logging.getLogger('notion_mcp')
+
+CASSETTE_VERSION = 1
+
+# Integration tokens (legacy "secret_" and current "ntn_" prefixes)
+SECRET_PATTERN = re.compile(r"\b(?:secret|ntn)_[A-Za-z0-9]{20,}")
+REDACTED = "[REDACTED]"
+
+# Response headers worth keeping; everything else (cookies, request ids) is dropped
+KEPT_HEADERS = ("content-type", "retry-after")
+
+
+class CassetteMiss(LookupError):
+    """The replayed cassette holds no response for a request"""
+
+
+def _open(path: str, mode: str):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def redact(text: str) -> str:
+    return SECRET_PATTERN.sub(REDACTED, text)
+
+
+def _target(url: httpx.URL) -> str:
+    """Path plus query, without scheme and host"""
+    return url.raw_path.decode("ascii")
+
+
+def _cursor(target: str, body) -> Optional[str]:
+    """start_cursor of a request, from its JSON body or its query string"""
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = None
+    if isinstance(body, dict) and body.get("start_cursor"):
+        return body["start_cursor"]
+    return httpx.URL(target).params.get("start_cursor")
+
+
+def request_key(method: str, target: str, body: Optional[str]) -> Tuple[str, str, str]:
+    """Exact match key: query parameters and JSON body in canonical order"""
+    url = httpx.URL(target)
+    query = "&".join(f"{key}={value}" for key, value in sorted(url.params.multi_items()))
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            pass
+    return method, f"{url.path}?{query}", body or ""
+
+
+class Cassette:
+    """Recorded exchanges, indexed for replay"""
+
+    def __init__(self, header: dict, entries: List[dict]):
+        self.header = header
+        self.entries = entries
+        self._exact: Dict[tuple, List[dict]] = {}
+        self._loose: Dict[str, List[dict]] = {}
+        self._cursors: Dict[tuple, List[dict]] = {}
+        self._last_pages: Dict[tuple, List[dict]] = {}
+        for entry in entries:
+            body = json.dumps(entry["request"]) if entry.get("request") is not None else None
+            self._exact.setdefault(request_key(entry["method"], entry["url"], body), []).append(entry)
+            endpoint = endpoint_name(entry["method"], entry["url"])
+            self._loose.setdefault(endpoint, []).append(entry)
+            cursor = _cursor(entry["url"], entry.get("request"))
+            if cursor:
+                self._cursors.setdefault((endpoint, cursor), []).append(entry)
+            response = entry.get("response")
+            if isinstance(response, dict) and response.get("has_more") is False:
+                self._last_pages.setdefault(("last", endpoint), []).append(entry)
+        self._next: Dict[object, int] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with _open(path, "r") as file:
+            lines = [json.loads(line) for line in file if line.strip()]
+        if not lines or lines[0].get("cassette") != CASSETTE_VERSION:
+            raise ValueError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+        return cls(lines[0], lines[1:])
+
+    def _take(self, index: dict, key) -> Optional[dict]:
+        entries = index.get(key)
+        if not entries:
+            return None
+        # Identical requests get the recorded responses in order, then cycle
+        position = self._next.get(key, 0)
+        self._next[key] = position + 1
+        return entries[position % len(entries)]
+
+    def find(self, method: str, target: str, body: Optional[str]) -> Tuple[Optional[dict], bool]:
+        """Recorded exchange for a request and whether it matched exactly
+
+        Falls back to an exchange with the same endpoint (ids aside) when
+        nothing matches exactly, e.g. a query with another filter. A request
+        for a later page only falls back to a recorded page for the same
+        cursor, else to a last page (has_more false): any other page could
+        point to further cursors and keep a replayed pagination going forever.
+        """
+        key = request_key(method, target, body)
+        entry = self._take(self._exact, key)
+        if entry is not None:
+            return entry, True
+        endpoint = endpoint_name(method, httpx.URL(target).path)
+        cursor = _cursor(target, body)
+        if cursor is None:
+            return self._take(self._loose, endpoint), False
+        entry = self._take(self._cursors, (endpoint, cursor))
+        if entry is None:
+            entry = self._take(self._last_pages, ("last", endpoint))
+        return entry, False
+
+    def database_ids(self) -> List[str]:
+        """Ids of the databases the recorded traffic touched, most used first"""
+        counts: Dict[str, int] = {}
+        for entry in self.entries:
+            parts = httpx.URL(entry["url"]).path.strip("/").split("/")
+            if "databases" in parts[:-1]:
+                database_id = parts[parts.index("databases") + 1]
+                counts[database_id] = counts.get(database_id, 0) + 1
+        return sorted(counts, key=counts.get, reverse=True)
+
+    def task_ids(self) -> List[str]:
+        """Ids of the pages the recorded database queries returned, in first-seen order"""
+        task_ids = {}
+        for entry in self.entries:
+            if entry["url"].split("?", 1)[0].endswith("/query") and isinstance(entry.get("response"), dict):
+                task_ids.update((page["id"], None) for page in entry["response"].get("results", []))
+        return list(task_ids)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests through to `transport` and appends each exchange to a cassette
+
+    The Authorization header is never written and integration tokens in
+    URLs and bodies are redacted. Entries are flushed as they complete, so
+    a cassette survives the process being killed.
+    """
+
+    def __init__(self, path: str, transport: httpx.AsyncBaseTransport):
+        self.path = path
+        self.transport = transport
+        self.started = time.monotonic()
+        self.recorded = 0
+        self._file = None
+
+    def _write(self, entry: dict):
+        if self._file is None:
+            try:
+                with _open(self.path, "r") as existing:
+                    empty = not existing.readline()
+            except (OSError, EOFError):
+                empty = True
+            self._file = _open(self.path, "a")
+            if empty:
+                header = {"cassette": CASSETTE_VERSION, "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+                self._file.write(json.dumps(header) + "\n")
+        self._file.write(redact(json.dumps(entry, ensure_ascii=False, separators=(",", ":"))) + "\n")
+        self._file.flush()
+        self.recorded += 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        sent = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        duration = time.monotonic() - sent
+        content_type = response.headers.get("content-type", "")
+        try:
+            body = json.loads(request.content) if request.content else None
+        except ValueError:
+            body = request.content.decode("utf-8", errors="replace")
+        entry = {
+            "t": round(sent - self.started, 4),
+            "d": round(duration, 4),
+            "method": request.method,
+            "url": _target(request.url),
+            "request": body,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+        }
+        if "json" in content_type:
+            entry["response"] = json.loads(content) if content else None
+        else:
+            entry["text"] = content.decode("utf-8", errors="replace")
+        self._write(entry)
+        return httpx.Response(response.status_code, headers=response.headers, content=content,
+                              request=request, extensions=response.extensions)
+
+    async def aclose(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answers requests from a cassette without touching the network
+
+    Each response is delayed by its recorded duration divided by `speed`
+    (1 replays the original timing, 2 twice as fast, 0 without delay).
+    Requests nothing in the cassette resembles raise CassetteMiss.
+    """
+
+    def __init__(self, cassette: Cassette, speed: float = 1.0):
+        self.cassette = cassette
+        self.speed = speed
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"exact": 0, "approximate": 0, "missed": 0}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        target = _target(request.url)
+        entry, exact = self.cassette.find(request.method, target, content.decode("utf-8") if content else None)
+        if entry is None:
+            self.stats["missed"] += 1
+            raise CassetteMiss(f"No recorded response for {request.method} {target}")
+        self.stats["exact" if exact else "approximate"] += 1
+        if not exact:
+            logger.debug(f"Cassette: no exact match for {request.method} {target}, replaying {entry['url']}")
+        if self.speed > 0 and entry.get("d"):
+            await asyncio.sleep(entry["d"] / self.speed)
+        if "response" in entry:
+            return httpx.Response(entry["status"], headers=entry.get("headers"), json=entry["response"], request=request)
+        return httpx.Response(entry["status"], headers=entry.get("headers"), text=entry.get("text", ""), request=request)
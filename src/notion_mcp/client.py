@@ -0,0 +1,295 @@
+"""
+Shared Notion HTTP client
+One long-lived connection pool per process instead of a new AsyncClient per call
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from .cassette import Cassette, RecordingTransport, ReplayTransport
+from .metrics import Metrics
+from .ratelimit import RateLimiter, parse_retry_after
+from .retry import RETRYABLE_STATUSES, CircuitBreaker, RetryPolicy
+from .singleflight import SingleFlight, request_key
+
+logger = logging.getLogger('notion_mcp')
+
+NOTION_VERSION = "2022-06-28"
+NOTION_BASE_URL = "https://api.notion.com/v1"
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean setting from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class NotionClient:
+    """Pooled, keep-alive HTTP client for the Notion API
+
+    The underlying httpx.AsyncClient is created on first use and reused for
+    every request until aclose() is called, so DNS, TCP and TLS setup are
+    paid once per process rather than once per tool call.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        base_url: str = NOTION_BASE_URL,
+        notion_version: str = NOTION_VERSION,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        http2: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        limiter: Optional[RateLimiter] = None,
+        max_throttle_retries: int = 5,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics: Optional[Metrics] = None,
+        record: Optional[str] = None,
+        replay: Optional[str] = None,
+        replay_speed: float = 1.0,
+    ):
+        self.base_url = base_url
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Notion-Version": notion_version
+        }
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.http2 = http2 and self._http2_available()
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.inflight = SingleFlight()
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.max_throttle_retries = max_throttle_retries
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.retries = 0
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.record = record
+        self.replay: Optional[ReplayTransport] = None
+        if replay:
+            self.replay = ReplayTransport(Cassette.load(replay), speed=replay_speed)
+            logger.info(f"Replaying Notion traffic from {replay} ({len(self.replay.cassette.entries)} exchanges)")
+
+    @classmethod
+    def from_env(cls, api_key: str, **overrides) -> "NotionClient":
+        """Build a client configured from NOTION_HTTP_* environment variables"""
+        settings = {
+            "base_url": os.getenv("NOTION_API_BASE_URL") or NOTION_BASE_URL,
+            "max_connections": _env_int("NOTION_HTTP_MAX_CONNECTIONS", 10),
+            "max_keepalive_connections": _env_int("NOTION_HTTP_MAX_KEEPALIVE", 5),
+            "keepalive_expiry": _env_float("NOTION_HTTP_KEEPALIVE_EXPIRY", 30.0),
+            "timeout": _env_float("NOTION_HTTP_TIMEOUT", 30.0),
+            "http2": _env_flag("NOTION_HTTP2"),
+            "limiter": RateLimiter(
+                rate=_env_float("NOTION_RATE_LIMIT", 3.0),
+                burst=_env_int("NOTION_RATE_BURST", 3),
+                max_concurrency=_env_int("NOTION_MAX_CONCURRENCY", 8)
+            ),
+            "retry": RetryPolicy(
+                max_attempts=_env_int("NOTION_RETRY_ATTEMPTS", 4),
+                base_delay=_env_float("NOTION_RETRY_BASE_DELAY", 0.25),
+                max_delay=_env_float("NOTION_RETRY_MAX_DELAY", 4.0),
+                deadline=_env_float("NOTION_RETRY_DEADLINE", 20.0)
+            ),
+            "breaker": CircuitBreaker(
+                failure_threshold=_env_int("NOTION_BREAKER_THRESHOLD", 5),
+                reset_timeout=_env_float("NOTION_BREAKER_RESET", 30.0)
+            ),
+            "record": os.getenv("NOTION_HTTP_RECORD") or None,
+            "replay": os.getenv("NOTION_HTTP_REPLAY") or None,
+            "replay_speed": _env_float("NOTION_HTTP_REPLAY_SPEED", 1.0),
+        }
+        settings.update(overrides)
+        return cls(api_key, **settings)
+
+    @staticmethod
+    def _http2_available() -> bool:
+        """HTTP/2 needs the optional h2 package (pip install httpx[http2])"""
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+            return False
+        return True
+
+    def reset_stats(self):
+        """Zero the counters of the client and its limiter, breaker and coalescer"""
+        self.retries = 0
+        self.inflight.reset_stats()
+        self.limiter.reset_stats()
+        self.breaker.reset_stats()
+        if self.replay is not None:
+            self.replay.reset_stats()
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, creating it on first use"""
+        if not self.is_open:
+            transport = self.transport
+            if self.replay is not None:
+                transport = self.replay
+            elif self.record:
+                transport = RecordingTransport(
+                    self.record,
+                    transport or httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+                )
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=transport
+            )
+        return self._client
+
+    async def request(self, method: str, path: str, *, idempotent: Optional[bool] = None, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures of idempotent requests
+
+        Connection errors and 5xx responses are retried with exponential
+        backoff and full jitter while the retry policy's attempts and deadline
+        allow; writes are only retried when marked idempotent. Every outcome
+        feeds the circuit breaker, which fails fast with CircuitOpenError
+        while Notion is down.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        started = time.monotonic()
+        attempts = 0
+        while True:
+            self.breaker.before_request()
+            attempts += 1
+            try:
+                response = await self._send(method, path, **kwargs)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                delay = self.retry.next_delay(attempts, started) if idempotent else None
+                if delay is None:
+                    raise
+                logger.warning(f"Notion {method} {path} failed ({e.__class__.__name__}), retrying in {delay:.2f}s")
+            except BaseException:
+                # Cancelled or failed outside the transport: no verdict on Notion's health,
+                # but a half-open trial must not stay in flight forever
+                self.breaker.release_trial()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                delay = self.retry.next_delay(attempts, started) if idempotent else None
+                if delay is None:
+                    return response
+                logger.warning(f"Notion {method} {path} returned {response.status_code}, retrying in {delay:.2f}s")
+            self.retries += 1
+            self.metrics.http_retry(method, path)
+            await asyncio.sleep(delay)
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared connection pool and rate limiter
+
+        A 429 is always safe to resend (Notion rejected it before doing any
+        work), so it is retried after Retry-After up to max_throttle_retries
+        times before the 429 response is handed back to the caller.
+        """
+        client = self._get_client()
+        if not self.limiter.enabled:
+            return await self._exchange(client, method, path, **kwargs)
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            try:
+                response = await self._exchange(client, method, path, **kwargs)
+            except BaseException:
+                await self.limiter.release(failed=True)
+                raise
+            throttled = response.status_code == 429
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if throttled else 0.0
+            await self.limiter.release(throttled=throttled, retry_after=retry_after)
+            if not throttled or attempt >= self.max_throttle_retries:
+                return response
+            attempt += 1
+
+    async def _exchange(self, client: httpx.AsyncClient, method: str, path: str, **kwargs) -> httpx.Response:
+        """One HTTP exchange, timed and counted per endpoint"""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.TransportError:
+            self.metrics.http_exchange(method, path, time.perf_counter() - started)
+            raise
+        self.metrics.http_exchange(method, path, time.perf_counter() - started, response.status_code, len(response.content))
+        return response
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def patch(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", path, **kwargs)
+
+    async def read(self, method: str, path: str, *, json: Optional[dict] = None, params: Optional[dict] = None) -> dict:
+        """Idempotent read returning the decoded body, coalesced with identical in-flight reads
+
+        Concurrent calls for the same (method, path, params, body) - e.g. the
+        same database query with the same filter, sorts and cursor - share one
+        HTTP request. The returned dict is shared and must not be mutated.
+        """
+        async def send() -> dict:
+            response = await self.request(method, path, json=json, params=params, idempotent=True)
+            response.raise_for_status()
+            body = response.json()
+            if isinstance(body.get("results"), list):
+                self.metrics.http_rows(method, path, len(body["results"]))
+            return body
+
+        return await self.inflight.do(request_key(method, path, params, json), send)
+
+    async def aclose(self):
+        """Close pooled connections; the client reopens lazily if used again"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "NotionClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
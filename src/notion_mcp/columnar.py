@@ -0,0 +1,532 @@
+"""
+Columnar in-memory todo set
+Dictionary-encoded categorical columns, timestamp arrays and packed strings
+instead of one dict per todo; filters are evaluated once per distinct value,
+then gathered per row
+"""
+
+import hashlib
+import sys
+import uuid
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Optional, Sequence
+
+from .filters import compile_condition
+
+MISSING_TIME = -2 ** 63
+
+_NUMPY_TYPES = {"B": "uint8", "H": "uint16", "I": "uint32", "q": "int64"}
+
+_numpy = False
+
+
+def numpy():
+    """The numpy module when installed, else None (optional: vectorised filter evaluation)
+
+    Imported on first use rather than at start-up, where it would add close
+    to 100 ms to every process launch.
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy = np
+    return _numpy
+
+
+class Dictionary:
+    """Interned values; code 0 is reserved for None"""
+
+    def __init__(self):
+        self.values = [None]
+        self.codes = {None: 0}
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class TextColumn:
+    """Strings packed into one UTF-8 buffer, addressed by offset and length
+
+    Updates append the new text and repoint the row; the stale bytes are
+    counted and reclaimed when the owning ColumnarTodos compacts itself.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = array("I")
+        self.lengths = array("I")
+        self.stale = 0
+
+    def _pack(self, text: str):
+        data = text.encode("utf-8")
+        offset = len(self.buffer)
+        self.buffer += data
+        return offset, len(data)
+
+    def append(self, text: str):
+        offset, length = self._pack(text)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def set(self, row: int, text: str):
+        if text == self.get(row):
+            return
+        self.stale += self.lengths[row]
+        self.offsets[row], self.lengths[row] = self._pack(text)
+
+    def get(self, row: int) -> str:
+        offset = self.offsets[row]
+        return self.buffer[offset:offset + self.lengths[row]].decode("utf-8")
+
+
+def _timestamp_ms(value: str) -> int:
+    """Epoch milliseconds of an ISO timestamp, or MISSING_TIME"""
+    if not value:
+        return MISSING_TIME
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return MISSING_TIME
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return round(parsed.timestamp() * 1000)
+
+
+def _format_ms(ms: int) -> str:
+    """Render epoch milliseconds the way Notion writes created_time"""
+    moment = datetime.fromtimestamp(ms // 1000, timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S") + f".{ms % 1000:03d}Z"
+
+
+@lru_cache(maxsize=4096)
+def _format_day(ms: int) -> str:
+    """Render epoch milliseconds as a date-only Notion date"""
+    return datetime.fromtimestamp(ms // 1000, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _dict_size(values: dict) -> int:
+    """Bytes held by a dict together with its keys and values"""
+    return sys.getsizeof(values) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in values.items())
+
+
+class ColumnarTodos:
+    """Compact storage for formatted todos (the output of format_todo)
+
+    Per row: a 16-byte packed id, 2-byte status and priority codes, a 4-byte
+    code for the (ordered) tag combination, 8-byte due date and created
+    timestamps, the title bytes and 4 bytes in each of the id index and the
+    sort order. Anything that does not round-trip through the packed form
+    (non-UUID ids, due datetimes, unusual created strings) is kept verbatim
+    in small side tables.
+
+    Ids are looked up by binary search over row numbers sorted by packed id;
+    rows appended since that index was built are scanned directly until
+    there are enough of them to re-sort.
+    """
+
+    ID_WIDTH = 16
+
+    # Rows appended after the id index was built, scanned until the index is rebuilt
+    INDEX_TAIL_ROWS = 1024
+
+    # Compact once deleted rows or stale title bytes outweigh the live ones (and are not tiny)
+    COMPACT_MIN_ROWS = 1024
+    COMPACT_MIN_BYTES = 64 * 1024
+
+    def __init__(self):
+        self.ids = bytearray()
+        self.titles = TextColumn()
+        self.status = array("H")
+        self.priority = array("H")
+        self.tags = array("I")
+        self.due = array("q")
+        self.created = array("q")
+        self.alive = bytearray()
+        self.status_values = Dictionary()
+        self.priority_values = Dictionary()
+        self.tag_sets = Dictionary()
+        self._raw_ids: dict = {}
+        self._raw_created: dict = {}
+        self._raw_due: dict = {}
+        self._index = array("I")
+        self._dead = 0
+        self._order: Optional[array] = None
+
+    @classmethod
+    def from_todos(cls, todos) -> "ColumnarTodos":
+        table = cls()
+        for todo in todos:
+            table._append(todo)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.alive) - self._dead
+
+    # --- Encoding -------------------------------------------------------------
+
+    def _pack_id(self, page_id: str) -> bytes:
+        try:
+            packed = uuid.UUID(page_id)
+            if str(packed) == page_id:
+                return packed.bytes
+        except ValueError:
+            pass
+        return hashlib.md5(page_id.encode("utf-8")).digest()
+
+    def _packed_at(self, row: int) -> bytearray:
+        start = row * self.ID_WIDTH
+        return self.ids[start:start + self.ID_WIDTH]
+
+    def _reindex(self):
+        """Sort every row number by packed id"""
+        np = numpy()
+        rows = len(self.alive)
+        if np is not None and rows:
+            # Two big-endian halves sort like the 16 bytes themselves
+            halves = np.frombuffer(self.ids, dtype=">u8").reshape(rows, 2)
+            self._index = array("I", np.lexsort((halves[:, 1], halves[:, 0])).astype("uint32").tobytes())
+        else:
+            self._index = array("I", sorted(range(rows), key=self._packed_at))
+
+    def _find(self, page_id: str) -> int:
+        """Live row holding `page_id`, or -1"""
+        packed = self._pack_id(page_id)
+        indexed = len(self._index)
+        if len(self.alive) - indexed > max(self.INDEX_TAIL_ROWS, indexed // 8):
+            self._reindex()
+            indexed = len(self._index)
+        # Rows appended since the index was built
+        position = self.ids.find(packed, indexed * self.ID_WIDTH)
+        while position >= 0:
+            row, offset = divmod(position, self.ID_WIDTH)
+            if not offset and self.alive[row]:
+                return row
+            position = self.ids.find(packed, position + 1)
+        # Binary search; a removed and re-added id leaves dead rows next to the live one
+        index = self._index
+        low, high = 0, indexed
+        while low < high:
+            middle = (low + high) // 2
+            if self._packed_at(index[middle]) < packed:
+                low = middle + 1
+            else:
+                high = middle
+        while low < indexed and self._packed_at(index[low]) == packed:
+            if self.alive[index[low]]:
+                return index[low]
+            low += 1
+        return -1
+
+    def _encode(self, row: int, todo: dict):
+        """Write the columns of `row` (which must already exist)"""
+        self.status[row] = self.status_values.encode(todo["status"])
+        self.priority[row] = self.priority_values.encode(todo["priority"])
+        self.tags[row] = self.tag_sets.encode(tuple(todo["tags"]))
+        due = todo.get("due_date")
+        ms = _timestamp_ms(due) if due else MISSING_TIME
+        self.due[row] = ms
+        if due is not None and (ms == MISSING_TIME or _format_day(ms) != due):
+            self._raw_due[row] = due
+        else:
+            self._raw_due.pop(row, None)
+        created = todo.get("created")
+        ms = _timestamp_ms(created)
+        self.created[row] = ms
+        if ms == MISSING_TIME or _format_ms(ms) != created:
+            self._raw_created[row] = created
+        else:
+            self._raw_created.pop(row, None)
+        self.titles.set(row, todo["task"])
+
+    def _append(self, todo: dict):
+        row = len(self.alive)
+        page_id = todo["id"]
+        packed = self._pack_id(page_id)
+        self.ids += packed
+        if packed == hashlib.md5(page_id.encode("utf-8")).digest():
+            self._raw_ids[row] = page_id
+        self.titles.append("")
+        for column in (self.status, self.priority, self.tags, self.due, self.created):
+            column.append(0)
+        self.alive.append(1)
+        self._encode(row, todo)
+        self._order = None
+
+    # --- Mutation -------------------------------------------------------------
+
+    def upsert(self, todo: dict):
+        row = self._find(todo["id"])
+        if row < 0:
+            self._append(todo)
+        else:
+            self._encode(row, todo)
+            self._order = None
+            stale = self.titles.stale
+            if stale > len(self.titles.buffer) - stale and stale > self.COMPACT_MIN_BYTES:
+                self._compact()
+
+    def remove(self, page_id: str):
+        row = self._find(page_id)
+        if row < 0:
+            return
+        self.alive[row] = 0
+        self._dead += 1
+        self.titles.stale += self.titles.lengths[row]
+        self._order = None
+        if self._dead > len(self) and self._dead > self.COMPACT_MIN_ROWS:
+            self._compact()
+
+    def _compact(self):
+        """Rebuild without deleted rows and stale title bytes"""
+        live = [self.row(row) for row in range(len(self.alive)) if self.alive[row]]
+        self.__dict__.update(ColumnarTodos.from_todos(live).__dict__)
+
+    # --- Decoding -------------------------------------------------------------
+
+    def row_id(self, row: int) -> str:
+        raw = self._raw_ids.get(row)
+        if raw is not None:
+            return raw
+        start = row * self.ID_WIDTH
+        digits = self.ids[start:start + self.ID_WIDTH].hex()
+        return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+    def row_created(self, row: int) -> str:
+        # Missing or unparseable values (None included) are kept verbatim
+        if row in self._raw_created:
+            return self._raw_created[row]
+        return _format_ms(self.created[row])
+
+    def row_due(self, row: int) -> Optional[str]:
+        if row in self._raw_due:
+            return self._raw_due[row]
+        ms = self.due[row]
+        return None if ms == MISSING_TIME else _format_day(ms)
+
+    def row(self, row: int, fields: Sequence[str] = None) -> dict:
+        if fields is None:
+            return {
+                "id": self.row_id(row),
+                "task": self.titles.get(row),
+                "tags": list(self.tag_sets.values[self.tags[row]]),
+                "status": self.status_values.values[self.status[row]],
+                "priority": self.priority_values.values[self.priority[row]],
+                "created": self.row_created(row),
+                "due_date": self.row_due(row)
+            }
+        # Only decode the requested columns
+        return {field: self._decoders[field](self, row) for field in fields}
+
+    _decoders = {
+        "id": lambda self, row: self.row_id(row),
+        "task": lambda self, row: self.titles.get(row),
+        "tags": lambda self, row: list(self.tag_sets.values[self.tags[row]]),
+        "status": lambda self, row: self.status_values.values[self.status[row]],
+        "priority": lambda self, row: self.priority_values.values[self.priority[row]],
+        "created": lambda self, row: self.row_created(row),
+        "due_date": lambda self, row: self.row_due(row),
+    }
+
+    def __iter__(self):
+        for row in self.order():
+            yield self.row(row)
+
+    # --- Querying -------------------------------------------------------------
+
+    def order(self) -> array:
+        """Live rows, newest created first (stable for equal timestamps)"""
+        if self._order is None:
+            np = numpy()
+            if np is not None:
+                created = np.frombuffer(self.created, dtype="int64") if len(self.created) else np.zeros(0, "int64")
+                # Stable sort on the negated timestamps keeps insertion order for ties; MISSING_TIME
+                # cannot be negated in int64, so it is mapped past every real timestamp (sorts last)
+                ranked = np.argsort(np.where(created == MISSING_TIME, np.iinfo("int64").max, -created), kind="stable")
+                alive = np.frombuffer(bytes(self.alive), dtype="uint8").astype(bool)
+                self._order = array("I", ranked[alive[ranked]].astype("uint32").tobytes())
+            else:
+                ranked = sorted(range(len(self.alive)), key=self.created.__getitem__, reverse=True)
+                self._order = array("I", (row for row in ranked if self.alive[row]))
+        return self._order
+
+    def _categorical(self, field: str):
+        """(codes column, dictionary) for dictionary-encoded fields"""
+        return {
+            "status": (self.status, self.status_values),
+            "priority": (self.priority, self.priority_values),
+            "tags": (self.tags, self.tag_sets),
+        }.get(field, (None, None))
+
+    def _timestamps(self, field: str):
+        """(timestamp column, verbatim side table, renderer) for created and due_date"""
+        return {
+            "created": (self.created, self._raw_created, _format_ms),
+            "due_date": (self.due, self._raw_due, _format_day),
+        }.get(field, (None, None, None))
+
+    def _lookup_table(self, field: str, predicate, values: Dictionary) -> list:
+        """Evaluate a condition once per distinct value of the column"""
+        if field == "tags":
+            return [predicate({"tags": list(combo or ())}) for combo in values.values]
+        return [predicate({field: value}) for value in values.values]
+
+    @staticmethod
+    def _timestamp_value(ms: int, render):
+        return None if ms == MISSING_TIME else render(ms)
+
+    def _row_predicate(self, filter: dict, now: datetime) -> Callable[[int], bool]:
+        if "and" in filter:
+            parts = [self._row_predicate(part, now) for part in filter["and"]]
+            return lambda row: all(part(row) for part in parts)
+        if "or" in filter:
+            parts = [self._row_predicate(part, now) for part in filter["or"]]
+            return lambda row: any(part(row) for part in parts)
+        field, predicate = compile_condition(filter, now)
+        codes, values = self._categorical(field)
+        if codes is not None:
+            table = self._lookup_table(field, predicate, values)
+            return lambda row: table[codes[row]]
+        column, raw, render = self._timestamps(field)
+        if column is not None:
+            # Evaluated once per distinct timestamp; verbatim values row by row
+            results = {}
+
+            def check(row: int) -> bool:
+                if row in raw:
+                    return predicate({field: raw[row]})
+                ms = column[row]
+                result = results.get(ms)
+                if result is None:
+                    result = results[ms] = predicate({field: self._timestamp_value(ms, render)})
+                return result
+            return check
+        return lambda row: predicate({field: self.titles.get(row)})
+
+    def _mask(self, filter: dict, now: datetime):
+        """Boolean numpy mask over all rows (live or not)"""
+        np = numpy()
+        size = len(self.alive)
+        if "and" in filter or "or" in filter:
+            combine = np.logical_and if "and" in filter else np.logical_or
+            mask = np.full(size, "and" in filter)
+            for part in filter["and" if "and" in filter else "or"]:
+                mask = combine(mask, self._mask(part, now))
+            return mask
+        field, predicate = compile_condition(filter, now)
+        codes, values = self._categorical(field)
+        if codes is not None:
+            table = np.array(self._lookup_table(field, predicate, values), dtype=bool)
+            return table[np.frombuffer(codes, dtype=_NUMPY_TYPES[codes.typecode])] if size else np.zeros(0, bool)
+        column, raw, render = self._timestamps(field)
+        if column is not None:
+            if not size:
+                return np.zeros(0, bool)
+            distinct, inverse = np.unique(np.frombuffer(column, dtype="int64"), return_inverse=True)
+            table = np.array([predicate({field: self._timestamp_value(ms, render)}) for ms in distinct.tolist()], dtype=bool)
+            mask = table[inverse.reshape(-1)]
+            for row, value in raw.items():
+                mask[row] = predicate({field: value})
+            return mask
+        return np.fromiter((predicate({field: self.titles.get(row)}) for row in range(size)), dtype=bool, count=size)
+
+    def matching_rows(self, filter: dict = None, limit: int = None, now: datetime = None) -> list:
+        """Row numbers matching a Notion filter, newest first"""
+        order = self.order()
+        if not filter:
+            return (order[:limit] if limit else order).tolist()
+        now = now or datetime.now(timezone.utc)
+        np = numpy()
+        if np is not None:
+            mask = self._mask(filter, now)
+            ranked = np.frombuffer(order, dtype="uint32") if len(order) else np.zeros(0, "uint32")
+            rows = ranked[mask[ranked]] if len(ranked) else ranked
+            return rows[:limit].tolist() if limit else rows.tolist()
+        predicate = self._row_predicate(filter, now)
+        rows = []
+        for row in order:
+            if predicate(row):
+                rows.append(row)
+                if limit and len(rows) >= limit:
+                    break
+        return rows
+
+    def get(self, page_id: str) -> Optional[dict]:
+        row = self._find(page_id)
+        return self.row(row) if row >= 0 else None
+
+    def select(self, filter: dict = None, limit: int = None, fields: Sequence[str] = None) -> list:
+        return [self.row(row, fields) for row in self.matching_rows(filter, limit)]
+
+    def copy(self) -> "ColumnarTodos":
+        """Frozen copy of the columns
+
+        The append-only dictionaries and the id index (replaced, never
+        modified in place) are shared.
+        """
+        clone = ColumnarTodos.__new__(ColumnarTodos)
+        clone.__dict__.update(self.__dict__)
+        clone.ids = bytearray(self.ids)
+        clone.titles = TextColumn.__new__(TextColumn)
+        clone.titles.buffer = bytearray(self.titles.buffer)
+        clone.titles.offsets = array("I", self.titles.offsets)
+        clone.titles.lengths = array("I", self.titles.lengths)
+        clone.titles.stale = self.titles.stale
+        for name in ("status", "priority", "tags", "due", "created"):
+            column = getattr(self, name)
+            setattr(clone, name, array(column.typecode, column))
+        clone.alive = bytearray(self.alive)
+        clone._raw_ids = dict(self._raw_ids)
+        clone._raw_created = dict(self._raw_created)
+        clone._raw_due = dict(self._raw_due)
+        clone._order = None
+        return clone
+
+    def view(self, filter: dict = None, fields: Sequence[str] = None) -> "ColumnarView":
+        """Matching rows over a frozen copy, decoded only when sliced"""
+        rows = self.matching_rows(filter)
+        return ColumnarView(self.copy(), rows, fields)
+
+    def memory_usage(self) -> int:
+        """Bytes held by the columns, dictionaries, side tables, id index and sort order"""
+        columns = (self.ids, self.titles.buffer, self.titles.offsets, self.titles.lengths, self.status,
+                   self.priority, self.tags, self.due, self.created, self.alive, self._index)
+        total = sum(sys.getsizeof(column) for column in columns)
+        if self._order is not None:
+            total += sys.getsizeof(self._order)
+        for dictionary in (self.status_values, self.priority_values, self.tag_sets):
+            total += sys.getsizeof(dictionary.values) + sys.getsizeof(dictionary.codes)
+            total += sum(sys.getsizeof(value) for value in dictionary.values)
+        total += sum(sys.getsizeof(tag) for combo in self.tag_sets.values if combo for tag in combo)
+        for side_table in (self._raw_ids, self._raw_created, self._raw_due):
+            total += _dict_size(side_table)
+        return total
+
+
+class ColumnarView:
+    """Read-only sequence of todos: row numbers into a frozen ColumnarTodos"""
+
+    def __init__(self, table: ColumnarTodos, rows: list, fields: Sequence[str] = None):
+        self.table = table
+        self.rows = rows
+        self.fields = fields
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.table.row(row, self.fields) for row in self.rows[index]]
+        return self.table.row(self.rows[index], self.fields)
@@ -0,0 +1,1153 @@
+"""
+Todo engine shared by the MCP front ends
+Configuration, Notion access, the local mirror and every tool handler, using
+only the standard library and httpx; tool results are plain content dicts
+"""
+
+from . import startup  # first, so the start-up profile covers the imports below
+import os
+import json
+from datetime import datetime
+import httpx
+from typing import Any, AsyncIterator, Tuple
+from pathlib import Path
+import logging
+import asyncio
+import time
+import weakref
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # keep the engine importable with httpx alone
+    load_dotenv = None
+
+from .cache import TodoMirror
+from .client import NotionClient
+from .metrics import Metrics
+from .encoding import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS, encode_todos
+from .schema import TODO_FIELDS, TodoFormatter, project_todo
+from .singleflight import request_key
+from .snapshots import CursorError, Snapshot, SnapshotStore
+from .sync import DeltaSync
+from .tools import TOOLS
+from .workload import WorkloadRecorder
+
+logger = logging.getLogger('notion_mcp')
+startup.mark("imports")
+
+def load_env_file(path: Path):
+    """Minimal KEY=VALUE reader used when python-dotenv is not installed"""
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export "):].strip()
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        elif " #" in value:
+            value = value.split(" #", 1)[0].rstrip()
+        os.environ.setdefault(key, value)
+
+# Find and load .env file from project root; the host may also pass the settings as environment variables
+project_root = Path(__file__).parent.parent.parent
+env_path = project_root / '.env'
+if env_path.exists():
+    if load_dotenv is not None:
+        load_dotenv(env_path)
+    else:
+        load_env_file(env_path)
+startup.mark("load .env")
+
+# Configuration with validation
+NOTION_API_KEY = os.getenv("NOTION_API_KEY")
+DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
+
+if not NOTION_API_KEY:
+    raise ValueError(f"NOTION_API_KEY not found in the environment or {env_path}")
+if not DATABASE_ID:
+    raise ValueError(f"NOTION_DATABASE_ID not found in the environment or {env_path}")
+
+# Shared Notion client: one keep-alive connection pool for the whole process
+# Per tool and per endpoint counters, reported by the server_stats tool
+metrics = Metrics()
+
+# Written on shutdown when set
+STATS_FILE = os.getenv("NOTION_MCP_STATS_FILE")
+
+# Every tool call is appended here when set (replay with python -m notion_mcp.workload)
+WORKLOAD_LOG = os.getenv("NOTION_MCP_WORKLOAD_LOG")
+workload = WorkloadRecorder(WORKLOAD_LOG) if WORKLOAD_LOG else None
+
+notion = NotionClient.from_env(NOTION_API_KEY, metrics=metrics)
+startup.mark("notion client")
+
+# Global variable to track if database exists
+_database_exists = None
+
+# Local mirror of the database, refreshed after NOTION_CACHE_TTL seconds (0 disables it).
+# With NOTION_TASK_STORE set it lives in a SQLite file and survives restarts.
+CACHE_TTL = float(os.getenv("NOTION_CACHE_TTL", "60"))
+TASK_STORE_PATH = os.getenv("NOTION_TASK_STORE")
+if TASK_STORE_PATH:
+    from .store import TaskStore  # sqlite3 is only loaded when the store is used
+    mirror = TaskStore(TASK_STORE_PATH, ttl=CACHE_TTL, database_id=DATABASE_ID)
+else:
+    mirror = TodoMirror(ttl=CACHE_TTL)
+startup.mark("mirror")
+
+DEFAULT_SORTS = [
+    {
+        "timestamp": "created_time",
+        "direction": "descending"
+    }
+]
+
+# Notion never returns more than 100 rows per query page
+MAX_PAGE_SIZE = 100
+
+async def fetch_todos(filters: dict = None, sorts: list = None, start_cursor: str = None, page_size: int = None, properties: list = None) -> dict:
+    """Fetch one page of todos from Notion database with optional filters
+
+    `properties` (property ids) limits the page properties Notion returns.
+    """
+    query = {"sorts": sorts or DEFAULT_SORTS}
+    params = {"filter_properties": properties} if properties else None
+    
+    if filters:
+        query["filter"] = filters
+    if start_cursor:
+        query["start_cursor"] = start_cursor
+    if page_size:
+        query["page_size"] = min(page_size, MAX_PAGE_SIZE)
+    
+    # Identical concurrent queries (same filter, sorts and cursor) share one request
+    return await notion.read("POST", f"/databases/{DATABASE_ID}/query", json=query, params=params)
+
+async def iter_pages(filter: dict = None, sorts: list = None, page_size: int = MAX_PAGE_SIZE, properties: list = None) -> AsyncIterator[dict]:
+    """Stream raw pages from the database, following next_cursor lazily"""
+    cursor = None
+    while True:
+        data = await fetch_todos(filter, sorts, start_cursor=cursor, page_size=page_size, properties=properties)
+        for page in data.get("results", []):
+            yield page
+        cursor = data.get("next_cursor")
+        if not data.get("has_more") or not cursor:
+            return
+
+async def iter_todo_pages(filter: dict = None, sorts: list = None, page_size: int = MAX_PAGE_SIZE, fields: list = None) -> AsyncIterator[Tuple[list, bool]]:
+    """Stream formatted todos one Notion page at a time, with whether Notion has more
+
+    With `fields`, only the backing properties are downloaded and each todo
+    is reduced to those keys.
+    """
+    await ensure_schema()
+    properties = formatter.property_ids(fields) if fields else None
+    cursor = None
+    while True:
+        data = await fetch_todos(filter, sorts, start_cursor=cursor, page_size=page_size, properties=properties)
+        todos = [format_todo(page) for page in data.get("results", [])]
+        cursor = data.get("next_cursor")
+        has_more = bool(data.get("has_more") and cursor)
+        yield [project_todo(todo, fields) for todo in todos] if fields else todos, has_more
+        if not has_more:
+            return
+
+async def create_todo(task: str, tags: list = None, priority: str = "Moderate", status: str = "To do", due_date: str = None) -> dict:
+    """Create a new todo in Notion with enhanced properties"""
+    properties = {
+        "Task": {
+            "type": "title",
+            "title": [{"type": "text", "text": {"content": task}}]
+        },
+        "Status": {
+            "type": "status",
+            "status": {"name": status}
+        },
+        "Priority": {
+            "type": "select",
+            "select": {"name": priority}
+        }
+    }
+    
+    if tags:
+        properties["Tags"] = {
+            "type": "multi_select",
+            "multi_select": [{"name": tag} for tag in tags]
+        }
+    
+    if due_date:
+        properties["Due date"] = {
+            "type": "date",
+            "date": {"start": due_date}
+        }
+    
+    response = await notion.post(
+        "/pages",
+        json={
+            "parent": {"database_id": DATABASE_ID},
+            "properties": properties
+        }
+    )
+    response.raise_for_status()
+    page = response.json()
+    apply_to_mirror(page)
+    return page
+
+# Default number of pages created in parallel by add_todos (the rate limiter still applies)
+BULK_CONCURRENCY = int(os.getenv("NOTION_BULK_CONCURRENCY", "3"))
+
+async def create_todos(items: list, concurrency: int = None) -> list:
+    """Create several todos concurrently, returning one result per item in input order"""
+    semaphore = asyncio.Semaphore(concurrency or BULK_CONCURRENCY)
+    
+    async def create_one(index: int, item: dict) -> dict:
+        task = item.get("task") if isinstance(item, dict) else None
+        if not task:
+            return {"index": index, "ok": False, "error": "Task is required"}
+        async with semaphore:
+            try:
+                page = await create_todo(
+                    task,
+                    item.get("tags") or [],
+                    item.get("priority") or "Moderate",
+                    item.get("status") or "To do",
+                    item.get("due_date")
+                )
+            except httpx.HTTPError as e:
+                logger.error(f"Error creating todo {task!r}: {str(e)}")
+                return {"index": index, "task": task, "ok": False, "error": str(e)}
+        return {"index": index, "task": task, "ok": True, "id": page["id"]}
+    
+    return await asyncio.gather(*(create_one(index, item) for index, item in enumerate(items)))
+
+# One lock per page id so that writes to the same page never race; entries
+# disappear once no coroutine holds or waits on them
+_page_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def page_lock(page_id: str) -> asyncio.Lock:
+    """Lock serialising writes to one Notion page"""
+    lock = _page_locks.get(page_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _page_locks[page_id] = lock
+    return lock
+
+async def update_todo(page_id: str, status: str = None, priority: str = None, tags: list = None, due_date: str = None) -> dict:
+    """Update todo properties in Notion (only the given ones)"""
+    properties = {}
+    if status:
+        properties["Status"] = {
+            "type": "status",
+            "status": {"name": status}
+        }
+    if priority:
+        properties["Priority"] = {
+            "type": "select",
+            "select": {"name": priority}
+        }
+    if tags is not None:
+        properties["Tags"] = {
+            "type": "multi_select",
+            "multi_select": [{"name": tag} for tag in tags]
+        }
+    if due_date:
+        properties["Due date"] = {
+            "type": "date",
+            "date": {"start": due_date}
+        }
+    if not properties:
+        raise ValueError("Nothing to update")
+    
+    async with page_lock(page_id):
+        # Setting absolute property values is idempotent, so transient errors can be retried
+        response = await notion.patch(
+            f"/pages/{page_id}",
+            json={"properties": properties},
+            idempotent=True
+        )
+        response.raise_for_status()
+        page = response.json()
+    apply_to_mirror(page)
+    return page
+
+async def update_todo_status(page_id: str, status: str) -> dict:
+    """Update todo status in Notion"""
+    return await update_todo(page_id, status=status)
+
+# Notion answers 409 when a page is being edited concurrently
+CONFLICT_RETRIES = 2
+
+async def update_todos(updates: list, concurrency: int = None) -> list:
+    """Apply several updates in parallel across pages, in input order within a page"""
+    semaphore = asyncio.Semaphore(concurrency or BULK_CONCURRENCY)
+    results = [None] * len(updates)
+    by_page = {}
+    for index, update in enumerate(updates):
+        task_id = update.get("task_id") if isinstance(update, dict) else None
+        if not task_id:
+            results[index] = {"index": index, "ok": False, "error": "Task ID is required"}
+        else:
+            by_page.setdefault(task_id, []).append(index)
+    
+    async def apply_one(index: int, update: dict) -> dict:
+        task_id = update["task_id"]
+        retries = 0
+        while True:
+            try:
+                async with semaphore:
+                    await update_todo(
+                        task_id,
+                        status=update.get("status"),
+                        priority=update.get("priority"),
+                        tags=update.get("tags"),
+                        due_date=update.get("due_date")
+                    )
+                return {"index": index, "task_id": task_id, "ok": True, "retries": retries}
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 409 and retries < CONFLICT_RETRIES:
+                    retries += 1
+                    await asyncio.sleep(0.5 * retries)
+                    continue
+                error = str(e)
+            except (httpx.HTTPError, ValueError) as e:
+                error = str(e)
+            logger.error(f"Error updating task {task_id}: {error}")
+            return {"index": index, "task_id": task_id, "ok": False, "retries": retries, "error": error}
+    
+    async def apply_page(indexes: list):
+        for index in indexes:
+            results[index] = await apply_one(index, updates[index])
+    
+    await asyncio.gather(*(apply_page(indexes) for indexes in by_page.values()))
+    return results
+
+# Map English to French tag names for backward compatibility
+TAG_MAPPING = {
+    "Administrative": "Administratif",
+    "Family": "Famille", 
+    "IT": "Informatique",
+    "Productivity": "Productivité",
+    "Project": "Projet",
+    "Quick to finish": "Rapide à terminer",
+    "Work": "Travaux"
+}
+
+def expand_tags(tags: list) -> list:
+    """Return the tags plus their English/French equivalents"""
+    expanded = []
+    for tag in tags:
+        expanded.append(tag)
+        if tag in TAG_MAPPING:
+            expanded.append(TAG_MAPPING[tag])
+        elif tag in TAG_MAPPING.values():
+            # Find the English equivalent
+            for eng, fr in TAG_MAPPING.items():
+                if fr == tag:
+                    expanded.append(eng)
+                    break
+    return expanded
+
+def create_tag_filter(tag: str) -> dict:
+    """Create filter for specific tag - supports both English and French tag names"""
+    # Check both English and French versions
+    tags_to_check = expand_tags([tag])
+    
+    return {
+        "and": [
+            {
+                "or": [
+                    {
+                        "property": "Tags",
+                        "multi_select": {
+                            "contains": tag_variant
+                        }
+                    } for tag_variant in tags_to_check
+                ]
+            },
+            {
+                "property": "Status",
+                "status": {
+                    "does_not_equal": "Done"
+                }
+            },
+            {
+                "property": "Status",
+                "status": {
+                    "does_not_equal": "Killed"
+                }
+            }
+        ]
+    }
+
+def create_priority_filter(priorities: list) -> dict:
+    """Create filter for specific priorities - supports both English and French property names"""
+    return {
+        "and": [
+            {
+                "or": [
+                    {
+                        "property": "Priority",  # Try English first
+                        "select": {
+                            "equals": priority
+                        }
+                    } for priority in priorities
+                ] + [
+                    {
+                        "property": "Priorité",  # Fallback to French
+                        "select": {
+                            "equals": priority
+                        }
+                    } for priority in priorities
+                ]
+            },
+            {
+                "property": "Status",
+                "status": {
+                    "does_not_equal": "Done"
+                }
+            },
+            {
+                "property": "Status",
+                "status": {
+                    "does_not_equal": "Killed"
+                }
+            }
+        ]
+    }
+
+def create_combined_filter(tags: list = None, priorities: list = None, statuses: list = None) -> dict:
+    """Create combined filter for multiple criteria - supports both English and French property names"""
+    filters = []
+    
+    if tags:
+        all_tags_to_check = expand_tags(tags)
+        
+        filters.append({
+            "or": [
+                {
+                    "property": "Tags",
+                    "multi_select": {
+                        "contains": tag
+                    }
+                } for tag in all_tags_to_check
+            ]
+        })
+    
+    if priorities:
+        filters.append({
+            "or": [
+                {
+                    "property": "Priority",  # Try English first
+                    "select": {
+                        "equals": priority
+                    }
+                } for priority in priorities
+            ] + [
+                {
+                    "property": "Priorité",  # Fallback to French
+                    "select": {
+                        "equals": priority
+                    }
+                } for priority in priorities
+            ]
+        })
+    
+    if statuses:
+        filters.append({
+            "or": [
+                {
+                    "property": "Status",
+                    "status": {
+                        "equals": status
+                    }
+                } for status in statuses
+            ]
+        })
+    else:
+        # Default: exclude Done and Killed
+        filters.extend([
+            {
+                "property": "Status",
+                "status": {
+                    "does_not_equal": "Done"
+                }
+            },
+            {
+                "property": "Status",
+                "status": {
+                    "does_not_equal": "Killed"
+                }
+            }
+        ])
+    
+    return {"and": filters}
+
+async def check_database_exists() -> bool:
+    """Check if the configured database exists and is accessible"""
+    global _database_exists
+    
+    if _database_exists is not None:
+        return _database_exists
+    
+    try:
+        response = await notion.get(f"/databases/{DATABASE_ID}")
+    except httpx.HTTPError as e:
+        # Network trouble says nothing about the database: don't cache it
+        logger.warning(f"Could not reach Notion to check the database: {str(e)}")
+        return False
+    if response.status_code == 200:
+        _database_exists = True
+        return True
+    # Only a 404 is a verdict; throttling (429), auth hiccups and 5xx may pass
+    if response.status_code == 404:
+        _database_exists = False
+    return False
+
+async def create_todo_database(database_name: str = "TODO Database") -> dict:
+    """Create a new TODO database with the proper schema"""
+    
+    database_schema = {
+        "parent": {
+            "type": "page_id",
+            "page_id": await get_default_page_id()
+        },
+        "title": [
+            {
+                "type": "text",
+                "text": {
+                    "content": database_name
+                }
+            }
+        ],
+        "properties": {
+            "Task": {
+                "title": {}
+            },
+            "Tags": {
+                "multi_select": {
+                    "options": [
+                        {"name": "Administrative", "color": "red"},
+                        {"name": "Family", "color": "green"},
+                        {"name": "IT", "color": "blue"},
+                        {"name": "Productivity", "color": "purple"},
+                        {"name": "Project", "color": "orange"},
+                        {"name": "Quick to finish", "color": "yellow"},
+                        {"name": "Pro", "color": "gray"},
+                        {"name": "Work", "color": "brown"}
+                    ]
+                }
+            },
+            "Status": {
+                "status": {
+                    "options": [
+                        {"name": "To describe", "color": "gray"},
+                        {"name": "To validate", "color": "yellow"},
+                        {"name": "To do", "color": "red"},
+                        {"name": "Blocked", "color": "orange"},
+                        {"name": "In progress", "color": "blue"},
+                        {"name": "Done", "color": "green"},
+                        {"name": "Killed", "color": "default"}
+                    ],
+                    "groups": [
+                        {
+                            "name": "To do",
+                            "color": "red",
+                            "option_ids": []
+                        },
+                        {
+                            "name": "In progress", 
+                            "color": "blue",
+                            "option_ids": []
+                        },
+                        {
+                            "name": "Done",
+                            "color": "green", 
+                            "option_ids": []
+                        }
+                    ]
+                }
+            },
+            "Priority": {
+                "select": {
+                    "options": [
+                        {"name": "Critical", "color": "red"},
+                        {"name": "Important", "color": "orange"},
+                        {"name": "Moderate", "color": "yellow"},
+                        {"name": "Non-essential", "color": "gray"}
+                    ]
+                }
+            },
+            "Due date": {
+                "date": {}
+            },
+            "Assignee": {
+                "people": {}
+            },
+            "Project": {
+                "relation": {
+                    "database_id": "",
+                    "type": "dual_property",
+                    "dual_property": {}
+                }
+            }
+        }
+    }
+    
+    # Remove empty relation for now
+    del database_schema["properties"]["Project"]
+    
+    response = await notion.post("/databases", json=database_schema)
+    response.raise_for_status()
+    return response.json()
+
+async def get_default_page_id() -> str:
+    """Get a default page ID to use as parent for the database"""
+    # Search for any page in the workspace
+    search = await notion.read(
+        "POST",
+        "/search",
+        json={
+            "filter": {
+                "value": "page",
+                "property": "object"
+            },
+            "page_size": 10
+        }
+    )
+    results = search.get("results", [])
+    
+    # Find a page that can serve as parent (not a database)
+    for result in results:
+        if result.get("object") == "page" and result.get("parent", {}).get("type") != "database_id":
+            return result["id"]
+    
+    # If no suitable page found, try to get any available page
+    if results:
+        return results[0]["id"]
+    
+    # Last resort: fail gracefully
+    raise Exception("No accessible pages found. Please create a page in your Notion workspace first, or provide a specific page ID.")
+
+def apply_to_mirror(page: dict):
+    """Write a page returned by Notion through to the local mirror"""
+    if not mirror.loaded:
+        return
+    if page.get("archived") or page.get("in_trash"):
+        mirror.remove(page["id"])
+    else:
+        mirror.upsert(format_todo(page))
+
+# Whether the last mirror refresh failed to reach Notion
+_mirror_unreachable = False
+
+async def ensure_mirror():
+    """Load or reload the mirror when it is missing or older than its TTL"""
+    if mirror.is_fresh:
+        return
+    async with mirror.refresh_lock:
+        if mirror.is_fresh:
+            return
+        global _mirror_unreachable
+        try:
+            await ensure_schema()
+            await sync.refresh(mirror)
+            _mirror_unreachable = False
+        except httpx.HTTPError as e:
+            if not mirror.loaded:
+                raise
+            # Keep answering from the last synced copy; list_response flags it as stale
+            _mirror_unreachable = True
+            logger.warning(f"Mirror refresh failed, serving stale data: {str(e)}")
+
+def open_snapshot(filter: dict, fields: list = None, limit: int = MAX_PAGE_SIZE) -> Snapshot:
+    """Freeze the todos matching a filter, from the mirror when enabled
+
+    From the mirror, only the first `limit` rows plus one are read; the full
+    result is frozen only when there is a next page for a cursor to point
+    into. Without the mirror the snapshot streams from Notion, fetching
+    further pages only as the client pages through it.
+    """
+    key = request_key(filter, fields)
+    if mirror.enabled:
+        head = mirror.select(filter, limit + 1, fields)
+        if len(head) <= limit:
+            return Snapshot(key, head, synced_at=mirror.synced_at)
+        return Snapshot(key, mirror.snapshot(filter, fields), synced_at=mirror.synced_at)
+    return Snapshot(key, stream=iter_todo_pages(filter, page_size=min(limit, MAX_PAGE_SIZE), fields=fields))
+
+async def list_tool(arguments: Any, **criteria) -> list:
+    """Run a list tool: one page of results, resumable through `cursor`"""
+    fields = get_fields(arguments)
+    output_format = get_output_format(arguments)
+    limit = get_limit(arguments) or LIST_PAGE_SIZE
+    cursor = get_cursor(arguments)
+    filter = create_combined_filter(**criteria)
+    if cursor:
+        try:
+            snapshot, offset = snapshots.resume(cursor, request_key(filter, fields))
+        except CursorError:
+            metrics.cache("snapshots", False)
+            raise
+        metrics.cache("snapshots", True)
+    else:
+        if mirror.enabled:
+            metrics.cache("mirror", mirror.is_fresh)
+            await ensure_mirror()
+        snapshot, offset = open_snapshot(filter, fields, limit), 0
+    formatted_todos, more = await snapshot.page(offset, limit)
+    metrics.tool_rows(len(formatted_todos))
+    next_cursor = snapshots.cursor(snapshot, offset + len(formatted_todos)) if more else None
+    return list_response(formatted_todos, output_format, fields, page_note(snapshot, offset, len(formatted_todos), next_cursor),
+                         staleness_note(snapshot.synced_at))
+
+def page_note(snapshot: Snapshot, offset: int, count: int, next_cursor: str = None) -> str:
+    """Pagination hint appended to partial list results"""
+    if next_cursor is None and offset == 0:
+        return None
+    total = f" of {len(snapshot.rows)}" if snapshot.complete else ""
+    note = f"Showing tasks {offset + 1}-{offset + count}{total}."
+    if next_cursor:
+        note += f' More tasks available: call again with cursor "{next_cursor}".'
+    return note
+
+def staleness_note(synced_at: float = None) -> str:
+    """Age warning appended to list results read from a mirror copy older than its TTL
+
+    This covers a refresh that failed as well as rows served without one: a
+    page resumed from an older snapshot, or a persisted store read as is.
+    """
+    if synced_at is None:
+        return None
+    age = time.time() - synced_at
+    if age < mirror.ttl:
+        return None
+    synced = datetime.fromtimestamp(synced_at).isoformat(timespec="seconds")
+    note = f"showing local data last synced at {synced} ({int(age // 60)} min ago)."
+    if _mirror_unreachable:
+        return f"⚠️ Notion could not be reached: {note}"
+    return f"⚠️ Not refreshed from Notion: {note}"
+
+def list_response(formatted_todos: list, output_format: str = None, fields: list = None, page: str = None,
+                  stale: str = None) -> list:
+    """Build the tool result for a list of formatted todos"""
+    contents = [
+        dict(
+            type="text",
+            text=encode_todos(formatted_todos, output_format or OUTPUT_FORMAT, fields or TODO_FIELDS)
+        )
+    ]
+    for note in (page, stale):
+        if note:
+            contents.append(dict(type="text", text=note))
+    return contents
+
+# Default encoding of list results; compact JSON unless configured otherwise
+OUTPUT_FORMAT = os.getenv("NOTION_OUTPUT_FORMAT", DEFAULT_OUTPUT_FORMAT)
+
+# Tasks per page of list results when the call sets no limit
+LIST_PAGE_SIZE = int(os.getenv("NOTION_LIST_PAGE_SIZE", "100"))
+
+# Paused listings that a cursor can resume
+snapshots = SnapshotStore(
+    max_snapshots=int(os.getenv("NOTION_MAX_SNAPSHOTS", "16")),
+    ttl=float(os.getenv("NOTION_SNAPSHOT_TTL", "600"))
+)
+
+def get_limit(arguments: Any) -> int:
+    """Read the optional `limit` argument of the list tools"""
+    if not isinstance(arguments, dict) or arguments.get("limit") is None:
+        return None
+    limit = int(arguments["limit"])
+    if limit < 1:
+        raise ValueError("Limit must be a positive integer")
+    return limit
+
+def get_cursor(arguments: Any) -> str:
+    """Read the optional `cursor` argument of the list tools"""
+    if not isinstance(arguments, dict) or not arguments.get("cursor"):
+        return None
+    return str(arguments["cursor"])
+
+def get_fields(arguments: Any) -> list:
+    """Read the optional `fields` argument of the list tools"""
+    if not isinstance(arguments, dict) or not arguments.get("fields"):
+        return None
+    fields = arguments["fields"]
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(",")]
+    unknown = [field for field in fields if field not in TODO_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (expected some of {', '.join(TODO_FIELDS)})")
+    return list(dict.fromkeys(fields))
+
+def get_output_format(arguments: Any) -> str:
+    """Read the optional `output_format` argument of the list tools"""
+    if not isinstance(arguments, dict) or not arguments.get("output_format"):
+        return OUTPUT_FORMAT
+    output_format = arguments["output_format"]
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Output format must be one of: {', '.join(OUTPUT_FORMATS)}")
+    return output_format
+
+# Resolves each todo field to its database property once the schema is known;
+# a failed schema fetch is retried after the mirror TTL (60 s without a mirror)
+formatter = TodoFormatter(retry_after=CACHE_TTL or 60.0)
+
+async def ensure_schema():
+    """Compile the property extractor from the database schema (fetched once)"""
+    await formatter.ensure(lambda: notion.read("GET", f"/databases/{DATABASE_ID}"))
+
+def format_todo(todo: dict) -> dict:
+    """Format a todo for display - supports both English and French property names"""
+    return formatter(todo)
+
+async def iter_mirror_pages(filter: dict = None, sorts: list = None, page_size: int = MAX_PAGE_SIZE) -> AsyncIterator[dict]:
+    """Pages for the mirror: only the properties format_todo reads are downloaded"""
+    async for page in iter_pages(filter, sorts, page_size, formatter.property_ids()):
+        yield page
+
+# Keeps the mirror current by pulling only pages edited since the last sync;
+# a full download still happens every NOTION_FULL_RESYNC_INTERVAL seconds
+sync = DeltaSync(iter_mirror_pages, format_todo, float(os.getenv("NOTION_FULL_RESYNC_INTERVAL", "900")))
+
+TOOL_NAMES = frozenset(tool["name"] for tool in TOOLS)
+
+def stats_report() -> dict:
+    """Metrics plus the state of the client, its caches and the mirror"""
+    report = metrics.snapshot()
+    report["caches"]["coalesced_reads"] = {
+        "hits": notion.inflight.shared,
+        "misses": notion.inflight.calls,
+        "hit_ratio": round(notion.inflight.shared / (notion.inflight.shared + notion.inflight.calls), 3) if notion.inflight.calls else None
+    }
+    report["rate_limiter"] = {
+        "requests": notion.limiter.requests,
+        "throttled": notion.limiter.throttled,
+        "total_wait_s": round(notion.limiter.total_wait, 3),
+        "max_wait_s": round(notion.limiter.max_wait, 3)
+    }
+    report["circuit_breaker"] = notion.breaker.stats()
+    memory = mirror.memory_usage() if mirror.loaded else None
+    report["mirror"] = {
+        "enabled": mirror.enabled,
+        "rows": len(mirror) if mirror.loaded else None,
+        "age_s": round(mirror.age, 1) if mirror.age is not None else None,
+        "memory_kib": round(memory / 1024, 1) if memory is not None else None
+    }
+    report["snapshots"] = len(snapshots)
+    if notion.replay is not None:
+        report["cassette"] = dict(notion.replay.stats)
+    return report
+
+def reset_stats():
+    """Start every counter stats_report() shows from zero"""
+    metrics.reset()
+    notion.reset_stats()
+
+async def call_tool(name: str, arguments: Any) -> list:
+    """Handle tool calls for todo management, returning MCP content dicts"""
+    started = time.time()
+    with metrics.tool_call(name if name in TOOL_NAMES else "(unknown)") as stats:
+        errors = stats.errors
+        contents = await run_tool(name, arguments)
+        chars = sum(len(content.get("text", "")) for content in contents)
+        stats.result_chars += chars
+    if workload is not None:
+        workload.record(name, arguments, started, time.time(), chars, stats.errors > errors)
+    return contents
+
+async def run_tool(name: str, arguments: Any) -> list:
+    """Run one tool; failures are reported as text content"""
+    
+    try:
+        if name == "add_todo":
+            if not isinstance(arguments, dict):
+                raise ValueError("Invalid arguments")
+                
+            task = arguments.get("task")
+            tags = arguments.get("tags", [])
+            priority = arguments.get("priority", "Moderate")
+            
+            if not task:
+                raise ValueError("Task is required")
+                
+            result = await create_todo(task, tags, priority)
+            tags_text = f" with tags: {', '.join(tags)}" if tags else ""
+            return [
+                dict(
+                    type="text",
+                    text=f"Added todo: {task} (priority: {priority}){tags_text}"
+                )
+            ]
+            
+        elif name == "add_todos":
+            if not isinstance(arguments, dict):
+                raise ValueError("Invalid arguments")
+            
+            items = arguments.get("tasks")
+            if not items or not isinstance(items, list):
+                raise ValueError("Tasks are required")
+            
+            results = await create_todos(items, arguments.get("concurrency"))
+            created = sum(1 for result in results if result["ok"])
+            return [
+                dict(
+                    type="text",
+                    text=f"Added {created}/{len(results)} todos\n\n" + json.dumps(results, indent=2, ensure_ascii=False)
+                )
+            ]
+            
+        elif name == "show_all_todos":
+            return await list_tool(arguments)
+            
+        elif name == "show_pro_tasks":
+            return await list_tool(arguments, tags=["Pro"])
+            
+        elif name == "show_family_tasks":
+            return await list_tool(arguments, tags=["Family"])
+            
+        elif name == "show_admin_tasks":
+            return await list_tool(arguments, tags=["Administrative"])
+            
+        elif name == "show_quick_tasks":
+            return await list_tool(arguments, tags=["Quick to finish"])
+            
+        elif name == "show_urgent_tasks":
+            return await list_tool(arguments, priorities=["Critical", "Important"])
+            
+        elif name == "show_blocked_tasks":
+            return await list_tool(arguments, statuses=["Blocked"])
+            
+        elif name == "show_tasks_by_tag":
+            if not isinstance(arguments, dict):
+                raise ValueError("Invalid arguments")
+            tag = arguments.get("tag")
+            if not tag:
+                raise ValueError("Tag is required")
+                
+            return await list_tool(arguments, tags=[tag])
+            
+        elif name == "show_tasks_by_priority":
+            if not isinstance(arguments, dict):
+                raise ValueError("Invalid arguments")
+            priority = arguments.get("priority")
+            if not priority:
+                raise ValueError("Priority is required")
+                
+            return await list_tool(arguments, priorities=[priority])
+            
+        elif name == "update_task_status":
+            if not isinstance(arguments, dict):
+                raise ValueError("Invalid arguments")
+                
+            task_id = arguments.get("task_id")
+            status = arguments.get("status")
+            
+            if not task_id:
+                raise ValueError("Task ID is required")
+            if not status:
+                raise ValueError("Status is required")
+                
+            result = await update_todo_status(task_id, status)
+            return [
+                dict(
+                    type="text",
+                    text=f"Updated task status to: {status} (ID: {task_id})"
+                )
+            ]
+            
+        elif name == "bulk_update_tasks":
+            if not isinstance(arguments, dict):
+                raise ValueError("Invalid arguments")
+            
+            updates = arguments.get("updates")
+            if not updates or not isinstance(updates, list):
+                raise ValueError("Updates are required")
+            
+            results = await update_todos(updates, arguments.get("concurrency"))
+            updated = sum(1 for result in results if result["ok"])
+            retried = sum(1 for result in results if result.get("retries"))
+            return [
+                dict(
+                    type="text",
+                    text=f"Updated {updated}/{len(results)} tasks ({retried} needed retries)\n\n" + json.dumps(results, indent=2, ensure_ascii=False)
+                )
+            ]
+            
+        elif name == "check_setup":
+            # Check if database exists and is properly configured
+            exists = await check_database_exists()
+            
+            if exists:
+                # Also verify the schema
+                try:
+                    db_info = await notion.read("GET", f"/databases/{DATABASE_ID}")
+                    
+                    properties = db_info.get('properties', {})
+                    
+                    # Check for required properties (flexible naming)
+                    required_checks = {
+                        'title': ['Tâche', 'Task', 'Name', 'Title'],
+                        'tags': ['Tags', 'Labels', 'Categories'], 
+                        'status': ['Status', 'État', 'State'],
+                        'priority': ['Priorité', 'Priority', 'Importance']
+                    }
+                    
+                    missing_types = []
+                    for prop_type, possible_names in required_checks.items():
+                        found = False
+                        for name in possible_names:
+                            if name in properties:
+                                expected_type = 'title' if prop_type == 'title' else ('multi_select' if prop_type == 'tags' else ('status' if prop_type == 'status' else 'select'))
+                                if properties[name].get('type') == expected_type:
+                                    found = True
+                                    break
+                        if not found:
+                            missing_types.append(prop_type)
+                    
+                    missing_props = missing_types
+                    
+                    if missing_props:
+                        return [
+                            dict(
+                                type="text",
+                                text=f"❌ Database exists but missing required properties: {', '.join(missing_props)}\n\nRun 'setup_todo_database' to create a properly configured database."
+                            )
+                        ]
+                    else:
+                        title = "Unknown"
+                        if db_info.get('title') and len(db_info['title']) > 0:
+                            title = db_info['title'][0].get('text', {}).get('content', 'Unknown')
+                        
+                        return [
+                            dict(
+                                type="text",
+                                text=f"✅ TODO database '{title}' is properly configured!\n\nDatabase ID: {DATABASE_ID}\nRequired properties: ✅ All present\n\nYou can now use all TODO commands like 'show_family_tasks', 'add_todo', etc."
+                            )
+                        ]
+                        
+                except Exception as e:
+                    return [
+                        dict(
+                            type="text",
+                            text=f"❌ Error checking database configuration: {str(e)}\n\nPlease verify your NOTION_DATABASE_ID and integration permissions."
+                        )
+                    ]
+            else:
+                return [
+                    dict(
+                        type="text",
+                        text=f"❌ TODO database not found or not accessible.\n\nDatabase ID: {DATABASE_ID}\n\nOptions:\n1. Run 'setup_todo_database' to create a new database\n2. Check your NOTION_DATABASE_ID in .env\n3. Verify integration permissions in Notion settings"
+                    )
+                ]
+                
+        elif name == "setup_todo_database":
+            # Create a new TODO database
+            if not isinstance(arguments, dict):
+                arguments = {}
+                
+            database_name = arguments.get("database_name", "TODO Database")
+            
+            try:
+                # Check if database already exists
+                exists = await check_database_exists()
+                if exists:
+                    return [
+                        dict(
+                            type="text",
+                            text=f"✅ Database already exists!\n\nDatabase ID: {DATABASE_ID}\n\nRun 'check_setup' to verify the configuration."
+                        )
+                    ]
+                
+                # Create the database
+                result = await create_todo_database(database_name)
+                new_db_id = result["id"]
+                
+                return [
+                    dict(
+                        type="text",
+                        text=f"🎉 Successfully created TODO database '{database_name}'!\n\n📋 Database ID: {new_db_id}\n\n🔧 Next steps:\n1. Update your .env file:\n   NOTION_DATABASE_ID={new_db_id}\n\n2. Restart the MCP server\n\n3. Run 'check_setup' to verify everything works\n\n✨ Your database includes:\n• Tags: Administratif, Famille, Informatique, Productivité, Projet, Rapide à terminer, Pro, Travaux\n• Status: To describe, To validate, To do, Blocked, In progress, Done, Killed\n• Priority: Critical, Important, Moderate, Non-essential\n• Due date and Assignee fields"
+                    )
+                ]
+                
+            except Exception as e:
+                logger.error(f"Error creating database: {str(e)}")
+                return [
+                    dict(
+                        type="text",
+                        text=f"❌ Error creating database: {str(e)}\n\nPlease check:\n1. Your Notion integration has permission to create databases\n2. You have write access to your workspace\n3. Your API token is valid"
+                    )
+                ]
+        
+        elif name == "server_stats":
+            report = stats_report()
+            if isinstance(arguments, dict) and arguments.get("reset"):
+                reset_stats()
+            return [
+                dict(
+                    type="text",
+                    text=json.dumps(report, indent=2, ensure_ascii=False)
+                )
+            ]
+        
+        else:
+            raise ValueError(f"Unknown tool: {name}")
+            
+    except httpx.HTTPError as e:
+        metrics.tool_error()
+        logger.error(f"Notion API error: {str(e)}")
+        return [
+            dict(
+                type="text",
+                text=f"Error with Notion API: {str(e)}\nPlease make sure your Notion integration is properly set up and has access to the database."
+            )
+        ]
+    except Exception as e:
+        metrics.tool_error()
+        logger.error(f"General error: {str(e)}")
+        return [
+            dict(
+                type="text",
+                text=f"Error: {str(e)}"
+            )
+        ]
+
+async def warm_up():
+    """Load the schema and the mirror in the background once the client is initialised
+
+    The first tool call then usually finds them ready instead of paying for
+    the connection setup, schema fetch and initial sync itself.
+    """
+    try:
+        await ensure_schema()
+        if mirror.enabled:
+            await ensure_mirror()
+        logger.info("Warm-up complete")
+    except Exception as e:
+        logger.warning(f"Warm-up failed, loading on first use instead: {str(e)}")
+
+_warm_up_task = None
+
+def start_warm_up():
+    """Schedule warm_up() once, when the client has finished initialising"""
+    global _warm_up_task
+    if _warm_up_task is None:
+        _warm_up_task = asyncio.ensure_future(warm_up())
+
+async def shutdown():
+    """Release the connection pool, the mirror and the workload log, then write NOTION_MCP_STATS_FILE if set"""
+    await notion.aclose()
+    mirror.close()
+    if workload is not None:
+        workload.close()
+    if STATS_FILE:
+        try:
+            metrics.dump(STATS_FILE, stats_report())
+        except OSError as e:
+            logger.warning(f"Could not write stats to {STATS_FILE}: {str(e)}")
+
+startup.mark("handlers")
@@ -0,0 +1,784 @@
+"""
+In-memory emulator of the Notion API subset this server uses
+Databases, queries (compound filters, sorts, cursors), pages and search,
+served as an httpx transport or an ASGI app, with injectable latency,
+429s, 5xx errors and dropped connections
+
+    python -m notion_mcp.emulator --tasks 10000 --throttle-rate 0.05 --port 8765
+    NOTION_API_BASE_URL=http://127.0.0.1:8765/v1 python -m notion_mcp
+"""
+
+import math
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import logging
+import string
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import httpx
+
+from .schema import FIELD_CANDIDATES
+
+MAX_PAGE_SIZE = 100
+
+ERROR_STATUSES = (500, 502, 503, 504)
+
+# Characters of raw property ids; the API returns them URL-encoded (e.g. "%3DiZq")
+PROPERTY_ID_CHARS = string.ascii_letters + string.digits + ":;<=>?@[]^_`{|}~"
+
+# A TODO database like the one setup_todo_database creates, plus a Notes text
+# column so pages carry a realistic amount of content
+TODO_PROPERTIES = {
+    "Task": {"title": {}},
+    "Tags": {"multi_select": {"options": []}},
+    "Status": {"status": {"options": [{"name": name} for name in (
+        "To describe", "To validate", "To do", "Blocked", "In progress", "Done", "Killed")]}},
+    "Priority": {"select": {"options": []}},
+    "Due date": {"date": {}},
+    "Notes": {"rich_text": {}},
+}
+
+TODO_TAGS = ["Administratif", "Famille", "Informatique", "Productivité", "Projet", "Rapide à terminer", "Pro", "Travaux"]
+TODO_PRIORITIES = ["Critical", "Important", "Moderate", "Non-essential"]
+TODO_STATUSES = ["To describe", "To validate", "To do", "Blocked", "In progress", "Done", "Killed"]
+
+# Condition types each property type accepts (a title also takes rich_text conditions)
+CONDITION_TYPES = {
+    "title": ("title", "rich_text"),
+    "rich_text": ("rich_text",),
+    "select": ("select",),
+    "status": ("status",),
+    "multi_select": ("multi_select",),
+    "date": ("date",),
+}
+
+COMPARISONS = {
+    "equals": lambda a, b: a == b,
+    "before": lambda a, b: a < b,
+    "after": lambda a, b: a > b,
+    "on_or_before": lambda a, b: a <= b,
+    "on_or_after": lambda a, b: a >= b,
+}
+
+RELATIVE_DAYS = {"week": 7, "month": 30, "year": 365}
+
+
+def _iso(moment: datetime) -> str:
+    """Notion timestamp: UTC, truncated to the minute like last_edited_time"""
+    return moment.strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+
+def _rich_text(content: str) -> list:
+    return [{"type": "text", "text": {"content": content, "link": None}, "plain_text": content, "href": None}]
+
+
+def _normalize_id(value: str) -> str:
+    """Notion accepts ids with or without dashes"""
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return value
+
+
+def _plain(payload: list) -> str:
+    return "".join(part.get("plain_text") or part.get("text", {}).get("content", "") for part in payload or ())
+
+
+def _instant(value: str) -> datetime:
+    """A date or datetime as an aware UTC datetime; dates and naive times are taken as UTC"""
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+class EmulatorError(Exception):
+    """An API error answered with Notion's error object"""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+    def body(self) -> dict:
+        return {"object": "error", "status": self.status, "code": self.code, "message": self.message}
+
+
+class ConnectionDropped(Exception):
+    """Raised by the ASGI app to abort a response mid-way"""
+
+
+class Faults:
+    """Failure modes injected in front of the emulated API
+
+    - `latency` (+ up to `jitter`) seconds before every response
+    - `rate_limit` requests per second (bursts of `burst`) before 429s with
+      Retry-After, like Notion's own limit; `throttle_rate` adds random 429s
+    - `error_rate` of requests fail with one of `error_statuses`
+    - `drop_rate` of connections drop before the request is processed, and
+      `lost_response_rate` drop after it was (a write that did happen)
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_limit: float = 0.0, burst: int = 3,
+                 throttle_rate: float = 0.0, retry_after: float = 1.0, error_rate: float = 0.0,
+                 error_statuses: Tuple[int, ...] = ERROR_STATUSES, drop_rate: float = 0.0,
+                 lost_response_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.drop_rate = drop_rate
+        self.lost_response_rate = lost_response_rate
+        self.random = random.Random(seed)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def delay(self) -> float:
+        return self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def throttle(self) -> Optional[float]:
+        """Retry-After in seconds when this request is rate limited"""
+        if self.rate_limit > 0:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_limit)
+            self._updated = now
+            if self._tokens < 1:
+                return max(1.0, math.ceil((1 - self._tokens) / self.rate_limit))
+            self._tokens -= 1
+        if self.throttle_rate and self.random.random() < self.throttle_rate:
+            return self.retry_after
+        return None
+
+    def chance(self, rate: float) -> bool:
+        return bool(rate) and self.random.random() < rate
+
+
+class NotionEmulator:
+    """Notion databases, pages and search held in memory
+
+    Property values are stored by reference as sent (or generated) and are
+    replaced, never mutated, by updates. Filters are evaluated on those raw
+    property values, separately from notion_mcp.filters, so the emulator can
+    be used to check the local evaluation; each query's matches are
+    computed once per database version and paged through by cursor.
+
+    With `strict_filters`, conditions on properties missing from the schema
+    are rejected with a 400 like Notion does; otherwise they are answered
+    from the property holding the same todo field (Priorité for Priority).
+    """
+
+    def __init__(self, faults: Optional[Faults] = None, api_key: Optional[str] = None,
+                 strict_filters: bool = False, seed: Optional[int] = None):
+        self.faults = faults if faults is not None else Faults()
+        self.api_key = api_key
+        self.strict_filters = strict_filters
+        self.random = random.Random(seed)
+        self.databases: Dict[str, dict] = {}
+        self.pages: Dict[str, dict] = {}
+        self.workspace_pages: List[str] = []
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "dropped": 0}
+        self._queries: Dict[tuple, Tuple[int, list]] = {}
+        self.root_page_id = self.add_workspace_page("Workspace")
+
+    # --- Data ----------------------------------------------------------------
+
+    def _new_id(self) -> str:
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def _now(self) -> str:
+        return _iso(datetime.now(timezone.utc))
+
+    def add_workspace_page(self, title: str) -> str:
+        """A standalone page, usable as the parent of new databases"""
+        page_id = self._new_id()
+        now = self._now()
+        self.pages[page_id] = {
+            "id": page_id, "created_time": now, "last_edited_time": now, "archived": False,
+            "parent": {"type": "workspace", "workspace": True}, "database_id": None,
+            "properties": {"title": {"title": _rich_text(title)}},
+        }
+        self.workspace_pages.append(page_id)
+        return page_id
+
+    def create_database(self, properties: dict, title: str = "TODO Database", parent_id: str = None,
+                        database_id: str = None) -> dict:
+        """Create a database from a POST /databases style property schema"""
+        schema = {}
+        for name, config in properties.items():
+            prop_type = next((key for key in config if key not in ("id", "name", "type")), None) or config.get("type")
+            if prop_type is None:
+                raise EmulatorError(400, "validation_error", f"Property {name!r} has no type.")
+            options = (config.get(prop_type) or {})
+            prop_id = "title" if prop_type == "title" else quote("".join(self.random.choice(PROPERTY_ID_CHARS) for _ in range(4)), safe="")
+            prop = {"id": prop_id, "name": name, "type": prop_type, prop_type: dict(options)}
+            if prop_type in ("select", "multi_select", "status"):
+                prop[prop_type]["options"] = [dict(option, id=option.get("id") or self._new_id()[:8])
+                                              for option in options.get("options", [])]
+            schema[name] = prop
+        if sum(1 for prop in schema.values() if prop["type"] == "title") != 1:
+            raise EmulatorError(400, "validation_error", "A database needs exactly one title property.")
+        database_id = database_id or self._new_id()
+        now = self._now()
+        self.databases[database_id] = {
+            "id": database_id,
+            "created_time": now,
+            "last_edited_time": now,
+            "title": _rich_text(title),
+            "parent": {"type": "page_id", "page_id": parent_id or self.root_page_id},
+            "properties": schema,
+            "rows": {},
+            "version": 0,
+        }
+        return self.database_object(database_id)
+
+    def database(self, database_id: str) -> dict:
+        database = self.databases.get(database_id) or self.databases.get(_normalize_id(database_id))
+        if database is None:
+            raise EmulatorError(404, "object_not_found", f"Could not find database with ID: {database_id}.")
+        return database
+
+    def database_object(self, database_id: str) -> dict:
+        database = self.database(database_id)
+        return {
+            "object": "database",
+            "id": database["id"],
+            "created_time": database["created_time"],
+            "last_edited_time": database["last_edited_time"],
+            "title": database["title"],
+            "parent": database["parent"],
+            "archived": False,
+            "is_inline": False,
+            "properties": database["properties"],
+        }
+
+    def _values(self, database: dict, properties: dict) -> dict:
+        """Validate property values as sent by a client; returns {name: {type: payload}}"""
+        schema = database["properties"]
+        by_id = {unquote(prop["id"]): prop for prop in schema.values()}
+        values = {}
+        for key, value in properties.items():
+            prop = schema.get(key) or by_id.get(unquote(key))
+            if prop is None:
+                raise EmulatorError(400, "validation_error", f"{key} is not a property that exists.")
+            prop_type = prop["type"]
+            if prop_type not in value:
+                raise EmulatorError(400, "validation_error", f"{prop['name']} is expected to be {prop_type}.")
+            payload = value[prop_type]
+            if prop_type in ("title", "rich_text"):
+                payload = [dict(part, plain_text=part.get("text", {}).get("content", "")) for part in payload or ()]
+            elif prop_type in ("select", "status") and payload is not None:
+                payload = self._option(prop, payload)
+            elif prop_type == "multi_select":
+                payload = [self._option(prop, option) for option in payload or ()]
+            values[prop["name"]] = {prop_type: payload}
+        return values
+
+    def _option(self, prop: dict, option: dict) -> dict:
+        options = prop[prop["type"]].setdefault("options", [])
+        for known in options:
+            if known["name"] == option.get("name") or known.get("id") == option.get("id"):
+                return {"id": known["id"], "name": known["name"], "color": known.get("color", "default")}
+        if prop["type"] == "status":
+            raise EmulatorError(400, "validation_error", f"Invalid status option: {option.get('name')!r}.")
+        # Notion adds unknown select options to the schema
+        known = {"id": self._new_id()[:8], "name": option["name"], "color": option.get("color", "default")}
+        options.append(known)
+        return dict(known)
+
+    def insert(self, database_id: str, values: dict, created_time: str = None) -> str:
+        """Add a row from already validated {name: {type: payload}} values (no copy)"""
+        database = self.database(database_id)
+        page_id = self._new_id()
+        created = created_time or self._now()
+        page = {"id": page_id, "created_time": created, "last_edited_time": created, "archived": False,
+                "parent": {"type": "database_id", "database_id": database["id"]}, "database_id": database["id"],
+                "properties": values}
+        self.pages[page_id] = page
+        database["rows"][page_id] = page
+        database["version"] += 1
+        return page_id
+
+    def update(self, page_id: str, values: dict = None, archived: bool = None):
+        page = self.page_record(page_id)
+        if values:
+            page["properties"] = dict(page["properties"], **values)
+        if archived is not None:
+            page["archived"] = archived
+        page["last_edited_time"] = self._now()
+        if page["database_id"]:
+            self.databases[page["database_id"]]["version"] += 1
+
+    def page_record(self, page_id: str) -> dict:
+        page = self.pages.get(page_id) or self.pages.get(_normalize_id(page_id))
+        if page is None:
+            raise EmulatorError(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+        return page
+
+    def page_object(self, page: dict, property_ids: Optional[List[str]] = None) -> dict:
+        """Render a page as the API returns it, optionally limited to some property ids"""
+        schema = self.databases[page["database_id"]]["properties"] if page["database_id"] else None
+        properties = {}
+        if schema is None:
+            properties["title"] = {"id": "title", "type": "title", **page["properties"]["title"]}
+        else:
+            for name, prop in schema.items():
+                if property_ids is not None and unquote(prop["id"]) not in property_ids and prop["id"] not in property_ids:
+                    continue
+                prop_type = prop["type"]
+                value = page["properties"].get(name) or {prop_type: [] if prop_type in ("title", "rich_text", "multi_select", "people") else None}
+                properties[name] = {"id": prop["id"], "type": prop_type, **value}
+        return {
+            "object": "page",
+            "id": page["id"],
+            "created_time": page["created_time"],
+            "last_edited_time": page["last_edited_time"],
+            "archived": page["archived"],
+            "in_trash": page["archived"],
+            "parent": page["parent"],
+            "url": f"https://www.notion.so/{page['id'].replace('-', '')}",
+            "properties": properties,
+        }
+
+    def page_ids(self, database_id: str) -> List[str]:
+        return [page_id for page_id, page in self.database(database_id)["rows"].items() if not page["archived"]]
+
+    def seed_todos(self, count: int, database_id: str = None, seed: int = 1, notes: int = 200) -> str:
+        """Create (or fill) a TODO database with `count` synthetic tasks; returns its id
+
+        Tasks are created one minute apart, ending now. Values are shared
+        between rows where they are equal, so 100k tasks stay affordable.
+        """
+        if database_id is None or database_id not in self.databases:
+            database_id = self.create_database(TODO_PROPERTIES, database_id=database_id)["id"]
+        database = self.databases[database_id]
+        generator = random.Random(seed)
+
+        def choice(prop_name, names):
+            prop = database["properties"][prop_name]
+            return [self._option(prop, {"name": name}) for name in names]
+
+        statuses = [{"status": option} for option in choice("Status", TODO_STATUSES)]
+        priorities = [{"select": option} for option in choice("Priority", TODO_PRIORITIES)]
+        tags = choice("Tags", TODO_TAGS)
+        notes_value = {"rich_text": _rich_text("n" * notes)} if notes else None
+        start = datetime.now(timezone.utc) - timedelta(minutes=count)
+        for index in range(count):
+            values = {
+                "Task": {"title": _rich_text(f"Task {index}")},
+                "Tags": {"multi_select": generator.sample(tags, generator.randint(0, 2))},
+                "Status": generator.choice(statuses),
+                "Priority": generator.choice(priorities),
+            }
+            if generator.random() < 0.3:
+                values["Due date"] = {"date": {"start": (start + timedelta(days=index % 90)).strftime("%Y-%m-%d"), "end": None, "time_zone": None}}
+            if notes_value:
+                values["Notes"] = notes_value
+            self.insert(database_id, values, _iso(start + timedelta(minutes=index)))
+        return database_id
+
+    # --- Queries -------------------------------------------------------------
+
+    def _predicate(self, database: dict, filter: dict, now: datetime = None):
+        if not filter:
+            return lambda page: True
+        now = now or datetime.now(timezone.utc)
+        if "and" in filter or "or" in filter:
+            parts = [self._predicate(database, part, now) for part in filter.get("and", filter.get("or"))]
+            combine = all if "and" in filter else any
+            return lambda page: combine(part(page) for part in parts)
+        if "timestamp" in filter:
+            return self._timestamp_condition(filter, now)
+        prop = self._filter_property(database, filter)
+        name, prop_type = prop["name"], prop["type"]
+        condition_type = next((key for key in CONDITION_TYPES.get(prop_type, ()) if key in filter), None)
+        if condition_type is None:
+            raise EmulatorError(400, "validation_error", f"{name} is a {prop_type} property; the filter does not match its type.")
+        operator, value = self._operator(filter[condition_type])
+        if prop_type in ("title", "rich_text"):
+            check, read = self._text_condition(operator, value), _plain
+        elif prop_type in ("select", "status"):
+            check, read = self._choice_condition(operator, value), lambda payload: payload["name"] if payload else None
+        elif prop_type == "multi_select":
+            check, read = self._multi_select_condition(operator, value), lambda payload: [option["name"] for option in payload or ()]
+        else:
+            check, read = self._date_condition(operator, value, now), lambda payload: payload["start"] if payload else None
+        return lambda page: check(read((page["properties"].get(name) or {}).get(prop_type)))
+
+    def _filter_property(self, database: dict, filter: dict) -> dict:
+        """Schema property a condition names, by name or id"""
+        known = database["properties"]
+        name = filter.get("property") or ""
+        prop = known.get(name) or next((prop for prop in known.values() if unquote(prop["id"]) == unquote(name)), None)
+        if prop is None and not self.strict_filters:
+            # Lenient: another name of the same todo field, e.g. Priorité for Priority
+            for _, names in FIELD_CANDIDATES.values():
+                if name in names:
+                    prop = next((known[alias] for alias in names if alias in known), None)
+        if prop is None:
+            raise EmulatorError(400, "validation_error", f"Could not find property with name or id: {name}")
+        return prop
+
+    @staticmethod
+    def _operator(payload) -> Tuple[str, object]:
+        if not isinstance(payload, dict) or len(payload) != 1:
+            raise EmulatorError(400, "validation_error", f"A filter condition needs exactly one operator, got {payload}.")
+        return next(iter(payload.items()))
+
+    @staticmethod
+    def _text_condition(operator: str, value):
+        if operator == "is_empty":
+            return lambda text: not text
+        if operator == "is_not_empty":
+            return lambda text: bool(text)
+        if not isinstance(value, str):
+            raise EmulatorError(400, "validation_error", f"Text filter {operator} expects a string.")
+        needle = value.lower()
+        checks = {
+            "equals": lambda text: text == value,
+            "does_not_equal": lambda text: text != value,
+            "contains": lambda text: needle in text.lower(),
+            "does_not_contain": lambda text: needle not in text.lower(),
+            "starts_with": lambda text: text.lower().startswith(needle),
+            "ends_with": lambda text: text.lower().endswith(needle),
+        }
+        if operator not in checks:
+            raise EmulatorError(400, "validation_error", f"Unsupported text filter: {operator}.")
+        return checks[operator]
+
+    @staticmethod
+    def _choice_condition(operator: str, value):
+        checks = {
+            "equals": lambda name: name == value,
+            "does_not_equal": lambda name: name != value,
+            "is_empty": lambda name: name is None,
+            "is_not_empty": lambda name: name is not None,
+        }
+        if operator not in checks:
+            raise EmulatorError(400, "validation_error", f"Unsupported select filter: {operator}.")
+        return checks[operator]
+
+    @staticmethod
+    def _multi_select_condition(operator: str, value):
+        checks = {
+            "contains": lambda names: value in names,
+            "does_not_contain": lambda names: value not in names,
+            "is_empty": lambda names: not names,
+            "is_not_empty": lambda names: bool(names),
+        }
+        if operator not in checks:
+            raise EmulatorError(400, "validation_error", f"Unsupported multi_select filter: {operator}.")
+        return checks[operator]
+
+    @staticmethod
+    def _date_condition(operator: str, value, now: datetime):
+        """Condition over the start of a date (None when empty)
+
+        Date-only values compare whole UTC days, datetimes compare instants
+        and the relative operators cover whole days around today.
+        """
+        if operator == "is_empty":
+            return lambda start: start is None
+        if operator == "is_not_empty":
+            return lambda start: start is not None
+        today = now.date()
+        if operator == "this_week":
+            first = today - timedelta(days=today.weekday())
+            return lambda start: start is not None and first <= _instant(start).date() < first + timedelta(days=7)
+        direction, _, period = operator.partition("_")
+        if direction in ("past", "next") and period in RELATIVE_DAYS:
+            days = timedelta(days=RELATIVE_DAYS[period])
+            first, last = (today - days, today) if direction == "past" else (today, today + days)
+            return lambda start: start is not None and first <= _instant(start).date() <= last
+        compare = COMPARISONS.get(operator)
+        if compare is None:
+            raise EmulatorError(400, "validation_error", f"Unsupported date filter: {operator}.")
+        try:
+            bound = _instant(value)
+        except (TypeError, ValueError, AttributeError):
+            raise EmulatorError(400, "validation_error", f"Invalid date: {value!r}.")
+        if len(value) == 10:
+            day = bound.date()
+            return lambda start: start is not None and compare(_instant(start).date(), day)
+        return lambda start: start is not None and compare(_instant(start), bound)
+
+    def _timestamp_condition(self, filter: dict, now: datetime):
+        timestamp = filter["timestamp"]
+        if timestamp not in ("created_time", "last_edited_time") or timestamp not in filter:
+            raise EmulatorError(400, "validation_error", f"Unsupported timestamp filter: {timestamp}.")
+        operator, value = self._operator(filter[timestamp])
+        if timestamp == "last_edited_time" and operator == "equals":
+            # last_edited_time is kept to the minute
+            return lambda page: page[timestamp][:16] == value[:16]
+        check = self._date_condition(operator, value, now)
+        return lambda page: check(page[timestamp])
+
+    def _sort_key(self, database: dict, sort: dict):
+        if "timestamp" in sort:
+            field = sort["timestamp"]
+            if field not in ("created_time", "last_edited_time"):
+                raise EmulatorError(400, "validation_error", f"Invalid sort timestamp: {field}.")
+            return lambda page: page[field]
+        prop = database["properties"].get(sort.get("property"))
+        if prop is None:
+            raise EmulatorError(400, "validation_error", f"Could not find sort property with name or id: {sort.get('property')}")
+        name, prop_type = prop["name"], prop["type"]
+
+        def key(page):
+            payload = (page["properties"].get(name) or {}).get(prop_type)
+            if prop_type in ("title", "rich_text"):
+                return _plain(payload)
+            if prop_type in ("select", "status"):
+                return payload["name"] if payload else ""
+            if prop_type == "date":
+                return payload["start"] if payload else ""
+            if prop_type == "multi_select":
+                return ",".join(option["name"] for option in payload or ())
+            return str(payload if payload is not None else "")
+        return key
+
+    def _matches(self, database: dict, body: dict) -> list:
+        key = (database["id"], json.dumps([body.get("filter"), body.get("sorts")], sort_keys=True))
+        cached = self._queries.get(key)
+        if cached is not None and cached[0] == database["version"]:
+            return cached[1]
+        predicate = self._predicate(database, body.get("filter"))
+        matches = [page for page in database["rows"].values() if not page["archived"] and predicate(page)]
+        sorts = body.get("sorts") or [{"timestamp": "created_time", "direction": "descending"}]
+        for sort in reversed(sorts):
+            matches.sort(key=self._sort_key(database, sort), reverse=sort.get("direction") == "descending")
+        if len(self._queries) > 256:
+            self._queries.clear()
+        self._queries[key] = (database["version"], matches)
+        return matches
+
+    def _page_window(self, items: list, body: dict) -> Tuple[list, bool, Optional[str]]:
+        page_size = body.get("page_size", MAX_PAGE_SIZE)
+        if not isinstance(page_size, int) or not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise EmulatorError(400, "validation_error", f"body.page_size should be a number between 1 and {MAX_PAGE_SIZE}.")
+        start = 0
+        if body.get("start_cursor"):
+            try:
+                start = int(uuid.UUID(body["start_cursor"]).int & 0xFFFFFFFF)
+            except (ValueError, TypeError):
+                raise EmulatorError(400, "validation_error", "body.start_cursor should be a valid cursor.")
+        end = start + page_size
+        more = end < len(items)
+        # Cursors look like Notion's (a UUID); the offset is packed into the last bits
+        cursor = str(uuid.UUID(int=(self.random.getrandbits(96) << 32) | end)) if more else None
+        return items[start:end], more, cursor
+
+    def query(self, database_id: str, body: dict, property_ids: Optional[List[str]] = None) -> dict:
+        database = self.database(database_id)
+        window, more, cursor = self._page_window(self._matches(database, body), body)
+        return {
+            "object": "list",
+            "results": [self.page_object(page, property_ids) for page in window],
+            "next_cursor": cursor,
+            "has_more": more,
+            "type": "page_or_database",
+            "page_or_database": {},
+        }
+
+    def search(self, body: dict) -> dict:
+        wanted = (body.get("filter") or {}).get("value")
+        query = (body.get("query") or "").lower()
+        items = []
+        if wanted in (None, "page"):
+            for page_id in self.workspace_pages:
+                page = self.pages[page_id]
+                if query in _plain(page["properties"]["title"]["title"]).lower():
+                    items.append(self.page_object(page))
+        if wanted in (None, "database"):
+            for database_id, database in self.databases.items():
+                if query in _plain(database["title"]).lower():
+                    items.append(self.database_object(database_id))
+        window, more, cursor = self._page_window(items, body)
+        return {"object": "list", "results": window, "next_cursor": cursor, "has_more": more, "type": "page_or_database", "page_or_database": {}}
+
+    # --- HTTP ----------------------------------------------------------------
+
+    def dispatch(self, method: str, path: str, params: Dict[str, List[str]], body: dict) -> Tuple[int, dict]:
+        """Answer one API call (no faults); returns (status, JSON body)"""
+        parts = path.split("/v1/", 1)[-1].strip("/").split("/")
+        try:
+            if parts[0] == "databases":
+                if len(parts) == 1 and method == "POST":
+                    parent = (body.get("parent") or {}).get("page_id")
+                    if parent is not None:
+                        self.page_record(parent)
+                    title = _plain(body.get("title")) or "Untitled"
+                    return 200, self.create_database(body.get("properties") or {}, title, parent)
+                if len(parts) == 2 and method == "GET":
+                    return 200, self.database_object(parts[1])
+                if len(parts) == 3 and parts[2] == "query" and method == "POST":
+                    return 200, self.query(parts[1], body, params.get("filter_properties") or None)
+            elif parts[0] == "pages":
+                if len(parts) == 1 and method == "POST":
+                    database_id = (body.get("parent") or {}).get("database_id")
+                    if not database_id:
+                        raise EmulatorError(400, "validation_error", "body.parent.database_id should be defined.")
+                    database = self.database(database_id)
+                    page_id = self.insert(database["id"], self._values(database, body.get("properties") or {}))
+                    return 200, self.page_object(self.pages[page_id])
+                if len(parts) == 2 and method in ("GET", "PATCH"):
+                    page = self.page_record(parts[1])
+                    if method == "PATCH":
+                        values = None
+                        if body.get("properties"):
+                            if not page["database_id"]:
+                                raise EmulatorError(400, "validation_error", "Only database pages have properties.")
+                            values = self._values(self.databases[page["database_id"]], body["properties"])
+                        archived = body.get("archived", body.get("in_trash"))
+                        self.update(page["id"], values, archived)
+                    return 200, self.page_object(page, params.get("filter_properties") or None)
+            elif parts == ["search"] and method == "POST":
+                return 200, self.search(body)
+            raise EmulatorError(400, "invalid_request_url", "Invalid request URL.")
+        except EmulatorError as e:
+            return e.status, e.body()
+
+    def _check_headers(self, headers) -> Optional[EmulatorError]:
+        authorization = headers.get("authorization", "")
+        if not authorization.startswith("Bearer ") or (self.api_key and authorization[7:] != self.api_key):
+            return EmulatorError(401, "unauthorized", "API token is invalid.")
+        if not headers.get("notion-version"):
+            return EmulatorError(400, "missing_version", "Notion-Version header failed validation.")
+        return None
+
+    async def respond(self, method: str, path: str, params: Dict[str, List[str]], headers, content: bytes) -> Tuple[int, dict, Optional[dict]]:
+        """Apply faults and answer; returns (status, headers, body), body None meaning a dropped connection"""
+        self.stats["requests"] += 1
+        faults = self.faults
+        delay = faults.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if faults.chance(faults.drop_rate):
+            self.stats["dropped"] += 1
+            return 0, {}, None
+        retry_after = faults.throttle()
+        if retry_after is not None:
+            self.stats["throttled"] += 1
+            error = EmulatorError(429, "rate_limited", "You have been rate limited. Please try again in a few minutes.")
+            return 429, {"Retry-After": f"{retry_after:g}"}, error.body()
+        if faults.chance(faults.error_rate):
+            self.stats["errors"] += 1
+            status = faults.random.choice(faults.error_statuses)
+            code = "service_unavailable" if status == 503 else "internal_server_error"
+            return status, {}, EmulatorError(status, code, "Notion encountered an error.").body()
+        error = self._check_headers(headers)
+        if error is not None:
+            return error.status, {}, error.body()
+        try:
+            body = json.loads(content) if content else {}
+        except ValueError:
+            return 400, {}, EmulatorError(400, "invalid_json", "Error parsing JSON body.").body()
+        status, payload = self.dispatch(method, path, params, body)
+        if faults.chance(faults.lost_response_rate):
+            self.stats["dropped"] += 1
+            return 0, {}, None
+        return status, {}, payload
+
+    @property
+    def transport(self) -> "EmulatorTransport":
+        return EmulatorTransport(self)
+
+    async def __call__(self, scope, receive, send):
+        """ASGI entry point"""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        content = b""
+        while True:
+            message = await receive()
+            content += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        params: Dict[str, List[str]] = {}
+        for key, value in httpx.QueryParams(scope.get("query_string", b"").decode("latin-1")).multi_items():
+            params.setdefault(key, []).append(value)
+        headers = httpx.Headers([(key.decode("latin-1"), value.decode("latin-1")) for key, value in scope["headers"]])
+        status, extra_headers, body = await self.respond(scope["method"], scope["path"], params, headers, content)
+        if body is None:
+            # Start a response that never completes, so the client sees the connection drop
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"1024")]})
+            raise ConnectionDropped("Connection dropped by the emulator")
+        data = json.dumps(body).encode("utf-8")
+        response_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]
+        response_headers += [(key.lower().encode(), value.encode()) for key, value in extra_headers.items()]
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": data})
+
+
+class EmulatorTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering every request from a NotionEmulator"""
+
+    def __init__(self, emulator: NotionEmulator):
+        self.emulator = emulator
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        params: Dict[str, List[str]] = {}
+        for key, value in request.url.params.multi_items():
+            params.setdefault(key, []).append(value)
+        content = await request.aread()
+        status, headers, body = await self.emulator.respond(request.method, request.url.path, params, request.headers, content)
+        if body is None:
+            raise httpx.RemoteProtocolError("Server disconnected without sending a response.", request=request)
+        return httpx.Response(status, headers=headers, json=body, request=request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an in-memory Notion API emulator over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tasks", type=int, default=100, help="synthetic tasks in the TODO database")
+    parser.add_argument("--database-id", help="id of the TODO database (random by default)")
+    parser.add_argument("--api-key", help="only accept this integration token")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429s (Notion: about 3)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with a 5xx")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of connections dropped before processing")
+    parser.add_argument("--lost-response-rate", type=float, default=0.0, help="share of responses dropped after processing")
+    parser.add_argument("--strict-filters", action="store_true", help="reject filters on properties the database lacks")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        parser.exit(1, "Serving over HTTP needs uvicorn (pip install uvicorn); in-process use only needs httpx\n")
+
+    faults = Faults(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, rate_limit=args.rate_limit,
+                    throttle_rate=args.throttle_rate, error_rate=args.error_rate, drop_rate=args.drop_rate,
+                    lost_response_rate=args.lost_response_rate, seed=args.seed)
+    emulator = NotionEmulator(faults, api_key=args.api_key, strict_filters=args.strict_filters, seed=args.seed)
+    database_id = emulator.seed_todos(args.tasks, args.database_id, seed=args.seed or 1)
+    # Injected drops are expected: keep their tracebacks out of the server log
+    logging.getLogger("uvicorn.error").addFilter(
+        lambda record: not (record.exc_info and isinstance(record.exc_info[1], ConnectionDropped)))
+    print(f"NOTION_API_BASE_URL=http://{args.host}:{args.port}/v1")
+    print(f"NOTION_DATABASE_ID={database_id}")
+    uvicorn.run(emulator, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
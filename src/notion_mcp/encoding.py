@@ -0,0 +1,89 @@
+"""
+Encoders for list tool results
+Compact JSON, NDJSON, TSV and Markdown tables built from formatted todos
+"""
+
+import json
+from typing import Iterable, Iterator, Sequence
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding
+    orjson = None
+
+from .schema import TODO_FIELDS
+
+OUTPUT_FORMATS = ("json", "ndjson", "tsv", "markdown_table")
+DEFAULT_OUTPUT_FORMAT = "json"
+
+if orjson is not None:
+    def dumps(value) -> str:
+        """Compact JSON text, non-ASCII characters kept as is"""
+        return orjson.dumps(value).decode("utf-8")
+
+    def dumps_bytes(value) -> bytes:
+        """Compact UTF-8 encoded JSON"""
+        return orjson.dumps(value)
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(value) -> str:
+        """Compact JSON text, non-ASCII characters kept as is"""
+        return _encoder.encode(value)
+
+    def dumps_bytes(value) -> bytes:
+        """Compact UTF-8 encoded JSON"""
+        return _encoder.encode(value).encode("utf-8")
+
+
+def _cell(value) -> str:
+    """Flatten a todo value into a single table cell"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(value)
+    return str(value)
+
+
+def _tsv_cell(value) -> str:
+    return _cell(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _markdown_cell(value) -> str:
+    return _cell(value).replace("|", "\\|").replace("\r", "").replace("\n", "<br>")
+
+
+def iter_encode(todos: Iterable[dict], output_format: str = DEFAULT_OUTPUT_FORMAT,
+                fields: Sequence[str] = TODO_FIELDS) -> Iterator[str]:
+    """Yield the encoded result in chunks (one per todo plus framing)
+
+    `fields` selects and orders the columns of the tabular formats; the JSON
+    formats encode each todo dict as given.
+    """
+    if output_format == "json":
+        first = True
+        yield "["
+        for todo in todos:
+            yield dumps(todo) if first else "," + dumps(todo)
+            first = False
+        yield "]"
+    elif output_format == "ndjson":
+        for todo in todos:
+            yield dumps(todo) + "\n"
+    elif output_format == "tsv":
+        yield "\t".join(fields) + "\n"
+        for todo in todos:
+            yield "\t".join(_tsv_cell(todo.get(field)) for field in fields) + "\n"
+    elif output_format == "markdown_table":
+        yield "| " + " | ".join(fields) + " |\n"
+        yield "|" + "---|" * len(fields) + "\n"
+        for todo in todos:
+            yield "| " + " | ".join(_markdown_cell(todo.get(field)) for field in fields) + " |\n"
+    else:
+        raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+
+
+def encode_todos(todos: Iterable[dict], output_format: str = DEFAULT_OUTPUT_FORMAT,
+                 fields: Sequence[str] = TODO_FIELDS) -> str:
+    """Encode a list tool result as one string"""
+    return "".join(iter_encode(todos, output_format, fields))
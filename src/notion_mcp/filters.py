@@ -0,0 +1,276 @@
+"""
+Local evaluation of Notion database filters
+Answers the filter JSON built by create_*_filter from mirrored todos,
+either as a Python predicate (TodoMirror) or as SQL (TaskStore)
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Tuple
+
+from .schema import FIELD_CANDIDATES
+
+# Property names format_todo reads, mapped to the formatted todo field
+PROPERTY_FIELDS = {name: field for field, (_, names) in FIELD_CANDIDATES.items() for name in names}
+
+TIMESTAMP_FIELDS = {"created_time": "created"}
+
+# Filter type each formatted field answers to
+FIELD_TYPES = {
+    "task": ("title", "rich_text"),
+    "tags": ("multi_select",),
+    "status": ("status",),
+    "priority": ("select",),
+    "due_date": ("date",),
+    "created": ("created_time",),
+}
+
+# format_todo reports a missing status/priority as "Unknown"
+EMPTY_VALUES = (None, "", "Unknown")
+
+TEXT_OPERATORS = ("equals", "does_not_equal", "contains", "does_not_contain", "starts_with", "ends_with", "is_empty", "is_not_empty")
+CHOICE_OPERATORS = ("equals", "does_not_equal", "is_empty", "is_not_empty")
+MULTI_OPERATORS = ("contains", "does_not_contain", "is_empty", "is_not_empty")
+DATE_OPERATORS = ("equals", "before", "after", "on_or_before", "on_or_after", "is_empty", "is_not_empty",
+                  "past_week", "past_month", "past_year", "this_week", "next_week", "next_month", "next_year")
+
+Predicate = Callable[[dict], bool]
+
+
+class UnsupportedFilter(ValueError):
+    """Raised for filter conditions that cannot be answered from local data"""
+
+
+def _resolve(condition: dict) -> Tuple[str, str, dict]:
+    """Return (field, filter type, operator payload) for a leaf condition"""
+    if "timestamp" in condition:
+        timestamp = condition["timestamp"]
+        if timestamp not in TIMESTAMP_FIELDS:
+            raise UnsupportedFilter(f"Timestamp filter on {timestamp} is not available locally")
+        return TIMESTAMP_FIELDS[timestamp], timestamp, condition[timestamp]
+    name = condition.get("property")
+    field = PROPERTY_FIELDS.get(name)
+    if field is None:
+        raise UnsupportedFilter(f"Property {name!r} is not mirrored locally")
+    for filter_type in FIELD_TYPES[field]:
+        if filter_type in condition:
+            return field, filter_type, condition[filter_type]
+    raise UnsupportedFilter(f"Unsupported filter type for property {name!r}: {condition}")
+
+
+def _operator(payload: dict, allowed: tuple) -> Tuple[str, object]:
+    if len(payload) != 1:
+        raise UnsupportedFilter(f"Expected exactly one operator, got {payload}")
+    operator, value = next(iter(payload.items()))
+    if operator not in allowed:
+        raise UnsupportedFilter(f"Unsupported operator: {operator}")
+    return operator, value
+
+
+# --- Dates -------------------------------------------------------------------
+
+def _is_date_only(value: str) -> bool:
+    return len(value) == 10
+
+
+def _parse_datetime(value: str) -> datetime:
+    """Parse a Notion date or datetime string into an aware UTC datetime"""
+    if _is_date_only(value):
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _calendar_day(value: str) -> str:
+    """UTC calendar day of a Notion date or datetime, e.g. 2026-10-18 for 2026-10-17T23:30:00-05:00"""
+    if _is_date_only(value):
+        return value
+    return _parse_datetime(value).date().isoformat()
+
+
+def _relative_range(operator: str, now: datetime) -> Tuple[datetime, datetime]:
+    """Window covered by the relative date operators (past_week, next_month...)
+
+    Windows are whole UTC days, today included, so a date-only value of
+    today is in both past_week and next_week.
+    """
+    today = now.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if operator == "this_week":
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=7)
+    span = {"week": timedelta(days=7), "month": timedelta(days=30), "year": timedelta(days=365)}[operator.split("_")[1]]
+    if operator.startswith("past_"):
+        return today - span, today + timedelta(days=1)
+    return today, today + span + timedelta(days=1)
+
+
+def _compile_date(field: str, payload: dict, now: datetime) -> Predicate:
+    operator, value = _operator(payload, DATE_OPERATORS)
+    if operator == "is_empty":
+        return lambda todo: not todo.get(field)
+    if operator == "is_not_empty":
+        return lambda todo: bool(todo.get(field))
+    if operator in ("equals", "before", "after", "on_or_before", "on_or_after"):
+        compare = {
+            "equals": lambda a, b: a == b,
+            "before": lambda a, b: a < b,
+            "after": lambda a, b: a > b,
+            "on_or_before": lambda a, b: a <= b,
+            "on_or_after": lambda a, b: a >= b,
+        }[operator]
+        if _is_date_only(value):
+            # Date-only filters compare calendar days, datetimes taken in UTC
+            return lambda todo: bool(todo.get(field)) and compare(_calendar_day(todo[field]), value)
+        bound = _parse_datetime(value)
+        return lambda todo: bool(todo.get(field)) and compare(_parse_datetime(todo[field]), bound)
+    start, end = _relative_range(operator, now)
+    return lambda todo: bool(todo.get(field)) and start <= _parse_datetime(todo[field]) < end
+
+
+# --- Predicates --------------------------------------------------------------
+
+def _compile_leaf(condition: dict, now: datetime) -> Predicate:
+    field, filter_type, payload = _resolve(condition)
+    if filter_type in ("date", "created_time"):
+        return _compile_date(field, payload, now)
+
+    if filter_type == "multi_select":
+        operator, value = _operator(payload, MULTI_OPERATORS)
+        if operator == "contains":
+            return lambda todo: value in todo[field]
+        if operator == "does_not_contain":
+            return lambda todo: value not in todo[field]
+        if operator == "is_empty":
+            return lambda todo: not todo[field]
+        return lambda todo: bool(todo[field])
+
+    if filter_type in ("select", "status"):
+        operator, value = _operator(payload, CHOICE_OPERATORS)
+        if operator == "equals":
+            return lambda todo: todo[field] == value
+        if operator == "does_not_equal":
+            return lambda todo: todo[field] != value
+        if operator == "is_empty":
+            return lambda todo: todo[field] in EMPTY_VALUES
+        return lambda todo: todo[field] not in EMPTY_VALUES
+
+    operator, value = _operator(payload, TEXT_OPERATORS)
+    if operator == "is_empty":
+        return lambda todo: not todo[field]
+    if operator == "is_not_empty":
+        return lambda todo: bool(todo[field])
+    if operator == "equals":
+        return lambda todo: todo[field] == value
+    if operator == "does_not_equal":
+        return lambda todo: todo[field] != value
+    needle = value.lower()
+    if operator == "contains":
+        return lambda todo: needle in todo[field].lower()
+    if operator == "does_not_contain":
+        return lambda todo: needle not in todo[field].lower()
+    if operator == "starts_with":
+        return lambda todo: todo[field].lower().startswith(needle)
+    return lambda todo: todo[field].lower().endswith(needle)
+
+
+def compile_condition(condition: dict, now: datetime = None) -> Tuple[str, Predicate]:
+    """Compile one leaf condition, returning the todo field it reads and its predicate"""
+    field, _, _ = _resolve(condition)
+    return field, _compile_leaf(condition, now or datetime.now(timezone.utc))
+
+
+def compile_filter(filter: dict = None, now: datetime = None) -> Predicate:
+    """Turn a Notion filter object into a predicate over formatted todos"""
+    if not filter:
+        return lambda todo: True
+    now = now or datetime.now(timezone.utc)
+    if "and" in filter:
+        parts = [compile_filter(part, now) for part in filter["and"]]
+        return lambda todo: all(part(todo) for part in parts)
+    if "or" in filter:
+        parts = [compile_filter(part, now) for part in filter["or"]]
+        return lambda todo: any(part(todo) for part in parts)
+    return _compile_leaf(filter, now)
+
+
+# --- SQL (TaskStore) ---------------------------------------------------------
+
+def _placeholder_list(values: list) -> str:
+    return ",".join("?" * len(values))
+
+
+def _sql_date(column: str, payload: dict, now: datetime) -> Tuple[str, List]:
+    operator, value = _operator(payload, DATE_OPERATORS)
+    if operator == "is_empty":
+        return f"({column} IS NULL OR {column} = '')", []
+    if operator == "is_not_empty":
+        return f"({column} IS NOT NULL AND {column} != '')", []
+    if operator in ("equals", "before", "after", "on_or_before", "on_or_after"):
+        sql_operator = {"equals": "=", "before": "<", "after": ">", "on_or_before": "<=", "on_or_after": ">="}[operator]
+        if _is_date_only(value):
+            # date() shifts offsets to UTC like _calendar_day
+            return f"date({column}) {sql_operator} ?", [value]
+        return f"julianday({column}) {sql_operator} julianday(?)", [_parse_datetime(value).isoformat()]
+    start, end = _relative_range(operator, now)
+    return f"julianday({column}) >= julianday(?) AND julianday({column}) < julianday(?)", [start.isoformat(), end.isoformat()]
+
+
+def _sql_leaf(condition: dict, now: datetime) -> Tuple[str, List]:
+    field, filter_type, payload = _resolve(condition)
+    if filter_type in ("date", "created_time"):
+        return _sql_date(field, payload, now)
+
+    if filter_type == "multi_select":
+        operator, value = _operator(payload, MULTI_OPERATORS)
+        exists = "EXISTS (SELECT 1 FROM task_tags WHERE task_id = tasks.id{})"
+        if operator == "contains":
+            return exists.format(" AND tag = ?"), [value]
+        if operator == "does_not_contain":
+            return "NOT " + exists.format(" AND tag = ?"), [value]
+        if operator == "is_empty":
+            return "NOT " + exists.format(""), []
+        return exists.format(""), []
+
+    if filter_type in ("select", "status"):
+        operator, value = _operator(payload, CHOICE_OPERATORS)
+        empty = [v for v in EMPTY_VALUES if v is not None]
+        if operator == "equals":
+            return f"{field} = ?", [value]
+        if operator == "does_not_equal":
+            return f"({field} IS NULL OR {field} != ?)", [value]
+        if operator == "is_empty":
+            return f"({field} IS NULL OR {field} IN ({_placeholder_list(empty)}))", empty
+        return f"({field} IS NOT NULL AND {field} NOT IN ({_placeholder_list(empty)}))", empty
+
+    operator, value = _operator(payload, TEXT_OPERATORS)
+    if operator == "is_empty":
+        return f"{field} = ''", []
+    if operator == "is_not_empty":
+        return f"{field} != ''", []
+    if operator == "equals":
+        return f"{field} = ?", [value]
+    if operator == "does_not_equal":
+        return f"{field} != ?", [value]
+    if operator == "contains":
+        return f"instr(lower({field}), lower(?)) > 0", [value]
+    if operator == "does_not_contain":
+        return f"instr(lower({field}), lower(?)) = 0", [value]
+    if operator == "starts_with":
+        return f"substr(lower({field}), 1, length(?)) = lower(?)", [value, value]
+    return f"substr(lower({field}), -length(?)) = lower(?)", [value, value]
+
+
+def filter_to_sql(filter: dict = None, now: datetime = None) -> Tuple[str, List]:
+    """Translate a Notion filter object into a WHERE clause over the tasks table"""
+    if not filter:
+        return "1", []
+    now = now or datetime.now(timezone.utc)
+    for key, joiner in (("and", " AND "), ("or", " OR ")):
+        if key in filter:
+            if not filter[key]:
+                return ("1" if key == "and" else "0"), []
+            parts = [filter_to_sql(part, now) for part in filter[key]]
+            sql = joiner.join(f"({part_sql})" for part_sql, _ in parts)
+            return sql, [param for _, part_params in parts for param in part_params]
+    return _sql_leaf(filter, now)
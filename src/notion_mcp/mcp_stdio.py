@@ -1,145 +1,33 @@
 #!/usr/bin/env python3
 """
 Minimal MCP server implementation using only stdio
-This implements the basic MCP protocol without the mcp library
+This implements the basic MCP protocol without the mcp library and serves
+the same tools as server.py through core.py
 """
 
 import sys
 import json
 import asyncio
 import os
-import httpx
-from pathlib import Path
-from dotenv import load_dotenv
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG, stream=sys.stderr)
-logger = logging.getLogger('notion_mcp')
-
-# Find and load .env file from project root
-project_root = Path(__file__).parent.parent.parent
-env_path = project_root / '.env'
-if env_path.exists():
-    load_dotenv(env_path)
-    logger.info(f"Loaded .env from {env_path}")
+from .tools import TOOLS
+from .transport import StdioTransport, configure_logging
 
-# Configuration
-NOTION_API_KEY = os.getenv("NOTION_API_KEY")
-DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
-
-if not NOTION_API_KEY:
-    logger.error("NOTION_API_KEY not found in environment")
-    sys.exit(1)
+logger = logging.getLogger('notion_mcp')
 
-if not DATABASE_ID:
-    logger.error("NOTION_DATABASE_ID not found in environment")
+# The shared engine reads the configuration at import; without it there is nothing to serve
+try:
+    from . import core
+except ValueError as e:
+    logging.basicConfig(stream=sys.stderr)
+    logger.error(str(e))
     sys.exit(1)
 
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE_URL = "https://api.notion.com/v1"
-
-# Notion API headers
-headers = {
-    "Authorization": f"Bearer {NOTION_API_KEY}",
-    "Content-Type": "application/json",
-    "Notion-Version": NOTION_VERSION
-}
-
-async def fetch_todos():
-    """Fetch all active todos from Notion"""
-    try:
-        query = {
-            "filter": {
-                "and": [
-                    {
-                        "property": "Status",
-                        "status": {
-                            "does_not_equal": "Done"
-                        }
-                    },
-                    {
-                        "property": "Status",
-                        "status": {
-                            "does_not_equal": "Killed"
-                        }
-                    }
-                ]
-            },
-            "sorts": [
-                {
-                    "timestamp": "created_time",
-                    "direction": "descending"
-                }
-            ]
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NOTION_BASE_URL}/databases/{DATABASE_ID}/query",
-                headers=headers,
-                json=query
-            )
-            response.raise_for_status()
-            return response.json()
-    except Exception as e:
-        logger.error(f"Error fetching todos: {str(e)}")
-        return None
-
-def format_todo(todo):
-    """Format a todo for display"""
-    props = todo["properties"]
-    
-    # Get task name
-    task = ""
-    for title_prop in ["Tâche", "Task", "Name", "Title"]:
-        if props.get(title_prop, {}).get("title"):
-            task = props[title_prop]["title"][0]["text"]["content"]
-            break
-    
-    # Get tags
-    tags = []
-    for tags_prop in ["Tags", "Labels", "Categories"]:
-        if props.get(tags_prop, {}).get("multi_select"):
-            tags = [tag["name"] for tag in props[tags_prop]["multi_select"]]
-            break
-    
-    # Get status
-    status = "Unknown"
-    for status_prop in ["Status", "État", "State"]:
-        if props.get(status_prop, {}).get("status"):
-            status = props[status_prop]["status"]["name"]
-            break
-    
-    # Get priority
-    priority = "Unknown"
-    for priority_prop in ["Priorité", "Priority", "Importance"]:
-        if props.get(priority_prop, {}).get("select"):
-            priority = props[priority_prop]["select"]["name"]
-            break
-    
-    return {
-        "id": todo["id"],
-        "task": task,
-        "tags": tags,
-        "status": status,
-        "priority": priority,
-        "created": todo.get("created_time", "")
-    }
-
 class MCPServer:
     def __init__(self):
-        self.tools = [
-            {
-                "name": "show_all_todos",
-                "description": "Show all active todo items from Notion",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        ]
+        # Same tools as server.py, as plain JSON schemas
+        self.tools = TOOLS
     
     async def handle_initialize(self, params):
         """Handle MCP initialize request"""
@@ -169,38 +57,8 @@ class MCPServer:
     async def handle_tools_call(self, params):
         """Handle tools/call request"""
         name = params.get("name")
-        
-        if name == "show_all_todos":
-            todos_data = await fetch_todos()
-            if todos_data:
-                todos = [format_todo(todo) for todo in todos_data.get("results", [])]
-                result_text = f"Found {len(todos)} active todos:\n\n"
-                for i, todo in enumerate(todos[:10], 1):  # Show first 10
-                    tags_str = ", ".join(todo["tags"]) if todo["tags"] else "No tags"
-                    result_text += f"{i}. {todo['task']} ({todo['status']}, {todo['priority']}) [{tags_str}]\n"
-                
-                if len(todos) > 10:
-                    result_text += f"\n... and {len(todos) - 10} more todos"
-                
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": result_text
-                        }
-                    ]
-                }
-            else:
-                return {
-                    "content": [
-                        {
-                            "type": "text", 
-                            "text": "Failed to fetch todos from Notion."
-                        }
-                    ]
-                }
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+        arguments = params.get("arguments") or {}
+        return {"content": await core.call_tool(name, arguments)}
     
     async def handle_request(self, request):
         """Handle incoming MCP request"""
@@ -211,7 +69,9 @@ class MCPServer:
             
             # Handle notifications (no response required)
             if method.startswith("notifications/"):
-                logger.debug(f"Received notification: {method}")
+                logger.debug("Received notification: %s", method)
+                if method == "notifications/initialized":
+                    core.start_warm_up()
                 return None  # No response for notifications
             
             if method == "initialize":
@@ -224,6 +84,8 @@ class MCPServer:
                 result = await self.handle_resources_list(params)
             elif method == "prompts/list":
                 result = await self.handle_prompts_list(params)
+            elif method == "ping":
+                result = {}
             else:
                 return {
                     "jsonrpc": "2.0",
@@ -251,47 +113,106 @@ class MCPServer:
                 }
             }
 
+# Requests handled concurrently; stdin is not read further while the cap is reached
+MAX_IN_FLIGHT = int(os.getenv("NOTION_MCP_MAX_IN_FLIGHT", "8"))
+
+PARSE_ERROR = {
+    "jsonrpc": "2.0",
+    "id": None,
+    "error": {
+        "code": -32700,
+        "message": "Parse error"
+    }
+}
+
+INVALID_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": None,
+    "error": {
+        "code": -32600,
+        "message": "Invalid Request"
+    }
+}
+
+async def serve(server: "MCPServer", transport: StdioTransport):
+    """Read requests and run each one as its own task, at most MAX_IN_FLIGHT at a time"""
+    slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+    pending = set()
+    by_id = {}
+
+    async def dispatch(request):
+        try:
+            response = await server.handle_request(request)
+        except asyncio.CancelledError:
+            logger.debug("Request %s cancelled", request.get("id"))
+            return
+        if response is not None:
+            transport.send(response)
+
+    def finished(task, request_id):
+        # Runs even for tasks cancelled before they started
+        slots.release()
+        pending.discard(task)
+        if by_id.get(request_id) is task:
+            del by_id[request_id]
+
+    while True:
+        try:
+            line = await transport.receive()
+        except ValueError as e:
+            logger.error("Message too large: %s", e)
+            transport.send(PARSE_ERROR)
+            continue
+        if line is None:
+            break
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.error("Invalid JSON: %s", e)
+            transport.send(PARSE_ERROR)
+            continue
+        # Batches and bare values are not requests; ids must be usable as keys
+        if not isinstance(request, dict) or isinstance(request.get("id"), (dict, list)):
+            logger.error("Invalid request: %s", line[:200])
+            transport.send(INVALID_REQUEST)
+            continue
+
+        if request.get("method") == "notifications/cancelled":
+            params = request.get("params")
+            cancelled = params.get("requestId") if isinstance(params, dict) else None
+            task = by_id.get(cancelled) if isinstance(cancelled, (str, int, float)) else None
+            if task is not None:
+                task.cancel()
+
+        await slots.acquire()
+        request_id = request.get("id")
+        task = asyncio.ensure_future(dispatch(request))
+        pending.add(task)
+        if request_id is not None:
+            by_id[request_id] = task
+        task.add_done_callback(lambda done, key=request_id: finished(done, key))
+
+    # stdin closed: let the requests already read finish and answer
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
 async def main():
     """Main MCP server loop"""
+    configure_logging()
     server = MCPServer()
     logger.info("Starting MCP server...")
+    transport = StdioTransport()
     
     try:
-        while True:
-            # Read JSON-RPC message from stdin
-            line = sys.stdin.readline()
-            if not line:
-                break
-            
-            try:
-                request = json.loads(line.strip())
-                logger.debug(f"Received request: {request}")
-                
-                response = await server.handle_request(request)
-                
-                # Only send response if it's not None (notifications don't get responses)
-                if response is not None:
-                    logger.debug(f"Sending response: {response}")
-                    print(json.dumps(response), flush=True)
-                else:
-                    logger.debug("No response sent (notification)")
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON: {e}")
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": "Parse error"
-                    }
-                }
-                print(json.dumps(error_response), flush=True)
-                
+        await transport.open()
+        await serve(server, transport)
     except KeyboardInterrupt:
         logger.info("Server interrupted")
     except Exception as e:
         logger.error(f"Server error: {str(e)}")
+    finally:
+        await transport.close()
+        await core.shutdown()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,241 @@
+"""
+In-process metrics
+Per tool and per Notion endpoint counters with latency histograms, cheap
+enough to stay on for every call and reported by the server_stats tool
+"""
+
+import json
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# Histogram buckets: 25% apart from 0.05 ms to about 2 minutes, so a
+# percentile interpolated within its bucket is within 25% of the true value
+_GROWTH = 1.25
+_BOUNDS = [0.00005 * _GROWTH ** i for i in range(int(math.log(2400000) / math.log(_GROWTH)) + 2)]
+
+# Path segments that follow these names are object ids
+_ID_PARENTS = ("databases", "pages", "blocks", "users", "properties", "comments")
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """`POST /databases/{id}/query` style name with the object ids left out"""
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    for i in range(1, len(segments)):
+        if segments[i - 1] in _ID_PARENTS:
+            segments[i] = "{id}"
+    return f"{method} /{'/'.join(segments)}"
+
+
+class LatencyHistogram:
+    """Log-bucketed latency distribution: O(log buckets) to record, fixed size"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """q-th percentile in seconds, interpolated within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = _BOUNDS[index - 1] if index else 0.0
+                high = min(_BOUNDS[index], self.max) if index < len(_BOUNDS) else self.max
+                return low + (high - low) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def summary(self) -> dict:
+        """Latency percentiles in milliseconds"""
+        return {
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class ToolStats:
+    """Calls of one tool and the Notion traffic they caused"""
+
+    __slots__ = ("calls", "errors", "rows", "result_chars", "notion_requests", "notion_bytes", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.result_chars = 0
+        self.notion_requests = 0
+        self.notion_bytes = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "result_chars": self.result_chars,
+            "notion_requests": self.notion_requests,
+            "notion_bytes": self.notion_bytes,
+            **self.latency.summary(),
+        }
+
+
+class EndpointStats:
+    """HTTP exchanges with one Notion endpoint"""
+
+    __slots__ = ("requests", "errors", "throttled", "retries", "bytes_received", "rows", "latency")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.retries = 0
+        self.bytes_received = 0
+        self.rows = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "rows": self.rows,
+            **self.latency.summary(),
+        }
+
+
+# Tool call the running task works for; asyncio tasks inherit it, so Notion
+# requests made on behalf of a call (even coalesced ones) are charged to it
+_current_tool: ContextVar[Optional[ToolStats]] = ContextVar("notion_mcp_tool", default=None)
+
+
+class Metrics:
+    """Counters for tool calls, Notion requests and caches"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.tools: Dict[str, ToolStats] = {}
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.caches: Dict[str, list] = {}
+        self._names: Dict[tuple, str] = {}
+
+    def reset(self):
+        self.__init__()
+
+    # Tools
+
+    @contextmanager
+    def tool_call(self, name: str) -> Iterator[ToolStats]:
+        """Time a tool call; Notion requests and rows inside it are charged to `name`"""
+        stats = self.tools.get(name)
+        if stats is None:
+            stats = self.tools[name] = ToolStats()
+        stats.calls += 1
+        token = _current_tool.set(stats)
+        started = time.perf_counter()
+        try:
+            yield stats
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            stats.latency.record(time.perf_counter() - started)
+            _current_tool.reset(token)
+
+    def tool_error(self):
+        """Count a failure the running tool call reports as a result rather than raises"""
+        stats = _current_tool.get()
+        if stats is not None:
+            stats.errors += 1
+
+    def tool_rows(self, count: int):
+        """Count rows returned by the running tool call"""
+        stats = _current_tool.get()
+        if stats is not None:
+            stats.rows += count
+
+    # Notion endpoints
+
+    def endpoint(self, method: str, path: str) -> EndpointStats:
+        key = (method, path)
+        name = self._names.get(key)
+        if name is None:
+            if len(self._names) > 4096:
+                self._names.clear()
+            name = self._names[key] = endpoint_name(method, path)
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointStats()
+        return stats
+
+    def http_exchange(self, method: str, path: str, seconds: float, status: int = None, size: int = 0):
+        """Record one HTTP exchange; `status` None means no response (transport error)"""
+        stats = self.endpoint(method, path)
+        stats.requests += 1
+        stats.latency.record(seconds)
+        stats.bytes_received += size
+        if status is None or status >= 400:
+            stats.errors += 1
+        if status == 429:
+            stats.throttled += 1
+        tool = _current_tool.get()
+        if tool is not None:
+            tool.notion_requests += 1
+            tool.notion_bytes += size
+
+    def http_retry(self, method: str, path: str):
+        self.endpoint(method, path).retries += 1
+
+    def http_rows(self, method: str, path: str, count: int):
+        self.endpoint(method, path).rows += count
+
+    # Caches
+
+    def cache(self, name: str, hit: bool):
+        """Count a lookup in the cache called `name`"""
+        counts = self.caches.get(name)
+        if counts is None:
+            counts = self.caches[name] = [0, 0]
+        counts[0 if hit else 1] += 1
+
+    # Reports
+
+    def snapshot(self) -> dict:
+        caches = {}
+        for name, (hits, misses) in sorted(self.caches.items()):
+            lookups = hits + misses
+            caches[name] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / lookups, 3) if lookups else None}
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "tools": {name: stats.as_dict() for name, stats in sorted(self.tools.items())},
+            "notion": {name: stats.as_dict() for name, stats in sorted(self.endpoints.items())},
+            "caches": caches,
+        }
+
+    def dump(self, path: str, extra: dict = None):
+        """Write the snapshot (plus `extra`) to a JSON file"""
+        report = self.snapshot()
+        report.update(extra or {})
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
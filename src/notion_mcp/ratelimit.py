@@ -0,0 +1,136 @@
+"""
+Client-side rate limiting for the Notion API
+Token bucket for the request rate plus an AIMD concurrency window
+"""
+
+import asyncio
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger('notion_mcp')
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """Shared limiter for every outgoing Notion request
+
+    - A token bucket holds the average rate at `rate` requests per second
+      (Notion allows about 3) with bursts of up to `burst` requests.
+    - The number of requests in flight is capped by a window that grows by
+      one slot per window's worth of successes (additive increase) and is
+      halved on every 429 (multiplicative decrease).
+    - A 429 also pauses the whole bucket until its Retry-After has elapsed.
+    """
+
+    def __init__(self, rate: float = 3.0, burst: int = 3, max_concurrency: int = 8, min_concurrency: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(max_concurrency)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        # Created on first use so they bind to the running event loop
+        self._condition: Optional[asyncio.Condition] = None
+        self._bucket_lock: Optional[asyncio.Lock] = None
+        # Metrics
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _sync_primitives(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+            self._bucket_lock = asyncio.Lock()
+
+    async def _take_token(self):
+        """Wait until the bucket (and any Retry-After pause) lets one request through"""
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def acquire(self):
+        """Reserve a concurrency slot and a token; pair with release()"""
+        self._sync_primitives()
+        started = time.monotonic()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.concurrency))
+            self._in_flight += 1
+        try:
+            await self._take_token()
+        except BaseException:
+            await self._release_slot()
+            raise
+        waited = time.monotonic() - started
+        self.requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    async def _release_slot(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    async def release(self, throttled: bool = False, retry_after: float = 0.0, failed: bool = False):
+        """Return the slot and adapt the window to the outcome of the request"""
+        if failed:
+            # Transport errors say nothing about our rate; leave the window as is
+            pass
+        elif throttled:
+            self.throttled += 1
+            self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._tokens = 0.0
+            logger.warning(f"Notion rate limit hit, backing off {retry_after:.1f}s (concurrency {int(self.concurrency)})")
+        else:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+        await self._release_slot()
+
+    def reset_stats(self):
+        """Zero the counters; the pacing state is kept"""
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "concurrency": int(self.concurrency),
+            "in_flight": self._in_flight,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "avg_wait_seconds": round(self.total_wait / self.requests, 3) if self.requests else 0.0,
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
@@ -0,0 +1,112 @@
+"""
+Retry policy and circuit breaker for Notion requests
+Transient failures are retried with backoff; a failing API is short-circuited
+"""
+
+import random
+import time
+import logging
+
+import httpx
+
+logger = logging.getLogger('notion_mcp')
+
+# Statuses worth retrying: the request did not reach a healthy backend
+RETRYABLE_STATUSES = (500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and a total deadline"""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.25, max_delay: float = 4.0, deadline: float = 20.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based): uniform in [0, min(cap, base * 2^attempt)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def next_delay(self, attempt: int, started: float):
+        """Seconds to wait before another attempt, or None when the budget is spent"""
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if time.monotonic() - started + delay >= self.deadline:
+            return None
+        return delay
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised instead of calling Notion while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Stops sending requests after repeated failures, then probes for recovery
+
+    closed    -> requests flow; `failure_threshold` consecutive failures open it
+    open      -> requests fail fast with CircuitOpenError for `reset_timeout` seconds
+    half_open -> a single trial request is let through; success closes the
+                 circuit, failure opens it again
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def before_request(self):
+        """Raise CircuitOpenError if the request must not be sent"""
+        if not self.enabled or self.state == "closed":
+            return
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self.rejected += 1
+        retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(f"Notion API circuit is open after repeated failures, retrying in {retry_in:.0f}s")
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_in_flight = False
+        if self.state != "closed":
+            logger.info("Notion API recovered, circuit closed")
+        self.state = "closed"
+
+    def release_trial(self):
+        """Forget a trial request that ended without an outcome (e.g. cancelled)"""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            logger.warning(f"Notion API failing ({self.failures} consecutive errors), circuit opened for {self.reset_timeout:.0f}s")
+
+    def reset_stats(self):
+        """Zero the counters; the circuit state is kept"""
+        self.trips = 0
+        self.rejected = 0
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
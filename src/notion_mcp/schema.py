@@ -0,0 +1,158 @@
+"""
+Schema-compiled todo extraction
+Resolves each logical todo field to one database property once, instead of
+probing candidate property names on every row
+"""
+
+import time
+import logging
+from typing import Awaitable, Callable, List, Optional, Sequence
+from urllib.parse import unquote
+
+logger = logging.getLogger('notion_mcp')
+
+# Keys of a formatted todo, in output order
+TODO_FIELDS = ("id", "task", "tags", "status", "priority", "created", "due_date")
+
+# Logical field -> (Notion property type, accepted property names in priority order)
+FIELD_CANDIDATES = {
+    "task": ("title", ["Tâche", "Task", "Name", "Title"]),
+    "tags": ("multi_select", ["Tags", "Labels", "Categories"]),
+    "status": ("status", ["Status", "État", "State"]),
+    "priority": ("select", ["Priorité", "Priority", "Importance"]),
+    "due_date": ("date", ["Date butoire", "Due date", "Due Date", "Deadline"]),
+}
+
+
+def project_todo(todo: dict, fields: Sequence[str]) -> dict:
+    """Keep only `fields` of a formatted todo, in that order"""
+    return {field: todo[field] for field in fields}
+
+
+def resolve_fields(properties: dict) -> dict:
+    """Map each logical field to the database property that holds it
+
+    A property only qualifies when its type matches, so a text column named
+    "Status" can no longer shadow the real status property. The title is
+    always resolved, since every database has exactly one title property.
+    """
+    resolved = {}
+    for field, (prop_type, names) in FIELD_CANDIDATES.items():
+        for name in names:
+            if properties.get(name, {}).get("type") == prop_type:
+                resolved[field] = name
+                break
+    if "task" not in resolved:
+        for name, prop in properties.items():
+            if prop.get("type") == "title":
+                resolved["task"] = name
+                break
+    return resolved
+
+
+def compile_extractor(properties: dict) -> Callable[[dict], dict]:
+    """Build a formatter reading exactly the resolved properties of each page"""
+    fields = resolve_fields(properties)
+    task_name = fields.get("task")
+    tags_name = fields.get("tags")
+    status_name = fields.get("status")
+    priority_name = fields.get("priority")
+    due_name = fields.get("due_date")
+
+    def extract(todo: dict) -> dict:
+        props = todo["properties"]
+        title = props.get(task_name, {}).get("title")
+        tags = props.get(tags_name, {}).get("multi_select")
+        status = props.get(status_name, {}).get("status")
+        priority = props.get(priority_name, {}).get("select")
+        due = props.get(due_name, {}).get("date")
+        return {
+            "id": todo["id"],
+            "task": title[0]["text"]["content"] if title else "",
+            "tags": [tag["name"] for tag in tags] if tags else [],
+            "status": status["name"] if status else "Unknown",
+            "priority": priority["name"] if priority else "Unknown",
+            "created": todo.get("created_time", ""),
+            "due_date": due["start"] if due else None
+        }
+
+    extract.fields = fields
+    # Property ids as accepted by the filter_properties query parameter
+    extract.property_ids = {field: unquote(properties[name]["id"]) for field, name in fields.items() if "id" in properties[name]}
+    return extract
+
+
+def probe_todo(todo: dict) -> dict:
+    """Format a todo by probing every candidate property name (used until the schema is known)"""
+    props = todo["properties"]
+    values = {}
+    for field, (prop_type, names) in FIELD_CANDIDATES.items():
+        values[field] = None
+        for name in names:
+            if props.get(name, {}).get(prop_type):
+                values[field] = props[name][prop_type]
+                break
+    return {
+        "id": todo["id"],
+        "task": values["task"][0]["text"]["content"] if values["task"] else "",
+        "tags": [tag["name"] for tag in values["tags"]] if values["tags"] else [],
+        "status": values["status"]["name"] if values["status"] else "Unknown",
+        "priority": values["priority"]["name"] if values["priority"] else "Unknown",
+        "created": todo.get("created_time", ""),
+        "due_date": values["due_date"]["start"] if values["due_date"] else None
+    }
+
+
+class TodoFormatter:
+    """Formats pages with the compiled extractor once the database schema is loaded
+
+    After a failed schema fetch, pages are formatted by probing property
+    names and the fetch is not tried again for `retry_after` seconds.
+    """
+
+    def __init__(self, retry_after: float = 60.0):
+        self.extractor: Optional[Callable[[dict], dict]] = None
+        self.retry_after = retry_after
+        self.failed_at: Optional[float] = None
+
+    @property
+    def fields(self) -> dict:
+        return self.extractor.fields if self.extractor else {}
+
+    def property_ids(self, fields: Sequence[str] = None) -> Optional[List[str]]:
+        """Ids of the properties backing `fields` (all resolved fields by default)
+
+        None while the schema is unknown, meaning every property must be
+        downloaded. Fields that are not database properties (id, created)
+        need none; the title is always requested so the list is never empty,
+        since an empty filter_properties would return every property.
+        """
+        if self.extractor is None:
+            return None
+        ids = self.extractor.property_ids
+        wanted = ids.keys() if fields is None else [field for field in fields if field in ids]
+        selected = [ids[field] for field in wanted]
+        if not selected and "task" in ids:
+            selected.append(ids["task"])
+        return selected
+
+    async def ensure(self, fetch_database: Callable[[], Awaitable[dict]]):
+        """Fetch the schema once; probe property names while it cannot be loaded"""
+        if self.extractor is not None:
+            return
+        if self.failed_at is not None and time.monotonic() - self.failed_at < self.retry_after:
+            return
+        try:
+            database = await fetch_database()
+        except Exception as e:
+            self.failed_at = time.monotonic()
+            logger.warning(f"Could not load the database schema, probing property names for {self.retry_after:g}s: {str(e)}")
+            return
+        self.failed_at = None
+        self.extractor = compile_extractor(database.get("properties", {}))
+        logger.debug(f"Compiled todo extractor for properties {self.extractor.fields}")
+
+    def __call__(self, todo: dict) -> dict:
+        if self.extractor is not None:
+            return self.extractor(todo)
+        return probe_todo(todo)
@@ -8,13 +8,13 @@ import sys
 import json
 import asyncio
 import os
-import httpx
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
+from .client import NotionClient
+from .transport import configure_logging
+
 logger = logging.getLogger('notion_mcp_simple')
 
 # Find and load .env file from project root
@@ -38,35 +38,24 @@ if not DATABASE_ID:
     print("ERROR: NOTION_DATABASE_ID not found in environment", file=sys.stderr)
     sys.exit(1)
 
-NOTION_VERSION = "2022-06-28"
-NOTION_BASE_URL = "https://api.notion.com/v1"
-
-# Notion API headers
-headers = {
-    "Authorization": f"Bearer {NOTION_API_KEY}",
-    "Content-Type": "application/json",
-    "Notion-Version": NOTION_VERSION
-}
+# Shared Notion client: one keep-alive connection pool for the whole process
+notion = NotionClient.from_env(NOTION_API_KEY)
 
 async def test_notion_connection():
     """Test connection to Notion API"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{NOTION_BASE_URL}/databases/{DATABASE_ID}",
-                headers=headers
-            )
-            if response.status_code == 200:
-                db_info = response.json()
-                title = "Unknown"
-                if db_info.get('title') and len(db_info['title']) > 0:
-                    title = db_info['title'][0].get('text', {}).get('content', 'Unknown')
-                print(f"✅ Successfully connected to Notion database: '{title}'")
-                print(f"Database ID: {DATABASE_ID}")
-                return True
-            else:
-                print(f"❌ Failed to access database: {response.status_code} - {response.text}")
-                return False
+        response = await notion.get(f"/databases/{DATABASE_ID}")
+        if response.status_code == 200:
+            db_info = response.json()
+            title = "Unknown"
+            if db_info.get('title') and len(db_info['title']) > 0:
+                title = db_info['title'][0].get('text', {}).get('content', 'Unknown')
+            print(f"✅ Successfully connected to Notion database: '{title}'")
+            print(f"Database ID: {DATABASE_ID}")
+            return True
+        else:
+            print(f"❌ Failed to access database: {response.status_code} - {response.text}")
+            return False
     except Exception as e:
         print(f"❌ Connection error: {str(e)}")
         return False
@@ -99,14 +88,9 @@ async def fetch_todos():
             ]
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NOTION_BASE_URL}/databases/{DATABASE_ID}/query",
-                headers=headers,
-                json=query
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await notion.post(f"/databases/{DATABASE_ID}/query", json=query)
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         print(f"❌ Error fetching todos: {str(e)}")
         return None
@@ -154,32 +138,36 @@ def format_todo(todo):
 
 async def main():
     """Test the Notion connection and fetch some todos"""
-    print("🔍 Testing Notion TODO MCP Server...")
-    print(f"Python version: {sys.version}")
-    print(f"Project root: {project_root}")
-    print("")
+    configure_logging()
+    try:
+        print("🔍 Testing Notion TODO MCP Server...")
+        print(f"Python version: {sys.version}")
+        print(f"Project root: {project_root}")
+        print("")
     
-    # Test connection
-    if not await test_notion_connection():
-        return
+        # Test connection
+        if not await test_notion_connection():
+            return
     
-    print("")
-    print("📋 Fetching active todos...")
+        print("")
+        print("📋 Fetching active todos...")
     
-    # Fetch todos
-    todos_data = await fetch_todos()
-    if todos_data:
-        todos = [format_todo(todo) for todo in todos_data.get("results", [])]
-        print(f"Found {len(todos)} active todos:")
-        for i, todo in enumerate(todos[:5], 1):  # Show first 5
-            tags_str = ", ".join(todo["tags"]) if todo["tags"] else "No tags"
-            print(f"{i}. {todo['task']} ({todo['status']}, {todo['priority']}) [{tags_str}]")
+        # Fetch todos
+        todos_data = await fetch_todos()
+        if todos_data:
+            todos = [format_todo(todo) for todo in todos_data.get("results", [])]
+            print(f"Found {len(todos)} active todos:")
+            for i, todo in enumerate(todos[:5], 1):  # Show first 5
+                tags_str = ", ".join(todo["tags"]) if todo["tags"] else "No tags"
+                print(f"{i}. {todo['task']} ({todo['status']}, {todo['priority']}) [{tags_str}]")
         
-        if len(todos) > 5:
-            print(f"... and {len(todos) - 5} more")
+            if len(todos) > 5:
+                print(f"... and {len(todos) - 5} more")
     
-    print("")
-    print("✅ Basic functionality test completed!")
+        print("")
+        print("✅ Basic functionality test completed!")
+    finally:
+        await notion.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
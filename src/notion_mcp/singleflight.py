@@ -0,0 +1,54 @@
+"""
+Request coalescing for identical concurrent reads
+Callers asking for the same thing while a request is in flight share its result
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable
+
+
+def request_key(*parts: Any) -> str:
+    """Canonical hash of a request description (key order and spacing insensitive)"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers await the same task
+
+    The shared task is shielded, so a caller being cancelled never cancels the
+    request for the others waiting on it. Results are shared by reference and
+    must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._inflight: dict = {}
+        self.calls = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def reset_stats(self):
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
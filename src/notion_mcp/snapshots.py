@@ -0,0 +1,125 @@
+"""
+Stable snapshots behind paginated list results
+The first call of a listing freezes its result; follow-up calls page through
+it with an opaque cursor instead of querying and formatting everything again
+"""
+
+import asyncio
+import base64
+import secrets
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional, Sequence, Tuple
+
+
+class CursorError(ValueError):
+    """The cursor is malformed, expired or belongs to another query"""
+
+
+class Snapshot:
+    """Frozen result of one list query, read one page at a time
+
+    `rows` is any sequence supporting len() and slicing (a list, or a view
+    over a frozen columnar copy). With a `stream` of (rows, has_more) batches,
+    one per Notion page, rows are pulled on demand and kept, so each Notion
+    page is fetched and formatted once. `synced_at` is set when the rows come
+    from the local mirror: the time that copy was last synced with Notion.
+    """
+
+    def __init__(self, key: str, rows: Sequence = (), stream: Optional[AsyncIterator[Tuple[list, bool]]] = None,
+                 synced_at: Optional[float] = None):
+        self.key = key
+        self.rows = list(rows) if stream is not None else rows
+        self.stream = stream
+        self.synced_at = synced_at
+        self.id: Optional[str] = None
+        self.used_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.stream is None
+
+    async def _fill(self, count: int):
+        """Pull from the stream until `count` rows are buffered (or it ends)"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while self.stream is not None and len(self.rows) < count:
+                try:
+                    rows, has_more = await self.stream.__anext__()
+                except StopAsyncIteration:
+                    self.stream = None
+                    break
+                self.rows.extend(rows)
+                if not has_more:
+                    await self.aclose()
+
+    async def page(self, offset: int, size: int) -> Tuple[list, bool]:
+        """Rows [offset, offset + size) and whether more rows follow"""
+        self.used_at = time.monotonic()
+        # An open stream means Notion reported more results: no look-ahead row needed
+        await self._fill(offset + size)
+        rows = list(self.rows[offset:offset + size])
+        return rows, len(self.rows) > offset + size or self.stream is not None
+
+    async def aclose(self):
+        if self.stream is not None:
+            stream, self.stream = self.stream, None
+            await stream.aclose()
+
+
+class SnapshotStore:
+    """Bounded set of live snapshots, addressed through opaque cursors
+
+    Snapshots expire `ttl` seconds after their last use; beyond `max_snapshots`
+    the least recently used one is dropped.
+    """
+
+    def __init__(self, max_snapshots: int = 16, ttl: float = 600.0):
+        self.max_snapshots = max_snapshots
+        self.ttl = ttl
+        self._snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def _expire(self):
+        now = time.monotonic()
+        for snapshot_id, snapshot in list(self._snapshots.items()):
+            if now - snapshot.used_at > self.ttl:
+                self._drop(snapshot_id)
+        while len(self._snapshots) > self.max_snapshots:
+            self._drop(next(iter(self._snapshots)))
+
+    def _drop(self, snapshot_id: str):
+        snapshot = self._snapshots.pop(snapshot_id)
+        if not snapshot.complete:
+            # Close the pending Notion stream in the background
+            asyncio.ensure_future(snapshot.aclose())
+
+    def cursor(self, snapshot: Snapshot, offset: int) -> str:
+        """Opaque cursor resuming `snapshot` at `offset`; registers the snapshot on first use"""
+        if snapshot.id is None:
+            snapshot.id = secrets.token_urlsafe(9)
+            self._snapshots[snapshot.id] = snapshot
+            self._expire()
+        token = f"{snapshot.id}:{offset}".encode("ascii")
+        return base64.urlsafe_b64encode(token).decode("ascii").rstrip("=")
+
+    def resume(self, cursor: str, key: str) -> Tuple[Snapshot, int]:
+        """Snapshot and offset a cursor points to, for the query identified by `key`"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            snapshot_id, offset = base64.urlsafe_b64decode(padded).decode("ascii").rsplit(":", 1)
+            offset = int(offset)
+        except ValueError:
+            raise CursorError("Invalid cursor")
+        self._expire()
+        snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is None:
+            raise CursorError("Cursor expired, run the query again without a cursor")
+        if snapshot.key != key:
+            raise CursorError("Cursor belongs to a different query")
+        self._snapshots.move_to_end(snapshot_id)
+        return snapshot, offset
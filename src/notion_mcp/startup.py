@@ -0,0 +1,105 @@
+"""
+Start-up timing
+Records how long each phase of process start-up takes and reports it for
+`python -m notion_mcp --startup-profile`
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+from collections import defaultdict
+from typing import List, Tuple
+
+STARTED = time.perf_counter()
+
+# Time from process launch to being ready to read the first message;
+# --startup-profile exits with OVER_BUDGET when it is exceeded
+OVER_BUDGET = 2
+STARTUP_BUDGET_MS = float(os.getenv("NOTION_MCP_STARTUP_BUDGET_MS", "300"))
+
+_phases: List[Tuple[str, float]] = []
+_last = STARTED
+
+
+def mark(phase: str):
+    """Record the time spent since the previous mark under `phase`"""
+    global _last
+    now = time.perf_counter()
+    _phases.append((phase, now - _last))
+    _last = now
+
+
+def phases() -> List[Tuple[str, float]]:
+    return list(_phases)
+
+
+# Run in a fresh interpreter under -X importtime; prints the marks as JSON
+_CHILD = """
+import json, sys
+from notion_mcp import startup
+module = __import__("notion_mcp.{entry}", fromlist=["_"])
+if hasattr(module, "tool_definitions"):
+    module.tool_definitions()
+    startup.mark("tool list")
+sys.stdout.write(json.dumps(startup.phases()))
+"""
+
+
+def _import_times(report: str) -> dict:
+    """Self time in ms per top-level package from -X importtime output"""
+    totals = defaultdict(float)
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return totals
+
+
+def _launch(code: str) -> Tuple[subprocess.CompletedProcess, float]:
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def profile(entry: str = "server", top: int = 10) -> int:
+    """Start `notion_mcp.<entry>` in a fresh interpreter and print where the time went
+
+    Imports are broken down per top-level package (self time, from
+    -X importtime), initialisation per phase marked by the entry module.
+    Returns a process exit code: 1 when the import fails, OVER_BUDGET when
+    start-up took longer than STARTUP_BUDGET_MS, else 0.
+    """
+    baseline, baseline_ms = _launch("pass")
+    result, total_ms = _launch(_CHILD.format(entry=entry))
+    lines = [f"Start-up profile of notion_mcp.{entry} (Python {sys.version.split()[0]})", ""]
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        lines.append(f"Importing notion_mcp.{entry} failed:")
+        lines += ["  " + line for line in errors[-5:]]
+        print("\n".join(lines), file=sys.stderr)
+        return 1
+
+    interpreter = _import_times(baseline.stderr)
+    packages = _import_times(result.stderr)
+    for name, ms in interpreter.items():
+        packages[name] = max(0.0, packages[name] - ms)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+    lines += [f"Interpreter start-up: {baseline_ms:8.1f} ms", "", "Imports (self time per package):"]
+    lines += [f"  {name:<28} {ms:8.1f} ms" for name, ms in ranked[:top] if ms >= 0.05]
+    rest = sum(ms for _, ms in ranked[top:])
+    if rest:
+        lines.append(f"  {'(other packages)':<28} {rest:8.1f} ms")
+
+    lines += ["", "Initialisation (phases marked by the entry module, imports included):"]
+    marks = json.loads(result.stdout or "[]")
+    lines += [f"  {phase:<28} {seconds * 1000:8.1f} ms" for phase, seconds in marks] or ["  (no marks)"]
+
+    within = total_ms <= STARTUP_BUDGET_MS
+    lines += ["", f"Total to ready: {total_ms:.1f} ms ({'within' if within else 'OVER'} the {STARTUP_BUDGET_MS:.0f} ms budget; "
+              f"-X importtime adds some overhead)"]
+    print("\n".join(lines), file=sys.stderr)
+    return 0 if within else OVER_BUDGET
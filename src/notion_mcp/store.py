@@ -0,0 +1,190 @@
+"""
+SQLite-backed persistent task store
+Keeps the mirror on disk so a fresh process answers from the last sync
+"""
+
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .cache import TodoMirror
+from .filters import filter_to_sql
+from .schema import TODO_FIELDS
+
+logger = logging.getLogger('notion_mcp')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    status TEXT,
+    priority TEXT,
+    created TEXT,
+    due_date TEXT
+);
+CREATE TABLE IF NOT EXISTS task_tags (
+    task_id TEXT NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (task_id, tag)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
+CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created);
+CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag);
+"""
+
+
+class TaskStore(TodoMirror):
+    """On-disk mirror of the database holding the output of format_todo
+
+    Drop-in replacement for TodoMirror: same refresh rules, but rows and
+    sync state survive restarts, so a new session can answer immediately
+    (and keep answering while Notion is unreachable). With `database_id`,
+    a file left behind by another database starts out empty.
+    """
+
+    def __init__(self, path: str, ttl: float = 60.0, database_id: str = None):
+        super().__init__(ttl)
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+        if database_id is not None:
+            self._bind(database_id)
+        synced_at = self._get_meta("synced_at")
+        self.synced_at = float(synced_at) if synced_at else None
+
+    def _bind(self, database_id: str):
+        """Start from empty if the file holds another database's rows and sync state"""
+        stored = self._get_meta("database_id")
+        if stored == database_id:
+            return
+        with self.db:
+            if stored is not None:
+                logger.info(f"Task store {self.path} held database {stored}, clearing it for {database_id}")
+            self.db.execute("DELETE FROM tasks")
+            self.db.execute("DELETE FROM meta")
+            self._set_meta("database_id", database_id)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def sync_state(self) -> dict:
+        return json.loads(self._get_meta("sync_state") or "{}")
+
+    @sync_state.setter
+    def sync_state(self, state: dict):
+        with self.db:
+            self._set_meta("sync_state", json.dumps(state))
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def _write(self, todos):
+        rows = [
+            (todo["id"], todo["task"], json.dumps(todo["tags"], ensure_ascii=False),
+             todo["status"], todo["priority"], todo["created"], todo.get("due_date"))
+            for todo in todos
+        ]
+        self.db.executemany("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.db.executemany("DELETE FROM task_tags WHERE task_id = ?", [(row[0],) for row in rows])
+        self.db.executemany(
+            "INSERT OR IGNORE INTO task_tags (task_id, tag) VALUES (?, ?)",
+            [(todo["id"], tag) for todo in todos for tag in todo["tags"]]
+        )
+
+    def replace(self, todos):
+        with self.db:
+            self.db.execute("DELETE FROM tasks")
+            self._write(list(todos))
+            self.touch()
+
+    def touch(self):
+        super().touch()
+        with self.db:
+            self._set_meta("synced_at", repr(self.synced_at))
+
+    def upsert(self, todo: dict):
+        with self.db:
+            self._write([todo])
+
+    def remove(self, page_id: str):
+        with self.db:
+            self.db.execute("DELETE FROM tasks WHERE id = ?", (page_id,))
+
+    def invalidate(self):
+        super().invalidate()
+        with self.db:
+            self.db.execute("DELETE FROM meta WHERE key = 'synced_at'")
+
+    def _query(self, filter: dict, limit: Optional[int], fields: Sequence[str]) -> list:
+        """Raw rows (tags still JSON-encoded) matching a filter, newest first"""
+        if not set(fields) <= set(TODO_FIELDS):
+            raise ValueError(f"Unknown fields: {', '.join(sorted(set(fields) - set(TODO_FIELDS)))}")
+        where, params = filter_to_sql(filter)
+        # Columns are named after the todo fields
+        sql = f"SELECT {', '.join(fields)} FROM tasks"
+        sql += f" WHERE {where} ORDER BY created DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params).fetchall()
+
+    def get(self, page_id: str) -> Optional[dict]:
+        row = self.db.execute(f"SELECT {', '.join(TODO_FIELDS)} FROM tasks WHERE id = ?", (page_id,)).fetchone()
+        return StoredRows([row], TODO_FIELDS)[0] if row else None
+
+    def memory_usage(self) -> Optional[int]:
+        # Rows live in SQLite, not in this process
+        return None
+
+    def select(self, filter: dict = None, limit: int = None, fields: Sequence[str] = None) -> list:
+        fields = tuple(fields or TODO_FIELDS)
+        return StoredRows(self._query(filter, limit, fields), fields)[:]
+
+    def snapshot(self, filter: dict = None, fields: Sequence[str] = None) -> Sequence[dict]:
+        # Rows are copied out of SQLite now and decoded only when a page is read
+        fields = tuple(fields or TODO_FIELDS)
+        return StoredRows(self._query(filter, None, fields), fields)
+
+    def close(self):
+        self.db.close()
+
+
+class StoredRows:
+    """Read-only sequence of todos over raw SQLite rows, decoded when sliced"""
+
+    def __init__(self, rows: list, fields: Sequence[str]):
+        self.rows = rows
+        self.fields = fields
+        self._tags = fields.index("tags") if "tags" in fields else None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _decode(self, row: tuple) -> dict:
+        todo = dict(zip(self.fields, row))
+        if self._tags is not None:
+            todo["tags"] = json.loads(row[self._tags])
+        return todo
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(row) for row in self.rows[index]]
+        return self._decode(self.rows[index])
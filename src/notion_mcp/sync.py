@@ -0,0 +1,116 @@
+"""
+Incremental synchronisation of the local mirror using last_edited_time
+Refresh cost scales with the number of edited rows, not the database size
+"""
+
+import time
+import logging
+from typing import AsyncIterator, Callable, Optional
+
+logger = logging.getLogger('notion_mcp')
+
+PageIterator = Callable[..., AsyncIterator[dict]]
+
+# Pages per probe request; usually covers everything edited in the high-water minute
+PROBE_PAGE_SIZE = 10
+
+
+class DeltaSync:
+    """Tracks a last_edited_time high-water mark and pulls only newer pages
+
+    Notion truncates last_edited_time to the minute, so both the freshness
+    probe and deltas re-read the high-water minute (`on_or_after`): the probe
+    compares those pages with the mirror to spot a second edit made within
+    that minute, and deltas rely on idempotent upserts. Pages that were
+    deleted or archived are never returned by queries; the periodic full
+    resync drops them.
+    """
+
+    def __init__(self, iter_pages: PageIterator, format_todo: Callable[[dict], dict], full_resync_interval: float = 900.0):
+        self.iter_pages = iter_pages
+        self.format_todo = format_todo
+        self.full_resync_interval = full_resync_interval
+        self.high_water_mark: Optional[str] = None
+        self.last_full_sync: Optional[float] = None
+
+    def _advance(self, page: dict):
+        edited = page.get("last_edited_time")
+        if edited and (self.high_water_mark is None or edited > self.high_water_mark):
+            self.high_water_mark = edited
+
+    def _edited_filter(self, operator: str) -> dict:
+        return {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {operator: self.high_water_mark}
+        }
+
+    @property
+    def needs_full_sync(self) -> bool:
+        if self.high_water_mark is None or self.last_full_sync is None:
+            return True
+        return time.time() - self.last_full_sync >= self.full_resync_interval
+
+    async def full(self, mirror) -> int:
+        """Download every page and replace the mirror content"""
+        self.high_water_mark = None
+        todos = []
+        async for page in self.iter_pages():
+            self._advance(page)
+            todos.append(self.format_todo(page))
+        mirror.replace(todos)
+        self.last_full_sync = time.time()
+        logger.debug(f"Full sync: {len(todos)} todos, high-water mark {self.high_water_mark}")
+        return len(todos)
+
+    async def probe(self, mirror) -> bool:
+        """Small query telling whether anything changed since the last sync
+
+        Reads the pages edited in or after the high-water minute, newest
+        first, and stops at the first one that is newer than the mark or
+        differs from the mirror's copy.
+        """
+        stream = self.iter_pages(
+            self._edited_filter("on_or_after"),
+            [{"timestamp": "last_edited_time", "direction": "descending"}],
+            page_size=PROBE_PAGE_SIZE
+        )
+        try:
+            async for page in stream:
+                if page.get("last_edited_time", "") > self.high_water_mark:
+                    return True
+                if mirror.get(page["id"]) != self.format_todo(page):
+                    return True
+        finally:
+            await stream.aclose()
+        return False
+
+    async def delta(self, mirror) -> int:
+        """Merge pages edited since the high-water mark into the mirror"""
+        count = 0
+        async for page in self.iter_pages(
+            self._edited_filter("on_or_after"),
+            [{"timestamp": "last_edited_time", "direction": "ascending"}]
+        ):
+            self._advance(page)
+            mirror.upsert(self.format_todo(page))
+            count += 1
+        logger.debug(f"Delta sync: {count} todos merged, high-water mark {self.high_water_mark}")
+        return count
+
+    async def refresh(self, mirror) -> int:
+        """Bring the mirror up to date with the cheapest sufficient request pattern"""
+        if self.high_water_mark is None:
+            # Resume from state persisted alongside the mirror, if any
+            state = mirror.sync_state
+            self.high_water_mark = state.get("high_water_mark")
+            self.last_full_sync = state.get("last_full_sync")
+        if self.needs_full_sync or not mirror.loaded:
+            count = await self.full(mirror)
+        else:
+            count = await self.delta(mirror) if await self.probe(mirror) else 0
+            mirror.touch()
+        mirror.sync_state = {
+            "high_water_mark": self.high_water_mark,
+            "last_full_sync": self.last_full_sync
+        }
+        return count
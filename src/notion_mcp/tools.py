@@ -0,0 +1,346 @@
+"""
+Tool definitions
+Static JSON schemas of every tool, shared by the MCP servers without
+importing the mcp library
+"""
+
+from .encoding import OUTPUT_FORMATS
+from .schema import TODO_FIELDS
+
+OUTPUT_FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": list(OUTPUT_FORMATS),
+    "description": "Encoding of the result: compact json, ndjson (one task per line), tsv or markdown_table"
+}
+
+FIELDS_PROPERTY = {
+    "type": "array",
+    "items": {"type": "string", "enum": list(TODO_FIELDS)},
+    "description": "Only return these fields of each task (and only download the matching Notion properties)"
+}
+
+LIMIT_PROPERTY = {
+    "type": "integer",
+    "minimum": 1,
+    "description": "Maximum number of tasks per page (default 100); a cursor for the next page is returned when more exist"
+}
+
+CURSOR_PROPERTY = {
+    "type": "string",
+    "description": "Cursor returned by the previous page of the same listing"
+}
+
+TOOLS = [
+    {
+        "name": "add_todo",
+        "description": "Add a new todo item with tags and priority",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "task": {
+                    "type": "string",
+                    "description": "The todo task description"
+                },
+                "tags": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Tags for the task (Administrative, Family, IT, Productivity, Project, Quick to finish, Pro, Work)"
+                },
+                "priority": {
+                    "type": "string",
+                    "description": "Priority level",
+                    "enum": ["Critical", "Important", "Moderate", "Non-essential"]
+                }
+            },
+            "required": ["task"]
+        }
+    },
+    {
+        "name": "add_todos",
+        "description": "Add several todo items at once (created in parallel, with per-item results)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "tasks": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "task": {
+                                "type": "string",
+                                "description": "The todo task description"
+                            },
+                            "tags": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Tags for the task (Administrative, Family, IT, Productivity, Project, Quick to finish, Pro, Work)"
+                            },
+                            "priority": {
+                                "type": "string",
+                                "enum": ["Critical", "Important", "Moderate", "Non-essential"]
+                            },
+                            "status": {
+                                "type": "string",
+                                "enum": ["To describe", "To validate", "To do", "Blocked", "In progress", "Killed", "Done"]
+                            },
+                            "due_date": {
+                                "type": "string",
+                                "description": "Due date (ISO 8601, e.g. 2024-05-31)"
+                            }
+                        },
+                        "required": ["task"]
+                    },
+                    "description": "The todos to create"
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of todos created in parallel"
+                }
+            },
+            "required": ["tasks"]
+        }
+    },
+    {
+        "name": "show_all_todos",
+        "description": "Show all active todo items from Notion",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "show_pro_tasks",
+        "description": "Show professional tasks (Pro tag)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "show_family_tasks",
+        "description": "Show family tasks (Family tag)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "show_admin_tasks",
+        "description": "Show administrative tasks (Administrative tag)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "show_quick_tasks",
+        "description": "Show quick tasks (Quick to finish tag)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "show_urgent_tasks",
+        "description": "Show urgent tasks (Critical and Important priorities)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "show_blocked_tasks",
+        "description": "Show blocked tasks",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "show_tasks_by_tag",
+        "description": "Show tasks filtered by specific tag",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "tag": {
+                    "type": "string",
+                    "description": "Tag to filter by",
+                    "enum": ["Administrative", "Family", "IT", "Productivity", "Project", "Quick to finish", "Pro", "Work"]
+                },
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": ["tag"]
+        }
+    },
+    {
+        "name": "show_tasks_by_priority",
+        "description": "Show tasks filtered by priority level",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "priority": {
+                    "type": "string",
+                    "description": "Priority to filter by",
+                    "enum": ["Critical", "Important", "Moderate", "Non-essential"]
+                },
+                "limit": LIMIT_PROPERTY,
+                "cursor": CURSOR_PROPERTY,
+                "output_format": OUTPUT_FORMAT_PROPERTY,
+                "fields": FIELDS_PROPERTY
+            },
+            "required": ["priority"]
+        }
+    },
+    {
+        "name": "update_task_status",
+        "description": "Update task status",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "task_id": {
+                    "type": "string",
+                    "description": "The ID of the todo task to update"
+                },
+                "status": {
+                    "type": "string",
+                    "description": "New status",
+                    "enum": ["To describe", "To validate", "To do", "Blocked", "In progress", "Killed", "Done"]
+                }
+            },
+            "required": ["task_id", "status"]
+        }
+    },
+    {
+        "name": "bulk_update_tasks",
+        "description": "Update several tasks at once (status, priority, tags, due date), in parallel across tasks",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "updates": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "task_id": {
+                                "type": "string",
+                                "description": "The ID of the todo task to update"
+                            },
+                            "status": {
+                                "type": "string",
+                                "enum": ["To describe", "To validate", "To do", "Blocked", "In progress", "Killed", "Done"]
+                            },
+                            "priority": {
+                                "type": "string",
+                                "enum": ["Critical", "Important", "Moderate", "Non-essential"]
+                            },
+                            "tags": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Replaces the task's tags"
+                            },
+                            "due_date": {
+                                "type": "string",
+                                "description": "Due date (ISO 8601, e.g. 2024-05-31)"
+                            }
+                        },
+                        "required": ["task_id"]
+                    },
+                    "description": "The updates to apply; updates to the same task are applied in order"
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of tasks updated in parallel"
+                }
+            },
+            "required": ["updates"]
+        }
+    },
+    {
+        "name": "setup_todo_database",
+        "description": "Create a new TODO database with proper schema if none exists",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "database_name": {
+                    "type": "string",
+                    "description": "Name for the new TODO database",
+                    "default": "TODO Database"
+                }
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "check_setup",
+        "description": "Check if the TODO database is properly configured and accessible",
+        "inputSchema": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    },
+    {
+        "name": "server_stats",
+        "description": "Show server metrics: calls, latency percentiles and Notion requests per tool and per Notion endpoint, retries, 429s and cache hit ratios",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "reset": {
+                    "type": "boolean",
+                    "description": "Start counting afresh after this report",
+                    "default": False
+                }
+            },
+            "required": []
+        }
+    }
+]
@@ -0,0 +1,159 @@
+"""
+Stdio transport for the minimal MCP server
+Newline-delimited JSON-RPC with one reusable encoder, buffered writes and
+logging that only pays for payloads it actually emits
+"""
+
+import os
+import sys
+import random
+import asyncio
+import logging
+from typing import Optional
+
+from .encoding import dumps_bytes
+
+logger = logging.getLogger('notion_mcp')
+
+# Longest JSON-RPC line accepted from the host
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def configure_logging(level: str = None):
+    """Send logs to stderr at NOTION_MCP_LOG_LEVEL (INFO by default)
+
+    Called from the entry points rather than at import, so embedding the
+    package never reconfigures the host's logging.
+    """
+    level = (level or os.getenv("NOTION_MCP_LOG_LEVEL") or "INFO").upper()
+    logging.basicConfig(level=getattr(logging, level, logging.INFO), stream=sys.stderr, format=LOG_FORMAT)
+
+
+class Abbreviated:
+    """Payload rendered for a log record only when the record is emitted"""
+
+    __slots__ = ("payload", "limit")
+
+    def __init__(self, payload: bytes, limit: int):
+        self.payload = payload
+        self.limit = limit
+
+    def __str__(self) -> str:
+        payload = self.payload.rstrip(b"\r\n")
+        text = payload[:self.limit].decode("utf-8", errors="replace")
+        if len(payload) > self.limit:
+            text += f"... ({len(payload)} bytes)"
+        return text
+
+
+class PayloadLog:
+    """DEBUG records of JSON-RPC traffic: lazy, sampled and truncated
+
+    Nothing is formatted unless DEBUG is enabled; then only a `sample_rate`
+    share of messages is logged, each cut to `limit` bytes.
+    """
+
+    def __init__(self, limit: int = None, sample_rate: float = None):
+        self.limit = limit if limit is not None else int(os.getenv("NOTION_MCP_LOG_PAYLOAD_LIMIT", "512"))
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("NOTION_MCP_LOG_SAMPLE_RATE", "1"))
+        self.skipped = 0
+
+    def __call__(self, direction: str, payload: bytes):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            self.skipped += 1
+            return
+        logger.debug("%s %s", direction, Abbreviated(payload, self.limit))
+
+
+async def open_stdin() -> asyncio.StreamReader:
+    """Non-blocking reader over stdin"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=MAX_MESSAGE_SIZE)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except (OSError, ValueError, NotImplementedError):
+        # Regular files and Windows consoles cannot be watched by the loop: read them in a thread
+        async def pump():
+            while True:
+                line = await loop.run_in_executor(None, sys.stdin.buffer.readline)
+                if not line:
+                    reader.feed_eof()
+                    return
+                reader.feed_data(line)
+        asyncio.ensure_future(pump())
+    return reader
+
+
+class StdioTransport:
+    """JSON-RPC messages over stdin/stdout, one JSON document per line
+
+    Messages are encoded once, queued, and written by a single task that
+    drains everything queued into one write and flushes at that message
+    boundary, so concurrent responses never interleave.
+    """
+
+    def __init__(self, output=None):
+        self.output = output if output is not None else sys.stdout.buffer
+        self.log = PayloadLog()
+        self.reader: Optional[asyncio.StreamReader] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Future] = None
+        self.messages_in = 0
+        self.messages_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def open(self):
+        self.reader = await open_stdin()
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.ensure_future(self._write_loop())
+
+    async def receive(self) -> Optional[bytes]:
+        """Next non-empty line, or None at end of input
+
+        Raises ValueError for a line longer than MAX_MESSAGE_SIZE (which is
+        discarded).
+        """
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return None
+            if line.strip():
+                self.messages_in += 1
+                self.bytes_in += len(line)
+                self.log("<-", line)
+                return line
+
+    def send(self, message: dict):
+        """Encode and queue a message; it is written as soon as the writer runs"""
+        data = dumps_bytes(message) + b"\n"
+        self.log("->", data)
+        self._queue.put_nowait(data)
+
+    async def _write_loop(self):
+        while True:
+            chunks = [await self._queue.get()]
+            while not self._queue.empty():
+                chunks.append(self._queue.get_nowait())
+            closing = None in chunks
+            if closing:
+                chunks = chunks[:chunks.index(None)]
+            if chunks:
+                data = b"".join(chunks)
+                self.output.write(data)
+                self.output.flush()
+                self.messages_out += len(chunks)
+                self.bytes_out += len(data)
+            if closing:
+                return
+
+    async def close(self):
+        """Write out everything queued, then stop the writer"""
+        if self._writer is not None:
+            self._queue.put_nowait(None)
+            await self._writer
+            self._writer = None
@@ -0,0 +1,348 @@
+"""
+Tool-call workloads: record how agents use the tools, replay it later
+With NOTION_MCP_WORKLOAD_LOG set, every tools/call is appended to a JSON
+Lines log (tool, argument shape with hashed string values, start and end
+times, result size). The replayer drives a fresh stdio server with the same
+call sequence and concurrency, at recorded speed or as fast as possible.
+
+    NOTION_MCP_WORKLOAD_LOG=workload.jsonl python -m notion_mcp
+    python -m notion_mcp.workload workload.jsonl --speed 0
+    NOTION_HTTP_REPLAY=production.jsonl.gz python -m notion_mcp.workload workload.jsonl
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('notion_mcp')
+
+# Marks a hashed string: "#<first 12 hex digits of its SHA-256>:<length>"
+HASH_PATTERN = re.compile(r"^#([0-9a-f]{12}):(\d+)$")
+UUID_PATTERN = re.compile(r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}")
+
+# Arguments holding page ids, remapped onto the replay database's pages
+ID_ARGUMENTS = ("task_id", "id")
+# Pagination cursors are only valid for the session that issued them
+DROPPED_ARGUMENTS = ("cursor",)
+
+
+def hash_value(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+
+
+def shape(value: Any) -> Any:
+    """Arguments with every string replaced by its hash and length
+
+    Numbers, booleans and structure are kept: limits and list lengths drive
+    the cost of a call and reveal nothing about the data.
+    """
+    if isinstance(value, str):
+        return f"#{hash_value(value)}:{len(value)}"
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [shape(item) for item in value]
+    return value
+
+
+class WorkloadRecorder:
+    """Appends one line per tool call; safe to share between server processes"""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self.session = f"{os.getpid()}-{int(time.time())}"
+        self._file = None
+
+    def record(self, tool: str, arguments: Any, started: float, ended: float, chars: int, error: bool):
+        entry = {
+            "session": self.session,
+            "tool": tool,
+            "args": shape(arguments or {}),
+            "start": round(started, 4),
+            "end": round(ended, 4),
+            "chars": chars,
+            "error": error,
+        }
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                # Append mode plus one write per line keeps lines whole when sessions interleave
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not append to workload log {self.path}: {str(e)}")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load(path: str, session: Optional[str] = None) -> List[dict]:
+    """Recorded calls in start order, optionally of one session only"""
+    calls = []
+    with open(os.path.expanduser(path), encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                entry = json.loads(line)
+                if session is None or entry["session"] == session:
+                    calls.append(entry)
+    calls.sort(key=lambda entry: entry["start"])
+    return calls
+
+
+# --- Replay ----------------------------------------------------------------------
+
+def enum_values(schema: Any) -> List[str]:
+    """Every enum value of a JSON schema, nested ones included"""
+    values = []
+    if isinstance(schema, dict):
+        values.extend(value for value in schema.get("enum", ()) if isinstance(value, str))
+        for item in schema.values():
+            values.extend(enum_values(item))
+    elif isinstance(schema, list):
+        for item in schema:
+            values.extend(enum_values(item))
+    return values
+
+
+class ArgumentRebuilder:
+    """Turns recorded argument shapes back into concrete arguments
+
+    Hashed strings are recovered when they hash like a known value (a schema
+    enum or one of `task_ids`); other page ids map to a stable pick among
+    `task_ids`, cursors are dropped and free text becomes filler of the
+    recorded length.
+    """
+
+    def __init__(self, tools: List[dict], task_ids: List[str]):
+        self.task_ids = task_ids
+        self.known: Dict[str, str] = {}
+        for value in enum_values([tool["inputSchema"] for tool in tools]) + task_ids:
+            self.known[hash_value(value)] = value
+        self.recovered = 0
+        self.remapped = 0
+        self.filled = 0
+
+    def value(self, name: Optional[str], value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: self.value(key, item) for key, item in value.items() if key not in DROPPED_ARGUMENTS}
+        if isinstance(value, list):
+            return [self.value(name, item) for item in value]
+        match = HASH_PATTERN.match(value) if isinstance(value, str) else None
+        if match is None:
+            return value
+        digest, length = match.group(1), int(match.group(2))
+        if digest in self.known:
+            self.recovered += 1
+            return self.known[digest]
+        if name in ID_ARGUMENTS and self.task_ids:
+            self.remapped += 1
+            return self.task_ids[int(digest, 16) % len(self.task_ids)]
+        self.filled += 1
+        return ("replayed " + digest)[:length].ljust(length, ".")
+
+    def arguments(self, shape: dict) -> dict:
+        return self.value(None, shape)
+
+
+class StdioServer:
+    """A `python -m notion_mcp` subprocess spoken to over newline-delimited JSON-RPC"""
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.process = None
+        self.next_id = 0
+        self.waiting: Dict[int, asyncio.Future] = {}
+        self._reader = None
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "notion_mcp",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            stderr=None if self.verbose else asyncio.subprocess.DEVNULL,
+            limit=64 * 1024 * 1024
+        )
+        self._reader = asyncio.ensure_future(self._read())
+        await self.request("initialize", {"protocolVersion": "2024-11-05", "capabilities": {},
+                                          "clientInfo": {"name": "notion_mcp.workload", "version": "1"}})
+        self.notify("notifications/initialized")
+
+    async def _read(self):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.waiting.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError("The server exited"))
+
+    def notify(self, method: str, params: dict = None):
+        self.process.stdin.write(json.dumps({"jsonrpc": "2.0", "method": method, "params": params or {}}).encode() + b"\n")
+
+    async def request(self, method: str, params: dict) -> dict:
+        self.next_id += 1
+        future = self.waiting[self.next_id] = asyncio.get_running_loop().create_future()
+        self.process.stdin.write(json.dumps({"jsonrpc": "2.0", "id": self.next_id, "method": method,
+                                             "params": params}).encode() + b"\n")
+        await self.process.stdin.drain()
+        return await future
+
+    async def call_tool(self, name: str, arguments: dict) -> str:
+        response = await self.request("tools/call", {"name": name, "arguments": arguments})
+        if "error" in response:
+            raise RuntimeError(response["error"].get("message"))
+        return "".join(content.get("text", "") for content in response["result"]["content"])
+
+    async def close(self):
+        self.process.stdin.close()
+        await self.process.wait()
+        await self._reader
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))] if values else 0.0
+
+
+async def replay(calls: List[dict], speed: float = 1.0, max_gap: float = 5.0, verbose: bool = False) -> dict:
+    """Replay recorded calls against a fresh server and report what it took
+
+    Calls start in recorded order and never before the calls that had
+    finished when they originally started, so the recorded concurrency is
+    kept. With `speed` above 0 each call also waits for its recorded start
+    time divided by `speed`, idle gaps being capped at `max_gap` seconds.
+    """
+    from .tools import TOOLS
+
+    server = StdioServer(verbose)
+    await server.start()
+    try:
+        replay_cassette = os.getenv("NOTION_HTTP_REPLAY")
+        if replay_cassette:
+            from .cassette import Cassette
+            task_ids = Cassette.load(replay_cassette).task_ids()
+        elif any(name in json.dumps(call["args"]) for call in calls for name in ID_ARGUMENTS):
+            # Asking the server warms its mirror, so start from clean counters below
+            logger.warning("Listing the database to map recorded task ids; its caches start warm")
+            text = await server.call_tool("show_all_todos", {"limit": 100000, "output_format": "json", "fields": ["id"]})
+            task_ids = list(dict.fromkeys(UUID_PATTERN.findall(text)))
+        else:
+            task_ids = []
+        await server.call_tool("server_stats", {"reset": True})
+        rebuilder = ArgumentRebuilder(TOOLS, task_ids)
+
+        by_end = sorted(range(len(calls)), key=lambda index: calls[index]["end"])
+        done = [asyncio.Event() for _ in calls]
+        results: List[Optional[dict]] = [None] * len(calls)
+
+        async def run(index: int, arguments: dict):
+            started = time.perf_counter()
+            try:
+                text = await server.call_tool(calls[index]["tool"], arguments)
+                results[index] = {"seconds": time.perf_counter() - started, "chars": len(text), "error": text.startswith("Error")}
+            except (RuntimeError, ConnectionError) as e:
+                results[index] = {"seconds": time.perf_counter() - started, "chars": 0, "error": True}
+                logger.warning(f"{calls[index]['tool']} failed: {str(e)}")
+            finally:
+                done[index].set()
+
+        tasks = []
+        finished = 0
+        offset = 0.0
+        began = time.perf_counter()
+        for index, call in enumerate(calls):
+            # Wait for the calls that had ended before this one started
+            while finished < len(by_end) and calls[by_end[finished]]["end"] <= call["start"]:
+                await done[by_end[finished]].wait()
+                finished += 1
+            if speed > 0:
+                if index:
+                    offset += min(call["start"] - calls[index - 1]["start"], max_gap) / speed
+                delay = began + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(run(index, rebuilder.arguments(call["args"]))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - began
+
+        stats = json.loads(await server.call_tool("server_stats", {}))
+    finally:
+        await server.close()
+
+    tools: Dict[str, dict] = {}
+    for call, result in zip(calls, results):
+        tool = tools.setdefault(call["tool"], {"calls": 0, "errors": 0, "recorded": [], "replayed": []})
+        tool["calls"] += 1
+        tool["errors"] += result["error"]
+        tool["recorded"].append(call["end"] - call["start"])
+        tool["replayed"].append(result["seconds"])
+    for tool in tools.values():
+        recorded, replayed = tool.pop("recorded"), tool.pop("replayed")
+        tool.update(
+            recorded_p50_ms=round(_percentile(recorded, 50) * 1000, 2),
+            recorded_p95_ms=round(_percentile(recorded, 95) * 1000, 2),
+            p50_ms=round(_percentile(replayed, 50) * 1000, 2),
+            p95_ms=round(_percentile(replayed, 95) * 1000, 2),
+        )
+    return {
+        "calls": len(calls),
+        "recorded_s": round(calls[-1]["end"] - calls[0]["start"], 3) if calls else 0.0,
+        "replayed_s": round(elapsed, 3),
+        "arguments": {"recovered": rebuilder.recovered, "remapped_ids": rebuilder.remapped, "filled": rebuilder.filled},
+        "tools": dict(sorted(tools.items())),
+        "server": stats,
+    }
+
+
+def print_report(report: dict):
+    print(f"{report['calls']} calls: {report['recorded_s']}s recorded, {report['replayed_s']}s replayed")
+    header = f"{'tool':<24}{'calls':>8}{'errors':>8}{'rec p50 ms':>12}{'rec p95 ms':>12}{'p50 ms':>10}{'p95 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, tool in report["tools"].items():
+        print(f"{name:<24}{tool['calls']:>8}{tool['errors']:>8}{tool['recorded_p50_ms']:>12}"
+              f"{tool['recorded_p95_ms']:>12}{tool['p50_ms']:>10}{tool['p95_ms']:>10}")
+    caches = report["server"].get("caches", {})
+    if caches:
+        print("caches: " + ", ".join(f"{name} {cache['hit_ratio']}" for name, cache in caches.items()))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a recorded tool-call workload (NOTION_MCP_WORKLOAD_LOG) "
+                                                 "against a fresh server, configured by the environment")
+    parser.add_argument("log", help="workload log to replay")
+    parser.add_argument("--session", help="only replay this recorded session")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="1 keeps the recorded pacing, 2 doubles it, 0 runs as fast as the recorded concurrency allows")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="longest idle time kept between calls, in recorded seconds")
+    parser.add_argument("--json", metavar="PATH", help="also write the full report to PATH")
+    parser.add_argument("--verbose", action="store_true", help="show the server's log")
+    args = parser.parse_args()
+
+    logging.basicConfig(stream=sys.stderr, level=logging.WARNING, format="%(levelname)s: %(message)s")
+    calls = load(args.log, args.session)
+    if not calls:
+        parser.exit(1, f"No calls to replay in {args.log}\n")
+    # The replaying server must not log the replay into the workload it replays
+    os.environ["NOTION_MCP_WORKLOAD_LOG"] = ""
+    report = asyncio.run(replay(calls, args.speed, args.max_gap, args.verbose))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import asyncio
+import os
+
+import pytest
+
+# core reads its configuration at import: pin it before any test imports it.
+# Empty values also override whatever a local .env sets.
+DATABASE_ID = "0e4f4c5e-2f55-4b1a-9d2e-6c1f8e3a7b10"
+os.environ.update(
+    NOTION_API_KEY="test",
+    NOTION_DATABASE_ID=DATABASE_ID,
+    NOTION_CACHE_TTL="0",
+    NOTION_RATE_LIMIT="0",
+    NOTION_RETRY_BASE_DELAY="0.001",
+    NOTION_OUTPUT_FORMAT="json",
+    NOTION_LIST_PAGE_SIZE="100",
+    NOTION_TASK_STORE="",
+    NOTION_MCP_STATS_FILE="",
+    NOTION_MCP_WORKLOAD_LOG="",
+    NOTION_HTTP_RECORD="",
+    NOTION_HTTP_REPLAY="",
+    NOTION_API_BASE_URL="",
+)
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def vectorised(request, monkeypatch):
+    """Run a test with and without numpy"""
+    from notion_mcp import columnar
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(columnar, "_numpy", False)
+    else:
+        monkeypatch.setattr(columnar, "_numpy", None)
+    return request.param
+
+
+@pytest.fixture
+def emulator():
+    from notion_mcp.emulator import NotionEmulator
+    emulator = NotionEmulator(seed=1)
+    emulator.seed_todos(250, database_id=DATABASE_ID)
+    return emulator
+
+
+@pytest.fixture
+def core(emulator):
+    """The shared engine talking to a fresh emulator, with clean process-wide state"""
+    from notion_mcp import core
+    core.notion.transport = emulator.transport
+    core._database_exists = None
+    core.reset_stats()
+    yield core
+    asyncio.run(core.notion.aclose())
+    core.notion.transport = None
+
+
+@pytest.fixture(scope="session")
+def make_client():
+    """Build a NotionClient over a transport: no rate limit, one attempt, a breaker that stays closed"""
+    from notion_mcp.client import NotionClient
+    from notion_mcp.ratelimit import RateLimiter
+    from notion_mcp.retry import CircuitBreaker, RetryPolicy
+
+    def make(transport, **overrides):
+        settings = {
+            "transport": transport,
+            "limiter": RateLimiter(rate=0),
+            "retry": RetryPolicy(max_attempts=1),
+            "breaker": CircuitBreaker(failure_threshold=1000),
+        }
+        settings.update(overrides)
+        return NotionClient("test", **settings)
+    return make
+
+
+@pytest.fixture(scope="session")
+def with_client(make_client):
+    """Run `action(client)` on a fresh client over a transport, closing it afterwards"""
+    def run(transport, action, **overrides):
+        async def go():
+            client = make_client(transport, **overrides)
+            try:
+                return await action(client)
+            finally:
+                await client.aclose()
+        return asyncio.run(go())
+    return run
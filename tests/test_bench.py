@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH = Path(__file__).resolve().parent.parent / "benchmarks" / "bench.py"
+
+
+def bench(*args) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(BENCH), "--sizes", "100", "--mirror", "on", "--rounds", "2",
+                           "--budget", "0.2", "--concurrency", "2", "--cases", "list_first_page,add_todo", *args],
+                          capture_output=True, text=True, timeout=120)
+
+
+def test_saved_baseline_compares_clean_and_flags_regressions(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    saved = bench("--save", str(baseline))
+    assert saved.returncode == 0, saved.stderr
+    cases = json.loads(baseline.read_text())["scenarios"]["100/mirror"]
+    assert set(cases) == {"list_first_page", "add_todo"}
+    assert cases["add_todo"]["requests_per_call"] == 1.0
+
+    # Any change in Notion requests per call is reported, whatever the threshold
+    report = json.loads(baseline.read_text())
+    report["scenarios"]["100/mirror"]["add_todo"]["requests_per_call"] = 0.5
+    doctored = tmp_path / "doctored.json"
+    doctored.write_text(json.dumps(report))
+    compared = bench("--compare", str(doctored), "--threshold", "1000")
+    assert compared.returncode == 1
+    assert "REGRESSION" in compared.stdout and "requests_per_call" in compared.stdout
+
+
+def test_unknown_case_is_rejected():
+    process = subprocess.run([sys.executable, str(BENCH), "--cases", "nope"], capture_output=True, text=True)
+    assert process.returncode == 2 and "unknown cases: nope" in process.stderr
@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+import pytest
+
+from notion_mcp.cassette import Cassette, CassetteMiss, ReplayTransport
+
+QUERY = "/v1/databases/0e4f4c5e-2f55-4b1a-9d2e-6c1f8e3a7b10/query"
+FILTER = {"property": "Status", "status": {"equals": "Blocked"}}
+
+
+def page(request: dict, results: list, next_cursor=None) -> dict:
+    return {"t": 0, "d": 0, "method": "POST", "url": QUERY, "request": request, "status": 200, "headers": {},
+            "response": {"object": "list", "results": results, "has_more": next_cursor is not None, "next_cursor": next_cursor}}
+
+
+def recorded() -> Cassette:
+    """One query paged through three pages"""
+    return Cassette({"cassette": 1}, [
+        page({"filter": FILTER}, [{"id": "a"}], "cursor-1"),
+        page({"filter": FILTER, "start_cursor": "cursor-1"}, [{"id": "b"}], "cursor-2"),
+        page({"filter": FILTER, "start_cursor": "cursor-2"}, [{"id": "c"}]),
+    ])
+
+
+async def walk(transport, body: dict) -> list:
+    """Follow next_cursor like core.iter_pages, with a safety stop"""
+    ids = []
+    async with httpx.AsyncClient(transport=transport, base_url="https://api.notion.com") as client:
+        for _ in range(20):
+            data = (await client.post(QUERY, json=body)).json()
+            ids += [result["id"] for result in data["results"]]
+            if not data["has_more"]:
+                return ids
+            body = dict(body, start_cursor=data["next_cursor"])
+    raise AssertionError("replayed pagination did not end")
+
+
+def test_exact_pagination_replays_in_order():
+    assert asyncio.run(walk(ReplayTransport(recorded(), speed=0), {"filter": FILTER})) == ["a", "b", "c"]
+
+
+def test_other_filter_follows_the_recorded_cursors_and_ends():
+    transport = ReplayTransport(recorded(), speed=0)
+    ids = asyncio.run(walk(transport, {"filter": {"property": "Status", "status": {"equals": "Done"}}}))
+    assert ids == ["a", "b", "c"]
+    assert transport.stats == {"exact": 0, "approximate": 3, "missed": 0}
+
+
+def test_unknown_cursor_falls_back_to_a_last_page():
+    for _ in range(3):
+        entry, exact = recorded().find("POST", QUERY, '{"start_cursor": "never-recorded"}')
+        assert not exact
+        assert entry["response"]["has_more"] is False
+
+
+def test_unknown_cursor_without_a_last_page_misses():
+    cassette = Cassette({"cassette": 1}, recorded().entries[:2])
+    transport = ReplayTransport(cassette, speed=0)
+    with pytest.raises(CassetteMiss):
+        asyncio.run(walk(transport, {"filter": FILTER, "start_cursor": "never-recorded"}))
+
+
+def test_task_ids_come_from_recorded_queries():
+    cassette = recorded()
+    cassette.entries.append({"method": "GET", "url": "/v1/pages/d", "request": None, "status": 200, "response": {"id": "d"}})
+    cassette.entries.append(page({}, [{"id": "a"}, {"id": "e"}]))
+    assert cassette.task_ids() == ["a", "b", "c", "e"]
@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+import pytest
+
+from notion_mcp.client import NotionClient
+from notion_mcp.retry import CircuitBreaker, CircuitOpenError
+
+
+def tripping() -> CircuitBreaker:
+    """Opens on the first failure and lets the next request through as a trial"""
+    return CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+
+
+def test_cancelled_trial_does_not_wedge_the_breaker(make_client):
+    state = {"mode": "down"}
+    released = asyncio.Event()
+
+    async def handler(request):
+        if state["mode"] == "down":
+            return httpx.Response(503)
+        if state["mode"] == "hang":
+            await released.wait()
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        client = make_client(httpx.MockTransport(handler), breaker=tripping())
+        # One failure opens the circuit; with reset_timeout=0 the next request is the half-open trial
+        assert (await client.get("/users/me")).status_code == 503
+        assert client.breaker.state == "open"
+
+        state["mode"] = "hang"
+        trial = asyncio.ensure_future(client.get("/users/me"))
+        await asyncio.sleep(0.01)
+        assert client.breaker.state == "half_open"
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # Notion recovered: the next request becomes a new trial and closes the circuit
+        state["mode"] = "up"
+        assert (await client.get("/users/me")).status_code == 200
+        assert client.breaker.state == "closed"
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_trial_failing_outside_the_transport_releases_the_breaker(make_client):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        if len(calls) == 2:
+            raise LookupError("no recorded response")
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        client = make_client(httpx.MockTransport(handler), breaker=tripping())
+        await client.get("/users/me")
+        with pytest.raises(LookupError):
+            await client.get("/users/me")
+        assert (await client.get("/users/me")).status_code == 200
+        assert client.breaker.state == "closed"
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_open_breaker_rejects_until_reset_timeout(make_client):
+    async def handler(request):
+        return httpx.Response(503)
+
+    async def scenario():
+        client = make_client(httpx.MockTransport(handler), breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60.0))
+        await client.get("/users/me")
+        with pytest.raises(CircuitOpenError):
+            await client.get("/users/me")
+        assert client.breaker.rejected == 1
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_requests_share_one_pooled_client(make_client):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        client = make_client(httpx.MockTransport(handler))
+        await client.get("/users/me")
+        pooled = client._client
+        await client.post("/search", json={})
+        assert client._client is pooled
+        await client.aclose()
+        assert not client.is_open
+        # Closing only drops the pool: the next request opens a new one
+        await client.get("/users/me")
+        assert client.is_open and client._client is not pooled
+        await client.aclose()
+
+    asyncio.run(scenario())
+    assert [request.url.path for request in seen] == ["/v1/users/me", "/v1/search", "/v1/users/me"]
+    assert all(request.headers["Notion-Version"] and request.headers["Authorization"] == "Bearer test" for request in seen)
+
+
+def test_pool_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("NOTION_HTTP_MAX_CONNECTIONS", "4")
+    monkeypatch.setenv("NOTION_HTTP_KEEPALIVE_EXPIRY", "12.5")
+    client = NotionClient.from_env("secret")
+    assert client.limits.max_connections == 4
+    assert client.limits.keepalive_expiry == 12.5
+    assert NotionClient.from_env("secret", max_connections=2).limits.max_connections == 2
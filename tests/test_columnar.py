@@ -0,0 +1,128 @@
+import tracemalloc
+
+import pytest
+
+from notion_mcp import columnar
+from notion_mcp.columnar import ColumnarTodos
+
+
+def todo(index: int, **overrides) -> dict:
+    values = {
+        "id": f"00000000-0000-0000-0000-{index:012d}",
+        "task": f"Task {index}",
+        "tags": ["Pro"] if index % 2 else ["Family", "Quick to finish"],
+        "status": "Done" if index % 3 == 0 else "To do",
+        "priority": "Critical" if index % 4 == 0 else "Moderate",
+        "created": f"2026-10-{index % 28 + 1:02d}T08:00:00.000Z",
+        "due_date": None,
+    }
+    values.update(overrides)
+    return values
+
+
+def test_missing_created_sorts_last_on_both_paths(monkeypatch):
+    pytest.importorskip("numpy")
+    todos = [todo(0, created=None), todo(1, created="2026-10-01T08:00:00.000Z"), todo(2, created="2026-10-02T08:00:00.000Z")]
+    orders = {}
+    for name, module in (("numpy", False), ("pure", None)):
+        monkeypatch.setattr(columnar, "_numpy", module)
+        table = ColumnarTodos.from_todos(todos)
+        orders[name] = [row["task"] for row in table.select()]
+    assert orders["numpy"] == orders["pure"] == ["Task 2", "Task 1", "Task 0"]
+
+
+def test_ties_keep_insertion_order(vectorised):
+    todos = [todo(index, created="2026-10-01T08:00:00.000Z") for index in range(5)]
+    assert [row["id"] for row in ColumnarTodos.from_todos(todos).select()] == [t["id"] for t in todos]
+
+
+def test_rows_round_trip(vectorised):
+    todos = [todo(1), todo(2, created=None), todo(3, created=""), todo(4, id="not-a-uuid", created="2026-10-05"),
+             todo(5, due_date="2026-10-17"), todo(6, due_date="2026-10-17T23:30:00.000-05:00"), todo(7, due_date="")]
+    table = ColumnarTodos.from_todos(todos)
+    assert sorted(table.select(), key=lambda row: row["task"]) == todos
+
+
+def test_upsert_and_remove_find_rows_by_id(vectorised):
+    table = ColumnarTodos.from_todos(todo(index) for index in range(10))
+    table.upsert(todo(3, task="Renamed"))
+    table.remove(todo(5)["id"])
+    table.upsert(todo(10))
+    tasks = {row["id"]: row["task"] for row in table.select()}
+    assert len(table) == len(tasks) == 10
+    assert tasks[todo(3)["id"]] == "Renamed"
+    assert todo(5)["id"] not in tasks
+    table.remove(todo(5)["id"])
+    assert len(table) == 10
+
+
+def test_title_churn_is_compacted():
+    table = ColumnarTodos.from_todos(todo(index) for index in range(10))
+    for version in range(20000):
+        table.upsert(todo(version % 10, task=f"Task {version % 10} edited {version}"))
+    live = sum(len(row["task"].encode()) for row in table.select())
+    assert len(table.titles.buffer) <= 2 * live + ColumnarTodos.COMPACT_MIN_BYTES + 64
+    assert table.select(fields=["task"])[0]["task"].startswith("Task")
+
+
+def test_filters_match_on_both_paths(vectorised):
+    table = ColumnarTodos.from_todos(todo(index) for index in range(50))
+    filter = {"and": [
+        {"property": "Status", "status": {"does_not_equal": "Done"}},
+        {"or": [{"property": "Tags", "multi_select": {"contains": "Pro"}},
+                {"property": "Priority", "select": {"equals": "Critical"}}]},
+    ]}
+    expected = [t["id"] for t in sorted((todo(index) for index in range(50)), key=lambda t: t["created"], reverse=True)
+                if t["status"] != "Done" and ("Pro" in t["tags"] or t["priority"] == "Critical")]
+    assert sorted(row["id"] for row in table.select(filter)) == sorted(expected)
+
+
+def test_ids_are_found_in_the_index_and_the_tail(vectorised):
+    table = ColumnarTodos.from_todos(todo(index) for index in range(3000))
+    assert table.get(todo(1234)["id"])["task"] == "Task 1234"
+    # Appended after the index was built
+    table.upsert(todo(5000))
+    table.upsert(todo(5001, id="not-a-uuid"))
+    assert table.get(todo(5000)["id"])["task"] == "Task 5000"
+    assert table.get("not-a-uuid")["task"] == "Task 5001"
+    # A removed and re-added id leaves a dead row with the same packed id
+    table.remove(todo(7)["id"])
+    assert table.get(todo(7)["id"]) is None
+    table.upsert(todo(7, task="Back"))
+    assert table.get(todo(7)["id"])["task"] == "Back"
+    table.upsert(todo(7, task="Edited"))
+    assert len(table) == 3002
+    assert table.get(todo(9999)["id"]) is None
+
+
+def test_due_dates_filter_on_both_paths(vectorised):
+    todos = [todo(1, due_date="2026-10-17"), todo(2, due_date="2026-10-17T23:30:00.000-05:00"), todo(3, due_date="2026-10-20"),
+             todo(4)]
+    table = ColumnarTodos.from_todos(todos)
+    rows = table.select({"property": "Due date", "date": {"on_or_after": "2026-10-18"}}, fields=["task"])
+    assert sorted(row["task"] for row in rows) == ["Task 2", "Task 3"]
+    rows = table.select({"property": "Due date", "date": {"is_empty": True}}, fields=["task"])
+    assert [row["task"] for row in rows] == ["Task 4"]
+
+
+def test_views_share_the_id_index():
+    table = ColumnarTodos.from_todos(todo(index) for index in range(3000))
+    table.get(todo(1)["id"])
+    view = table.view()
+    assert view.table._index is table._index
+    table.upsert(todo(1, task="Changed"))
+    assert next(row for row in view[:] if row["id"] == todo(1)["id"])["task"] == "Task 1"
+
+
+def test_memory_usage_matches_traced_allocations(vectorised):
+    todos = [todo(index, due_date=f"2026-11-{index % 28 + 1:02d}" if index % 3 else None) for index in range(20000)]
+    columnar.numpy()
+    tracemalloc.start()
+    try:
+        table = ColumnarTodos.from_todos(todos)
+        table.get(todos[0]["id"])
+        table.order()
+        traced = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert 0.85 * traced <= table.memory_usage() <= 1.15 * traced
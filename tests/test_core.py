@@ -0,0 +1,183 @@
+import asyncio
+
+import httpx
+
+
+def respond_with(*statuses):
+    """Transport answering GET /databases/{id} with `statuses` in turn"""
+    remaining = list(statuses)
+
+    def handler(request):
+        status = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        return httpx.Response(status, json={"object": "database"} if status == 200 else {"object": "error"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_database_check_only_caches_a_404(core):
+    for status in (429, 401, 403):
+        core._database_exists = None
+        core.notion.transport = respond_with(status, 200)
+        asyncio.run(core.notion.aclose())
+        assert asyncio.run(core.check_database_exists()) is False
+        assert asyncio.run(core.check_database_exists()) is True
+
+    core._database_exists = None
+    core.notion.transport = respond_with(404, 200)
+    asyncio.run(core.notion.aclose())
+    assert asyncio.run(core.check_database_exists()) is False
+    assert asyncio.run(core.check_database_exists()) is False
+
+
+def test_database_check_against_the_emulator(core):
+    assert asyncio.run(core.check_database_exists()) is True
+
+
+def test_stats_reset_covers_client_counters(core):
+    import json
+
+    asyncio.run(core.call_tool("show_all_todos", {"limit": 5}))
+    core.notion.limiter.throttled = 3
+    core.notion.breaker.trips = 2
+    before = json.loads(asyncio.run(core.call_tool("server_stats", {"reset": True}))[0]["text"])
+    assert before["caches"]["coalesced_reads"]["misses"] > 0
+    assert before["rate_limiter"]["throttled"] == 3
+
+    after = json.loads(asyncio.run(core.call_tool("server_stats", {}))[0]["text"])
+    assert after["caches"]["coalesced_reads"] == {"hits": 0, "misses": 0, "hit_ratio": None}
+    assert after["rate_limiter"]["throttled"] == 0
+    assert after["circuit_breaker"]["trips"] == 0
+    assert list(after["tools"]) == ["server_stats"]
+
+
+def test_list_results_flag_local_data_older_than_the_ttl(core, emulator, tmp_path, monkeypatch):
+    import re
+    import time
+
+    from notion_mcp.emulator import Faults
+    from notion_mcp.store import TaskStore
+
+    store = TaskStore(str(tmp_path / "tasks.db"), ttl=60, database_id=core.DATABASE_ID)
+    monkeypatch.setattr(core, "mirror", store)
+    monkeypatch.setattr(core, "_mirror_unreachable", False)
+    try:
+        first = asyncio.run(core.call_tool("show_all_todos", {"limit": 5}))
+        assert len(first) == 2
+        cursor = re.search(r'cursor "([^"]+)"', first[1]["text"]).group(1)
+
+        # A page resumed ten minutes later comes from the copy synced back then
+        later = time.time() + 600
+        monkeypatch.setattr(core.time, "time", lambda: later)
+        resumed = asyncio.run(core.call_tool("show_all_todos", {"limit": 5, "cursor": cursor}))
+        assert resumed[-1]["text"].startswith("⚠️ Not refreshed from Notion") and "(10 min ago)" in resumed[-1]["text"]
+
+        # A refresh that fails serves the same copy, with the reason
+        emulator.faults = Faults(error_rate=1.0, seed=1)
+        stale = asyncio.run(core.call_tool("show_all_todos", {"limit": 5}))
+        assert stale[-1]["text"].startswith("⚠️ Notion could not be reached")
+
+        emulator.faults = Faults()
+        fresh = asyncio.run(core.call_tool("show_all_todos", {"limit": 5}))
+        assert not any(content["text"].startswith("⚠️") for content in fresh)
+    finally:
+        store.close()
+
+
+def test_iter_pages_follows_cursors_lazily(core, emulator):
+    async def scenario():
+        pages = core.iter_pages(page_size=100)
+        first = [await pages.__anext__() for _ in range(100)]
+        fetched = emulator.stats["requests"]
+        rest = [page async for page in pages]
+        return first, fetched, rest
+
+    first, fetched, rest = asyncio.run(scenario())
+    # The second Notion page is only requested once the first one is used up
+    assert fetched == 1
+    ids = [page["id"] for page in first + rest]
+    assert len(ids) == len(set(ids)) == 250
+    assert emulator.stats["requests"] == 3
+
+
+def test_writes_go_through_to_the_mirror(core, emulator, monkeypatch):
+    import json
+
+    from notion_mcp.cache import TodoMirror
+
+    monkeypatch.setattr(core, "mirror", TodoMirror(ttl=60))
+    asyncio.run(core.call_tool("show_all_todos", {"limit": 1}))
+    assert len(core.mirror) == 250
+    before = set(emulator.page_ids(core.DATABASE_ID))
+    requests = emulator.stats["requests"]
+
+    asyncio.run(core.call_tool("add_todo", {"task": "Write the release notes", "priority": "Critical"}))
+    (page_id,) = set(emulator.page_ids(core.DATABASE_ID)) - before
+    asyncio.run(core.call_tool("update_task_status", {"task_id": page_id, "status": "Blocked"}))
+    assert core.mirror.get(page_id)["status"] == "Blocked"
+
+    listed = asyncio.run(core.call_tool("show_blocked_tasks", {"limit": 100, "fields": ["id", "task"]}))
+    assert {"id": page_id, "task": "Write the release notes"} in json.loads(listed[0]["text"])
+    # Only the two writes reached Notion: the listing came from the mirror
+    assert emulator.stats["requests"] == requests + 2
+
+
+def test_add_todos_reports_each_item_in_order(core, emulator):
+    import json
+
+    from notion_mcp.emulator import Faults
+
+    emulator.faults = Faults(latency=0.01)
+    tasks = [{"task": f"Task {index}", "tags": ["Pro"]} for index in range(6)]
+    tasks.insert(2, {"priority": "Critical"})
+    text = asyncio.run(core.call_tool("add_todos", {"tasks": tasks, "concurrency": 3}))[0]["text"]
+    assert text.startswith("Added 6/7 todos")
+    results = json.loads(text.split("\n\n", 1)[1])
+    assert [result["index"] for result in results] == list(range(7))
+    assert results[2] == {"index": 2, "ok": False, "error": "Task is required"}
+    created = [result for result in results if result["ok"]]
+    assert [result["task"] for result in created] == [f"Task {index}" for index in range(6)]
+    assert {result["id"] for result in created} <= set(emulator.page_ids(core.DATABASE_ID))
+
+
+def test_bulk_update_applies_updates_to_one_page_in_order(core, emulator):
+    import json
+
+    from notion_mcp.emulator import Faults
+
+    emulator.faults = Faults(latency=0.01, jitter=0.01, seed=4)
+    first, second = emulator.page_ids(core.DATABASE_ID)[:2]
+    updates = [
+        {"task_id": first, "status": "In progress"},
+        {"task_id": second, "priority": "Critical"},
+        {"status": "Done"},
+        {"task_id": first, "status": "Done"},
+        {"task_id": second},
+    ]
+    text = asyncio.run(core.call_tool("bulk_update_tasks", {"updates": updates, "concurrency": 4}))[0]["text"]
+    assert text.startswith("Updated 3/5 tasks")
+    results = json.loads(text.split("\n\n", 1)[1])
+    assert [result["ok"] for result in results] == [True, True, False, True, False]
+    assert results[2]["error"] == "Task ID is required"
+    assert results[4]["error"] == "Nothing to update"
+    assert emulator.pages[first]["properties"]["Status"]["status"]["name"] == "Done"
+    assert emulator.pages[second]["properties"]["Priority"]["select"]["name"] == "Critical"
+
+
+def test_fields_limit_the_downloaded_properties_and_the_output(core, emulator):
+    import json
+
+    queries = []
+
+    async def spy(request):
+        queries.append(request.url)
+        return await emulator.transport.handle_async_request(request)
+
+    core.notion.transport = httpx.MockTransport(spy)
+    listed = asyncio.run(core.call_tool("show_all_todos", {"limit": 3, "fields": "status, task"}))
+    todos = json.loads(listed[0]["text"])
+    assert len(todos) == 3 and all(list(todo) == ["status", "task"] for todo in todos)
+    query = next(url for url in queries if url.path.endswith("/query"))
+    assert len(query.params.get_list("filter_properties")) == 2
+
+    error = asyncio.run(core.call_tool("show_all_todos", {"fields": ["task", "owner"]}))
+    assert "Unknown fields: owner" in error[0]["text"]
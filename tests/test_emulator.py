@@ -0,0 +1,231 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from notion_mcp.client import NotionClient
+from notion_mcp.columnar import ColumnarTodos
+from notion_mcp.core import create_combined_filter
+from notion_mcp.emulator import Faults, NotionEmulator
+from notion_mcp.filters import compile_filter
+from notion_mcp.ratelimit import RateLimiter
+from notion_mcp.retry import RetryPolicy
+from notion_mcp.schema import compile_extractor
+from notion_mcp.store import TaskStore
+
+from conftest import DATABASE_ID
+
+
+async def query_all(client: NotionClient, filter: dict = None, page_size: int = 100) -> list:
+    """Every page matching a filter, following cursors"""
+    pages, body = [], {"page_size": page_size}
+    if filter:
+        body["filter"] = filter
+    while True:
+        response = await client.post(f"/databases/{DATABASE_ID}/query", json=body, idempotent=True)
+        assert response.status_code == 200, response.text
+        data = response.json()
+        pages.extend(data["results"])
+        if not data["has_more"]:
+            assert data["next_cursor"] is None
+            return pages
+        body["start_cursor"] = data["next_cursor"]
+
+
+# --- Pagination --------------------------------------------------------------
+
+def test_cursors_walk_every_page_once(emulator, with_client):
+    async def pages(client):
+        first = (await client.post(f"/databases/{DATABASE_ID}/query", json={"page_size": 100})).json()
+        return first, await query_all(client, page_size=100)
+
+    first, pages = with_client(emulator.transport, pages)
+    assert len(first["results"]) == 100 and first["has_more"] and first["next_cursor"]
+    ids = [page["id"] for page in pages]
+    assert len(ids) == len(set(ids)) == 250
+    assert set(ids) == set(emulator.page_ids(DATABASE_ID))
+    # Default order: newest first
+    created = [page["created_time"] for page in pages]
+    assert created == sorted(created, reverse=True)
+    assert emulator.stats["requests"] == 4
+
+
+def test_last_page_is_short(emulator, with_client):
+    async def last(client):
+        body = {"page_size": 100}
+        for _ in range(3):
+            data = (await client.post(f"/databases/{DATABASE_ID}/query", json=body)).json()
+            body["start_cursor"] = data["next_cursor"]
+        return data
+
+    data = with_client(emulator.transport, last)
+    assert len(data["results"]) == 50
+    assert data["has_more"] is False and data["next_cursor"] is None
+
+
+@pytest.mark.parametrize("body", [{"page_size": 0}, {"page_size": 101}, {"start_cursor": "not-a-cursor"}])
+def test_bad_paging_is_rejected(emulator, body, with_client):
+    async def query(client):
+        return await client.post(f"/databases/{DATABASE_ID}/query", json=body)
+
+    response = with_client(emulator.transport, query)
+    assert response.status_code == 400
+    assert response.json()["code"] == "validation_error"
+
+
+# --- Faults ------------------------------------------------------------------
+
+def test_rate_limited_queries_are_retried_after_retry_after(emulator, with_client):
+    emulator.faults = Faults(throttle_rate=0.3, retry_after=0.01, seed=3)
+    client_settings = {"limiter": RateLimiter(rate=1000, burst=1000), "max_throttle_retries": 20}
+
+    async def walk(client):
+        return await query_all(client, page_size=25), client.limiter.throttled
+
+    pages, throttled = with_client(emulator.transport, walk, **client_settings)
+    assert len({page["id"] for page in pages}) == 250
+    assert emulator.stats["throttled"] > 0
+    assert throttled == emulator.stats["throttled"]
+    assert emulator.stats["requests"] == 10 + emulator.stats["throttled"]
+
+
+def test_server_errors_are_retried_for_reads(emulator, with_client):
+    emulator.faults = Faults(error_rate=0.3, seed=5)
+    retry = RetryPolicy(max_attempts=20, base_delay=0.001, max_delay=0.002)
+
+    async def walk(client):
+        return await query_all(client, page_size=25), client.retries
+
+    pages, retries = with_client(emulator.transport, walk, retry=retry)
+    assert len({page["id"] for page in pages}) == 250
+    assert emulator.stats["errors"] > 0
+    assert retries == emulator.stats["errors"]
+
+
+def test_server_errors_are_not_retried_for_writes(emulator, with_client):
+    emulator.faults = Faults(error_rate=1.0, seed=5)
+    retry = RetryPolicy(max_attempts=5, base_delay=0.001, max_delay=0.002)
+
+    async def create(client):
+        body = {"parent": {"database_id": DATABASE_ID}, "properties": {"Task": {"title": [{"text": {"content": "New"}}]}}}
+        return await client.post("/pages", json=body)
+
+    response = with_client(emulator.transport, create, retry=retry)
+    assert response.status_code >= 500
+    assert emulator.stats["requests"] == 1
+
+
+# --- Filter parity -----------------------------------------------------------
+
+def title(text: str) -> dict:
+    return {"title": [{"text": {"content": text}}]}
+
+
+TODAY = datetime.now(timezone.utc).date()
+
+# Pages beyond the seeded ones: offset datetimes, a missing priority and due
+# dates around today for the relative operators
+EXTRA_PAGES = [
+    {"Task": title("Due today"), "Status": {"status": {"name": "To do"}},
+     "Due date": {"date": {"start": TODAY.isoformat()}}},
+    {"Task": title("Due three days ago"), "Status": {"status": {"name": "To do"}},
+     "Due date": {"date": {"start": (TODAY - timedelta(days=3)).isoformat()}}},
+    {"Task": title("Offset west"), "Status": {"status": {"name": "To do"}}, "Priority": {"select": {"name": "Critical"}},
+     "Tags": {"multi_select": [{"name": "Rapide à terminer"}]}, "Due date": {"date": {"start": "2026-10-17T23:30:00.000-05:00"}}},
+    {"Task": title("Offset east"), "Status": {"status": {"name": "Blocked"}},
+     "Due date": {"date": {"start": "2026-10-18T01:30:00.000+02:00"}}},
+    {"Task": title("Date only"), "Status": {"status": {"name": "To do"}}, "Priority": {"select": {"name": "Important"}},
+     "Due date": {"date": {"start": "2026-10-17"}}},
+]
+
+
+def due(payload: dict) -> dict:
+    return {"property": "Due date", "date": payload}
+
+
+PARITY_FILTERS = [
+    create_combined_filter(),
+    create_combined_filter(tags=["Administrative"]),
+    create_combined_filter(tags=["Quick to finish"], priorities=["Critical"]),
+    create_combined_filter(priorities=["Critical", "Important"]),
+    create_combined_filter(statuses=["Blocked"]),
+    create_combined_filter(statuses=["Done", "Killed"]),
+    {"property": "Task", "title": {"contains": "TASK 1"}},
+    {"property": "Task", "rich_text": {"starts_with": "offset"}},
+    {"property": "Task", "title": {"ends_with": "7"}},
+    {"property": "Task", "title": {"equals": "Task 42"}},
+    {"property": "Priority", "select": {"is_empty": True}},
+    {"property": "Priority", "select": {"does_not_equal": "Critical"}},
+    {"property": "Tags", "multi_select": {"is_empty": True}},
+    {"property": "Tags", "multi_select": {"does_not_contain": "Pro"}},
+    {"property": "Status", "status": {"does_not_equal": "Done"}},
+    due({"equals": "2026-10-17"}),
+    due({"equals": "2026-10-18"}),
+    due({"on_or_before": "2026-10-17"}),
+    due({"after": "2026-10-17"}),
+    due({"on_or_after": "2026-10-17T23:00:00Z"}),
+    due({"is_empty": True}),
+    due({"past_week": {}}),
+    due({"next_week": {}}),
+    due({"this_week": {}}),
+    due({"next_month": {}}),
+    due({"past_year": {}}),
+    {"or": [due({"before": "2026-10-17T02:00:00+02:00"}), {"property": "Status", "status": {"equals": "Blocked"}}]},
+]
+
+
+@pytest.fixture(scope="module")
+def answers(tmp_path_factory, with_client):
+    """Emulator answers to PARITY_FILTERS, and the todos the server would mirror"""
+    emulator = NotionEmulator(seed=2)
+    emulator.seed_todos(300, database_id=DATABASE_ID, seed=2)
+
+    async def collect(client):
+        for properties in EXTRA_PAGES:
+            body = {"parent": {"database_id": DATABASE_ID}, "properties": properties}
+            assert (await client.post("/pages", json=body)).status_code == 200
+        extract = compile_extractor((await client.get(f"/databases/{DATABASE_ID}")).json()["properties"])
+        todos = [extract(page) for page in await query_all(client)]
+        return todos, [sorted(page["id"] for page in await query_all(client, filter)) for filter in PARITY_FILTERS]
+
+    todos, expected = with_client(emulator.transport, collect)
+    store = TaskStore(str(tmp_path_factory.mktemp("parity") / "tasks.db"), database_id=DATABASE_ID)
+    store.replace(todos)
+    yield todos, store, expected
+    store.close()
+
+
+def test_parity_filters_are_selective(answers):
+    todos, _, expected = answers
+    for matched in expected:
+        assert 0 < len(matched) < len(todos)
+
+
+@pytest.mark.parametrize("index", range(len(PARITY_FILTERS)))
+def test_mirror_matches_the_emulator(answers, index):
+    todos, _, expected = answers
+    predicate = compile_filter(PARITY_FILTERS[index])
+    assert sorted(todo["id"] for todo in todos if predicate(todo)) == expected[index]
+
+
+@pytest.mark.parametrize("index", range(len(PARITY_FILTERS)))
+def test_store_matches_the_emulator(answers, index):
+    _, store, expected = answers
+    assert sorted(todo["id"] for todo in store.select(PARITY_FILTERS[index], fields=["id"])) == expected[index]
+
+
+@pytest.mark.parametrize("index", range(len(PARITY_FILTERS)))
+def test_columnar_matches_the_emulator(answers, vectorised, index):
+    todos, _, expected = answers
+    table = ColumnarTodos.from_todos(todos)
+    assert sorted(todo["id"] for todo in table.select(PARITY_FILTERS[index], fields=["id"])) == expected[index]
+
+
+def test_strict_emulator_rejects_unknown_properties(emulator, with_client):
+    emulator.strict_filters = True
+
+    async def query(client):
+        return await client.post(f"/databases/{DATABASE_ID}/query", json={"filter": create_combined_filter(priorities=["Critical"])})
+
+    response = with_client(emulator.transport, query)
+    assert response.status_code == 400
+    assert "Priorité" in response.json()["message"]
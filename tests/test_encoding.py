@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from notion_mcp.encoding import encode_todos
+
+TODOS = [
+    {"id": "a", "task": "Pay | split\tbill", "tags": ["Famille", "Rapide à terminer"], "status": "To do",
+     "priority": "Critical", "created": "2026-10-01T08:00:00.000Z", "due_date": None},
+    {"id": "b", "task": "Two\nlines", "tags": [], "status": "Done", "priority": "Unknown",
+     "created": "2026-10-02T08:00:00.000Z", "due_date": "2026-10-17"},
+]
+
+
+def test_json_is_compact_and_round_trips():
+    text = encode_todos(TODOS, "json")
+    assert json.loads(text) == TODOS
+    assert ", " not in text and "à" in text
+    assert encode_todos([], "json") == "[]"
+
+
+def test_ndjson_has_one_todo_per_line():
+    lines = encode_todos(TODOS, "ndjson").splitlines()
+    assert [json.loads(line) for line in lines] == TODOS
+
+
+def test_tsv_escapes_separators():
+    lines = encode_todos(TODOS, "tsv", ["id", "task", "tags", "due_date"]).splitlines()
+    assert lines == ["id\ttask\ttags\tdue_date",
+                     "a\tPay | split\\tbill\tFamille, Rapide à terminer\t",
+                     "b\tTwo\\nlines\t\t2026-10-17"]
+
+
+def test_markdown_table_escapes_pipes_and_newlines():
+    lines = encode_todos(TODOS, "markdown_table", ["task", "status"]).splitlines()
+    assert lines == ["| task | status |", "|---|---|", "| Pay \\| split\tbill | To do |", "| Two<br>lines | Done |"]
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Unknown output format"):
+        encode_todos(TODOS, "xml")
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from notion_mcp.columnar import ColumnarTodos
+from notion_mcp.core import create_combined_filter
+from notion_mcp.filters import compile_filter, filter_to_sql
+from notion_mcp.store import TaskStore
+
+# A Saturday; this_week runs from Monday 2026-10-12
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def todo(page_id, task, tags, status, priority, created, due_date):
+    return {"id": page_id, "task": task, "tags": tags, "status": status, "priority": priority,
+            "created": created, "due_date": due_date}
+
+
+TODOS = [
+    todo("a", "Renew passport", ["Administratif"], "To do", "Important", "2026-10-01T08:00:00.000Z", "2026-10-17"),
+    # 2026-10-18 in UTC
+    todo("b", "Fix the printer", ["IT", "Quick to finish"], "In progress", "Critical", "2026-10-10T12:00:00.000Z",
+         "2026-10-17T23:30:00.000-05:00"),
+    # 2026-10-17 in UTC
+    todo("c", "Call grandma", ["Famille"], "Done", "Moderate", "2026-10-12T09:00:00.000Z",
+         "2026-10-18T01:30:00.000+02:00"),
+    todo("d", "Quarterly report", ["Pro"], "Blocked", "Unknown", "2026-10-15T18:00:00.000Z", None),
+    todo("e", "Sort receipts", [], "Killed", "Important", "2026-10-16T07:00:00.000Z", "2026-10-20T09:00:00.000Z"),
+    todo("f", "File taxes", ["Administrative", "Rapide à terminer"], "Unknown", "Critical", "2026-09-01T08:00:00.000Z",
+         "2026-10-16T23:59:00.000Z"),
+]
+
+
+def due(payload: dict) -> dict:
+    return {"property": "Due date", "date": payload}
+
+
+def created(payload: dict) -> dict:
+    return {"timestamp": "created_time", "created_time": payload}
+
+
+CASES = [
+    # What the list tools send
+    (create_combined_filter(), "abdf"),
+    (create_combined_filter(tags=["Administrative"]), "af"),
+    (create_combined_filter(tags=["Famille"]), ""),
+    (create_combined_filter(tags=["Quick to finish"], priorities=["Critical"]), "bf"),
+    (create_combined_filter(priorities=["Critical", "Important"]), "abf"),
+    (create_combined_filter(statuses=["Blocked"]), "d"),
+    (create_combined_filter(statuses=["Done", "Killed"]), "ce"),
+    (create_combined_filter(tags=["Pro"], statuses=["Blocked"]), "d"),
+    # Text is matched case-insensitively
+    ({"property": "Task", "title": {"contains": "RE"}}, "ade"),
+    ({"property": "Tâche", "title": {"starts_with": "f"}}, "bf"),
+    ({"property": "Name", "rich_text": {"ends_with": "S"}}, "ef"),
+    ({"property": "Task", "title": {"equals": "Call grandma"}}, "c"),
+    ({"property": "Task", "title": {"does_not_contain": "e"}}, "c"),
+    # "Unknown" is how a missing choice is formatted
+    ({"property": "Priorité", "select": {"is_empty": True}}, "d"),
+    ({"property": "Priority", "select": {"is_not_empty": True}}, "abcef"),
+    ({"property": "Status", "status": {"is_empty": True}}, "f"),
+    ({"property": "État", "status": {"does_not_equal": "Done"}}, "abdef"),
+    ({"property": "Tags", "multi_select": {"is_empty": True}}, "e"),
+    ({"property": "Tags", "multi_select": {"does_not_contain": "Pro"}}, "abcef"),
+    ({"or": [], "and": []}, "abcdef"),
+    ({"or": []}, ""),
+    # Date-only bounds compare UTC calendar days
+    (due({"equals": "2026-10-17"}), "ac"),
+    (due({"equals": "2026-10-18"}), "b"),
+    (due({"before": "2026-10-17"}), "f"),
+    (due({"on_or_before": "2026-10-17"}), "acf"),
+    (due({"after": "2026-10-17"}), "be"),
+    # Datetime bounds compare instants; a date-only value is midnight UTC
+    (due({"on_or_after": "2026-10-17T23:00:00Z"}), "bce"),
+    (due({"before": "2026-10-17T02:00:00+02:00"}), "f"),
+    (due({"on_or_before": "2026-10-17T02:00:00+02:00"}), "af"),
+    (due({"is_empty": True}), "d"),
+    (due({"is_not_empty": True}), "abcef"),
+    # Relative windows are whole UTC days, today included
+    (due({"next_week": {}}), "abce"),
+    (due({"past_week": {}}), "acf"),
+    (created({"past_month": {}}), "abcde"),
+    (created({"this_week": {}}), "cde"),
+    (created({"after": "2026-10-10"}), "cde"),
+    (created({"on_or_after": "2026-10-10"}), "bcde"),
+]
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    store = TaskStore(str(tmp_path_factory.mktemp("filters") / "tasks.db"), database_id="filters")
+    store.replace(TODOS)
+    yield store
+    store.close()
+
+
+def ids(todos) -> str:
+    return "".join(sorted(todo["id"] for todo in todos))
+
+
+@pytest.mark.parametrize("filter, expected", CASES)
+def test_python_predicate(filter, expected):
+    predicate = compile_filter(filter, NOW)
+    assert ids(todo for todo in TODOS if predicate(todo)) == expected
+
+
+@pytest.mark.parametrize("filter, expected", CASES)
+def test_sql_matches_python(store, filter, expected):
+    where, params = filter_to_sql(filter, NOW)
+    rows = store.db.execute(f"SELECT id FROM tasks WHERE {where}", params).fetchall()
+    assert "".join(sorted(row[0] for row in rows)) == expected
+
+
+@pytest.mark.parametrize("filter, expected", CASES)
+def test_columnar_matches_python(vectorised, filter, expected):
+    table = ColumnarTodos.from_todos(TODOS)
+    assert "".join(sorted(table.row_id(row) for row in table.matching_rows(filter, now=NOW))) == expected
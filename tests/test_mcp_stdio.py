@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from notion_mcp import mcp_stdio
+
+
+class FakeTransport:
+    """Feeds lines to serve() and collects what it sends"""
+
+    def __init__(self, lines):
+        self.lines = [line.encode("utf-8") for line in lines]
+        self.sent = []
+
+    async def receive(self):
+        return self.lines.pop(0) if self.lines else None
+
+    def send(self, message: dict):
+        self.sent.append(message)
+
+
+def serve(*lines) -> list:
+    transport = FakeTransport(lines)
+    asyncio.run(mcp_stdio.serve(mcp_stdio.MCPServer(), transport))
+    return transport.sent
+
+
+def test_non_object_messages_are_invalid_requests():
+    ping = json.dumps({"jsonrpc": "2.0", "id": 7, "method": "tools/list"})
+    sent = serve('[{"jsonrpc": "2.0", "id": 1, "method": "tools/list"}]', "1", '"x"', "null",
+                 '{"jsonrpc": "2.0", "id": [1], "method": "tools/list"}', ping)
+    errors = [message["error"]["code"] for message in sent if "error" in message]
+    assert errors == [-32600] * 5
+    # The loop survived and answered the valid request
+    assert [message["id"] for message in sent if "result" in message] == [7]
+
+
+def test_malformed_cancellation_is_ignored():
+    cancel = json.dumps({"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": [1]}})
+    ping = json.dumps({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+    sent = serve(cancel, '{"jsonrpc": "2.0", "method": "notifications/cancelled", "params": []}', "{", ping)
+    assert [message.get("id") for message in sent] == [None, 2]
+    assert sent[0]["error"]["code"] == -32700
+
+
+def test_every_listed_tool_is_served_through_core(core):
+    listed = serve(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}))[0]["result"]["tools"]
+    assert {tool["name"] for tool in listed} >= {"add_todos", "bulk_update_tasks", "show_all_todos", "server_stats"}
+    calls = [json.dumps({"jsonrpc": "2.0", "id": index, "method": "tools/call", "params": {"name": tool["name"]}})
+             for index, tool in enumerate(listed)]
+    for message in serve(*calls):
+        assert "Unknown tool" not in message["result"]["content"][0]["text"]
+
+    called = serve(json.dumps({"jsonrpc": "2.0", "id": 9, "method": "tools/call",
+                               "params": {"name": "show_blocked_tasks", "arguments": {"fields": ["status"]}}}))
+    todos = json.loads(called[0]["result"]["content"][0]["text"])
+    assert todos and all(todo == {"status": "Blocked"} for todo in todos)
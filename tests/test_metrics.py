@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+import pytest
+
+from notion_mcp.metrics import LatencyHistogram, Metrics, endpoint_name
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("POST", "/databases/0e4f/query", "POST /databases/{id}/query"),
+    ("PATCH", "/pages/abc?x=1", "PATCH /pages/{id}"),
+    ("POST", "/search", "POST /search"),
+])
+def test_endpoint_names_leave_out_ids(method, path, expected):
+    assert endpoint_name(method, path) == expected
+
+
+def test_percentiles_are_within_a_bucket():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.25)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.25)
+    assert histogram.summary()["max_ms"] == 1000.0
+
+
+def test_notion_traffic_is_charged_to_the_tool_that_caused_it():
+    metrics = Metrics()
+
+    async def request(size):
+        metrics.http_exchange("POST", "/databases/db/query", 0.01, 200, size)
+
+    async def scenario():
+        with metrics.tool_call("show_all_todos"):
+            # Tasks started by the call inherit it
+            await asyncio.gather(request(100), request(50))
+            metrics.tool_rows(7)
+        with pytest.raises(RuntimeError), metrics.tool_call("add_todo"):
+            metrics.http_exchange("POST", "/pages", 0.02, 429)
+            raise RuntimeError("failed")
+        metrics.http_exchange("POST", "/search", 0.01)
+
+    asyncio.run(scenario())
+    report = json.loads(json.dumps(metrics.snapshot()))
+    listed = report["tools"]["show_all_todos"]
+    assert (listed["calls"], listed["rows"], listed["notion_requests"], listed["notion_bytes"]) == (1, 7, 2, 150)
+    assert report["tools"]["add_todo"]["errors"] == 1
+    assert report["notion"]["POST /pages"]["throttled"] == 1
+    # No response at all counts as an error too
+    assert report["notion"]["POST /search"]["errors"] == 1
+    assert report["notion"]["POST /databases/{id}/query"]["requests"] == 2
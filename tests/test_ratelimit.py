@@ -0,0 +1,72 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+
+from notion_mcp.ratelimit import RateLimiter, parse_retry_after
+
+
+@pytest.mark.parametrize("value, expected", [(None, 1.0), ("", 1.0), ("2.5", 2.5), ("-3", 0.0), ("soon", 1.0)])
+def test_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_retry_after_http_date():
+    assert 8 < parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+
+def test_bucket_paces_requests_after_the_burst():
+    async def scenario():
+        limiter = RateLimiter(rate=50, burst=2)
+        started = time.monotonic()
+        for _ in range(6):
+            await limiter.acquire()
+            await limiter.release()
+        return time.monotonic() - started
+
+    # Two requests ride the burst, the other four wait 20 ms each
+    assert asyncio.run(scenario()) >= 0.07
+
+
+def test_window_halves_on_429_and_grows_back():
+    async def scenario():
+        limiter = RateLimiter(rate=1000, burst=1000, max_concurrency=8)
+        await limiter.acquire()
+        await limiter.release(throttled=True, retry_after=0.02)
+        assert (limiter.concurrency, limiter.throttled) == (4, 1)
+
+        # The whole bucket waits out Retry-After
+        started = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - started >= 0.015
+        await limiter.release()
+        assert 4 < limiter.concurrency < 5
+        for _ in range(100):
+            await limiter.acquire()
+            await limiter.release()
+        assert limiter.concurrency == 8
+
+    asyncio.run(scenario())
+
+
+def test_in_flight_requests_stay_within_the_window():
+    async def scenario():
+        limiter = RateLimiter(rate=1000, burst=1000, max_concurrency=2)
+        peak, running = 0, 0
+
+        async def request():
+            nonlocal peak, running
+            await limiter.acquire()
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.005)
+            running -= 1
+            await limiter.release()
+
+        await asyncio.gather(*(request() for _ in range(8)))
+        return peak, limiter.stats()
+
+    peak, stats = asyncio.run(scenario())
+    assert peak == 2
+    assert stats["requests"] == 8 and stats["in_flight"] == 0
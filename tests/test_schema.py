@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from notion_mcp import schema
+from notion_mcp.schema import TodoFormatter
+
+PAGE = {
+    "id": "6a107b75-677f-4cbd-8c22-af58be6521cc",
+    "created_time": "2026-10-01T08:00:00.000Z",
+    "properties": {
+        "Tâche": {"id": "title", "type": "title", "title": [{"text": {"content": "Renew passport"}}]},
+        "Priorité": {"id": "a%3Bb", "type": "select", "select": {"name": "Important"}},
+    },
+}
+
+DATABASE = {"properties": {"Tâche": {"id": "title", "type": "title"}, "Priorité": {"id": "a%3Bb", "type": "select"}}}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(schema, "time", clock)
+    return clock
+
+
+def test_failed_schema_fetch_backs_off(clock):
+    calls = []
+
+    async def fetch():
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise ConnectionError("Notion is down")
+        return DATABASE
+
+    formatter = TodoFormatter(retry_after=60.0)
+    for _ in range(3):
+        asyncio.run(formatter.ensure(fetch))
+        # Probing still formats pages while the schema is unknown
+        assert formatter(PAGE)["priority"] == "Important"
+    assert len(calls) == 1
+    assert formatter.property_ids() is None
+
+    clock.now += 61
+    asyncio.run(formatter.ensure(fetch))
+    assert len(calls) == 2
+    assert formatter.property_ids(["priority"]) == ["a;b"]
+    assert formatter(PAGE)["task"] == "Renew passport"
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+import pytest
+
+from notion_mcp.singleflight import SingleFlight, request_key
+
+
+def test_request_key_ignores_key_order():
+    assert request_key("POST", "/q", {"a": 1, "b": [1, 2]}) == request_key("POST", "/q", {"b": [1, 2], "a": 1})
+    assert request_key("POST", "/q", {"a": 1}) != request_key("POST", "/q", {"a": 2})
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flight, started = SingleFlight(), []
+
+        async def fetch():
+            started.append(1)
+            await asyncio.sleep(0.01)
+            return {"rows": 3}
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+        assert all(result is results[0] for result in results)
+        assert (flight.calls, flight.shared, len(flight)) == (1, 4, 0)
+        # Once settled, the next call runs again
+        await flight.do("key", fetch)
+        assert len(started) == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flight, release = SingleFlight(), asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second == "done"
+
+    asyncio.run(scenario())
+
+
+def test_identical_reads_share_one_request(make_client):
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"results": []})
+
+    async def scenario():
+        client = make_client(httpx.MockTransport(handler))
+        body = {"filter": {"property": "Status", "status": {"equals": "Done"}}}
+        same = [client.read("POST", "/databases/db/query", json=body) for _ in range(3)]
+        other = client.read("POST", "/databases/db/query", json={})
+        await asyncio.gather(*same, other)
+        await client.aclose()
+        return client.inflight
+
+    inflight = asyncio.run(scenario())
+    assert len(requests) == 2
+    assert inflight.shared == 2
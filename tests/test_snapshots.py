@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from notion_mcp.snapshots import CursorError, Snapshot, SnapshotStore
+
+
+def batches(pages):
+    """A stream of (rows, has_more) batches that counts how many were pulled"""
+    pulled = []
+
+    async def stream():
+        for index, rows in enumerate(pages):
+            pulled.append(index)
+            yield rows, index < len(pages) - 1
+
+    return stream(), pulled
+
+
+def test_full_first_page_does_not_fetch_the_next_notion_page():
+    async def scenario():
+        stream, pulled = batches([list(range(100)), list(range(100, 150))])
+        snapshot = Snapshot("key", stream=stream)
+        rows, more = await snapshot.page(0, 100)
+        assert rows == list(range(100))
+        assert more
+        assert pulled == [0]
+
+        rows, more = await snapshot.page(100, 100)
+        assert rows == list(range(100, 150))
+        assert not more
+        assert snapshot.complete
+
+    asyncio.run(scenario())
+
+
+def test_last_notion_page_ends_the_listing_without_a_cursor():
+    async def scenario():
+        stream, pulled = batches([list(range(40))])
+        snapshot = Snapshot("key", stream=stream)
+        rows, more = await snapshot.page(0, 100)
+        assert len(rows) == 40
+        assert not more
+        assert snapshot.complete
+
+    asyncio.run(scenario())
+
+
+def test_frozen_rows_page_with_look_ahead():
+    async def scenario():
+        snapshot = Snapshot("key", list(range(5)))
+        assert await snapshot.page(0, 2) == ([0, 1], True)
+        assert await snapshot.page(4, 2) == ([4], False)
+
+    asyncio.run(scenario())
+
+
+def test_cursor_round_trip_and_key_check():
+    store = SnapshotStore()
+    snapshot = Snapshot("key", list(range(5)))
+    cursor = store.cursor(snapshot, 2)
+    assert store.resume(cursor, "key") == (snapshot, 2)
+    with pytest.raises(CursorError):
+        store.resume(cursor, "other")
+    with pytest.raises(CursorError):
+        store.resume("not a cursor", "key")
@@ -0,0 +1,35 @@
+import os
+import subprocess
+
+import pytest
+
+from notion_mcp import startup
+
+
+def fake_launch(total_ms: float, returncode: int = 0):
+    def launch(code: str):
+        stdout = '[["core", 0.05]]' if code != "pass" else ""
+        return subprocess.CompletedProcess([], returncode, stdout=stdout, stderr=""), total_ms if code != "pass" else 10.0
+    return launch
+
+
+@pytest.mark.parametrize("total_ms, code", [(120.0, 0), (370.0, startup.OVER_BUDGET)])
+def test_profile_exit_code_enforces_the_budget(monkeypatch, capsys, total_ms, code):
+    monkeypatch.setattr(startup, "STARTUP_BUDGET_MS", 300.0)
+    monkeypatch.setattr(startup, "_launch", fake_launch(total_ms))
+    assert startup.profile("mcp_stdio") == code
+    assert ("OVER" in capsys.readouterr().err) == bool(code)
+
+
+def test_profile_reports_a_failed_import(monkeypatch):
+    monkeypatch.setattr(startup, "_launch", fake_launch(50.0, returncode=1))
+    assert startup.profile("mcp_stdio") == 1
+
+
+def test_real_entry_point_is_profiled(monkeypatch):
+    # The child interpreter imports notion_mcp from the source tree
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [os.path.dirname(os.path.dirname(startup.__file__)),
+                                                                    os.getenv("PYTHONPATH")])))
+    # Generous budget: this checks the child run and report, not the machine's speed
+    monkeypatch.setattr(startup, "STARTUP_BUDGET_MS", 60_000.0)
+    assert startup.profile("mcp_stdio") == 0
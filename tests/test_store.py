@@ -0,0 +1,57 @@
+from notion_mcp.store import TaskStore
+
+TODO = {
+    "id": "6a107b75-677f-4cbd-8c22-af58be6521cc",
+    "task": "Renew passport",
+    "tags": ["Administrative"],
+    "status": "To do",
+    "priority": "Important",
+    "created": "2026-10-01T08:00:00.000Z",
+    "due_date": None,
+}
+
+
+def fill(path, database_id):
+    store = TaskStore(str(path), database_id=database_id)
+    store.replace([TODO])
+    store.sync_state = {"high_water": "2026-10-01T08:00:00.000Z"}
+    store.close()
+
+
+def test_rows_survive_a_restart(tmp_path):
+    fill(tmp_path / "tasks.db", "database-a")
+    store = TaskStore(str(tmp_path / "tasks.db"), database_id="database-a")
+    assert store.loaded
+    assert store.select() == [TODO]
+    assert store.sync_state["high_water"] == "2026-10-01T08:00:00.000Z"
+
+
+def test_another_database_starts_empty(tmp_path):
+    fill(tmp_path / "tasks.db", "database-a")
+    store = TaskStore(str(tmp_path / "tasks.db"), database_id="database-b")
+    assert not store.loaded
+    assert len(store) == 0
+    assert store.sync_state == {}
+    store.close()
+
+    # The new owner's rows are kept on the next start
+    fill(tmp_path / "tasks.db", "database-b")
+    assert len(TaskStore(str(tmp_path / "tasks.db"), database_id="database-b")) == 1
+
+
+def test_first_page_and_snapshot_agree(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"), database_id="database-a")
+    todos = [dict(TODO, id=f"{index:08d}-0000-0000-0000-000000000000", created=f"2026-10-{index + 1:02d}T08:00:00.000Z")
+             for index in range(5)]
+    store.replace(todos)
+    snapshot = store.snapshot(fields=["id", "tags"])
+    assert len(snapshot) == 5
+    assert snapshot[:2] == store.select(limit=2, fields=["id", "tags"])
+    assert snapshot[0]["tags"] == ["Administrative"]
+
+
+def test_get_returns_the_stored_todo(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"), database_id="database-a")
+    store.replace([TODO])
+    assert store.get(TODO["id"]) == TODO
+    assert store.get("missing") is None
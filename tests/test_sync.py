@@ -0,0 +1,76 @@
+import asyncio
+
+from notion_mcp.cache import TodoMirror
+from notion_mcp.sync import DeltaSync
+
+
+def page(page_id: str, task: str, edited: str) -> dict:
+    return {"id": page_id, "task": task, "last_edited_time": edited}
+
+
+def format_todo(page: dict) -> dict:
+    return {"id": page["id"], "task": page["task"], "tags": [], "status": None, "priority": None,
+            "created": "2026-10-01T08:00:00.000Z", "due_date": None}
+
+
+class FakeDatabase:
+    """Just enough of a database query for DeltaSync: last_edited_time filters and sorts"""
+
+    def __init__(self, pages):
+        self.pages = {page["id"]: page for page in pages}
+        self.queries = 0
+
+    async def iter_pages(self, filter: dict = None, sorts: list = None, page_size: int = 100):
+        self.queries += 1
+        pages = list(self.pages.values())
+        if filter:
+            (operator, mark), = filter["last_edited_time"].items()
+            pages = [p for p in pages if (p["last_edited_time"] > mark if operator == "after" else p["last_edited_time"] >= mark)]
+        if sorts:
+            pages.sort(key=lambda p: p["last_edited_time"], reverse=sorts[0]["direction"] == "descending")
+        for page in pages:
+            yield page
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def synced(database):
+    mirror = TodoMirror(ttl=60)
+    sync = DeltaSync(database.iter_pages, format_todo)
+    run(sync.refresh(mirror))
+    return mirror, sync
+
+
+def test_unchanged_database_costs_one_probe():
+    database = FakeDatabase([page("a", "A", "2026-10-17T10:00:00.000Z"), page("b", "B", "2026-10-17T09:00:00.000Z")])
+    mirror, sync = synced(database)
+    database.queries = 0
+    assert run(sync.refresh(mirror)) == 0
+    assert database.queries == 1
+
+
+def test_edit_within_the_high_water_minute_is_seen():
+    database = FakeDatabase([page("a", "A", "2026-10-17T10:00:00.000Z"), page("b", "B", "2026-10-17T09:00:00.000Z")])
+    mirror, sync = synced(database)
+
+    # Same minute as the high-water mark: invisible to a strict `after`
+    database.pages["a"] = page("a", "A edited", "2026-10-17T10:00:00.000Z")
+    database.pages["c"] = page("c", "C", "2026-10-17T10:00:00.000Z")
+    assert run(sync.probe(mirror))
+    run(sync.refresh(mirror))
+    assert mirror.get("a")["task"] == "A edited"
+    assert mirror.get("c")["task"] == "C"
+    assert not run(sync.probe(mirror))
+
+
+def test_newer_edit_is_merged():
+    database = FakeDatabase([page("a", "A", "2026-10-17T10:00:00.000Z")])
+    mirror, sync = synced(database)
+    database.pages["b"] = page("b", "B", "2026-10-17T10:05:00.000Z")
+    # The delta re-reads the old high-water minute too
+    assert run(sync.refresh(mirror)) == 2
+    assert sync.high_water_mark == "2026-10-17T10:05:00.000Z"
+    assert mirror.get("b")["task"] == "B"
+    assert len(mirror) == 2
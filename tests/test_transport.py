@@ -0,0 +1,74 @@
+import asyncio
+import io
+import json
+import logging
+
+from notion_mcp import transport
+from notion_mcp.transport import Abbreviated, PayloadLog, StdioTransport
+
+
+class Output(io.BytesIO):
+    """Records the size of every write"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(len(data))
+        return super().write(data)
+
+
+def open_transport(monkeypatch, *lines) -> StdioTransport:
+    async def open_stdin():
+        reader = asyncio.StreamReader()
+        for line in lines:
+            reader.feed_data(line)
+        reader.feed_eof()
+        return reader
+
+    monkeypatch.setattr(transport, "open_stdin", open_stdin)
+    return StdioTransport(Output())
+
+
+def test_receive_skips_blank_lines_and_ends_with_none(monkeypatch):
+    async def scenario():
+        stdio = open_transport(monkeypatch, b'{"id": 1}\n', b"\n", b"  \r\n", b'{"id": 2}\n')
+        await stdio.open()
+        received = [await stdio.receive() for _ in range(3)]
+        await stdio.close()
+        return stdio, received
+
+    stdio, received = asyncio.run(scenario())
+    assert received == [b'{"id": 1}\n', b'{"id": 2}\n', None]
+    assert (stdio.messages_in, stdio.bytes_in) == (2, 20)
+
+
+def test_queued_messages_are_written_together_one_per_line(monkeypatch):
+    async def scenario():
+        stdio = open_transport(monkeypatch)
+        await stdio.open()
+        for index in range(3):
+            stdio.send({"jsonrpc": "2.0", "id": index, "result": {"text": "é"}})
+        await asyncio.sleep(0)
+        stdio.send({"jsonrpc": "2.0", "id": 3, "result": {}})
+        await stdio.close()
+        return stdio
+
+    stdio = asyncio.run(scenario())
+    lines = stdio.output.getvalue().decode("utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [0, 1, 2, 3]
+    assert len(stdio.output.writes) == 2
+    assert stdio.messages_out == 4 and stdio.bytes_out == len(stdio.output.getvalue())
+
+
+def test_payloads_are_only_rendered_when_logged(caplog):
+    log = PayloadLog(limit=8, sample_rate=1)
+    with caplog.at_level(logging.INFO, logger="notion_mcp"):
+        log("->", b'{"jsonrpc": "2.0"}\n')
+    assert not caplog.records
+
+    with caplog.at_level(logging.DEBUG, logger="notion_mcp"):
+        log("->", b'{"jsonrpc": "2.0"}\n')
+    assert caplog.records[0].getMessage() == '-> {"jsonrp... (18 bytes)'
+    assert str(Abbreviated(b"short\n", 8)) == "short"
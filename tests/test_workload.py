@@ -0,0 +1,31 @@
+from notion_mcp import workload
+from notion_mcp.tools import TOOLS
+from notion_mcp.workload import ArgumentRebuilder, WorkloadRecorder
+
+KNOWN = "1f2e3d4c-5b6a-4789-8abc-def012345678"
+UNKNOWN = "99999999-5b6a-4789-8abc-def012345678"
+
+
+def test_recorded_shapes_replay_as_equivalent_arguments(tmp_path):
+    path = tmp_path / "logs" / "workload.jsonl"
+    recorder = WorkloadRecorder(str(path))
+    recorder.record("bulk_update_tasks", {"updates": [{"task_id": KNOWN, "status": "Blocked"},
+                                                      {"task_id": UNKNOWN, "status": "Done"}]}, 2.0, 2.5, 80, False)
+    recorder.record("show_all_todos", {"limit": 20, "cursor": "c-123", "fields": ["task"]}, 1.0, 1.1, 400, False)
+    recorder.record("add_todo", {"task": "Call the bank about the loan"}, 3.0, 3.2, 50, True)
+    recorder.close()
+
+    text = path.read_text()
+    assert "Blocked" not in text and KNOWN not in text and "bank" not in text
+    calls = workload.load(str(path))
+    assert [call["tool"] for call in calls] == ["show_all_todos", "bulk_update_tasks", "add_todo"]
+
+    rebuilder = ArgumentRebuilder(TOOLS, [KNOWN, "a" * 36])
+    listed, updated, added = (rebuilder.arguments(call["args"]) for call in calls)
+    # Enum values and known ids come back as they were; cursors are dropped
+    assert listed == {"limit": 20, "fields": ["task"]}
+    assert updated["updates"][0] == {"task_id": KNOWN, "status": "Blocked"}
+    # An id the replay database lacks maps onto one of its pages
+    assert updated["updates"][1]["task_id"] in (KNOWN, "a" * 36)
+    assert len(added["task"]) == len("Call the bank about the loan")
+    assert (rebuilder.recovered, rebuilder.remapped, rebuilder.filled) == (4, 1, 1)